@@ -0,0 +1,86 @@
+"""
+api/admin.py
+
+Admin-only diagnostics, gated by the X-Admin-Token header (ADMIN_TOKEN, the
+same token as request profiling). Without ADMIN_TOKEN every call is refused.
+
+Memory: process RSS, tracemalloc snapshots and diffs, top allocation sites,
+live FAISS indexes and cache sizes, and recent per-request peaks
+(core/memory.py). Handlers are plain functions, so snapshotting and heap
+walks run in the threadpool rather than on the event loop.
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import Optional
+from core.profiling import is_admin, ADMIN_TOKEN
+from core import memory
+import gc
+
+GROUP_BY_PATTERN = "^(" + "|".join(memory.GROUP_BY) + ")$"
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Admin-Token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/memory")
+def memory_overview(requests: int = Query(20, ge=0, le=100)):
+    """RSS, tracemalloc status, live objects and caches, latest per-request peaks"""
+    return {
+        "rss_bytes": memory.rss_bytes(),
+        "peak_rss_bytes": memory.peak_rss_bytes(),
+        "tracemalloc": memory.tracing_status(),
+        "snapshots": memory.list_snapshots(),
+        "live": memory.live_objects(),
+        "recent_requests": memory.recent_requests()[:requests],
+    }
+
+
+@router.post("/admin/memory/tracing")
+def start_tracing(frames: int = Query(memory.MEMORY_TRACE_FRAMES, ge=1, le=100)):
+    memory.start_tracing(frames)
+    return memory.tracing_status()
+
+
+@router.delete("/admin/memory/tracing")
+def stop_tracing():
+    memory.stop_tracing()
+    return memory.tracing_status()
+
+
+@router.post("/admin/memory/snapshots")
+def take_snapshot():
+    """Snapshot traced allocations now, for a later diff"""
+    return memory.take_snapshot()
+
+
+@router.get("/admin/memory/snapshots")
+def list_snapshots():
+    return memory.list_snapshots()
+
+
+@router.get("/admin/memory/snapshots/{old_id}/diff/{new_id}")
+def diff_snapshots(old_id: str, new_id: str, limit: int = Query(20, ge=1, le=200),
+                   group_by: str = Query("lineno", pattern=GROUP_BY_PATTERN)):
+    """Allocation sites that grew most between two snapshots; `new_id` may be `now`"""
+    return memory.diff_snapshots(old_id, new_id, limit, group_by)
+
+
+@router.get("/admin/memory/top")
+def top_allocations(limit: int = Query(20, ge=1, le=200),
+                    group_by: str = Query("lineno", pattern=GROUP_BY_PATTERN)):
+    """Largest live allocation sites"""
+    return memory.top_allocations(limit, group_by)
+
+
+@router.post("/admin/memory/gc")
+def collect_garbage():
+    """Run a full collection; returns RSS before and after"""
+    before = memory.rss_bytes()
+    collected = gc.collect()
+    return {"collected": collected, "rss_before_bytes": before, "rss_after_bytes": memory.rss_bytes()}
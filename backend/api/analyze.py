@@ -1,38 +1,63 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Request, UploadFile, File, HTTPException, Query
+from typing import Optional
 import uuid
 import asyncio
+import contextvars
+import os
 
 from services.text_extractor import extract_text
 from services.clause_splitter import split_clauses
-from services.risk_classifier import classify_risk
+from services.risk_classifier import classify_batch
 from services.urdu_explainer import explain_urdu
-from core.vectorstore import create_index
+from services.summarizer import summarize_document, fallback_summary
+from services.precompute import schedule_precompute
+from core.vectorstore import create_index, write_info
+from core.metrics import timed, run_in_executor
+from core.ledger import set_document
+from core.encoding import parse_fields, shape_clauses, negotiate_format, encode_response
 
 router = APIRouter()
 
+# How long the response waits for the document summary before sending the
+# count-based one; a later summary is still stored for the PDF report
+SUMMARY_WAIT_SECONDS = float(os.getenv("SUMMARY_WAIT_SECONDS", "5"))
+
+_summary_tasks = set()      # summaries finishing after their response (keeps them referenced)
+
 
 @router.post("/analyze")
-async def analyze_document(file: UploadFile = File(...)):
+async def analyze_document(
+    request: Request,
+    file: UploadFile = File(...),
+    fields: Optional[str] = Query(None, description="Clause fields to return, e.g. id,risk,urdu"),
+    compact: bool = Query(False, description="Deduplicate tooltips into a top-level list"),
+    format: Optional[str] = Query(None, pattern="^(json|msgpack)$"),
+):
     if not file:
         raise HTTPException(status_code=400, detail="No file provided")
 
-    if file.size and file.size > 10 * 1024 * 1024:
-        raise HTTPException(status_code=413, detail="File exceeds 10MB limit")
+    # Validate the requested encoding before doing any work
+    clause_fields = parse_fields(fields)
+    response_format = negotiate_format(request, format)
 
     try:
-        text = await extract_text(file)
-        clauses_text = split_clauses(text)
+        with timed("extract_text"):
+            text = await extract_text(file)
+        with timed("split_clauses"):
+            clauses_text = split_clauses(text)
 
         if not clauses_text:
             raise HTTPException(status_code=400, detail="Could not extract clauses")
 
         document_id = str(uuid.uuid4())
+        set_document(document_id)
 
-        # Classify all clauses (sync, fast)
-        classified = [
-            (i, clause, *classify_risk(clause))
-            for i, clause in enumerate(clauses_text, start=1)
-        ]
+        # Classify all clauses in one batch (sync, fast)
+        with timed("classify_risk"):
+            classified = [
+                (i, clause, *labels)
+                for i, (clause, labels) in enumerate(zip(clauses_text, classify_batch(clauses_text)), start=1)
+            ]
 
         # Generate Urdu explanations concurrently
         async def process_one(i, clause, risk_level, clause_type):
@@ -51,29 +76,53 @@ async def analyze_document(file: UploadFile = File(...)):
             for i, clause, risk_level, clause_type in classified
         ]))
 
+        # Whole-document Urdu summary from the explanations, while indexing runs
+        summary_task = asyncio.ensure_future(summarize_document(results))
+
         # Create FAISS index
         index_data = [
             {"id": r["id"], "type": r["type"], "risk": r["risk"],
              "original": r["original"], "urdu": r["urdu"]}
             for r in results
         ]
-        create_index(document_id, index_data)
+        try:
+            with timed("create_index"):
+                await run_in_executor(None, create_index, document_id, index_data)
+        except BaseException:
+            summary_task.cancel()
+            raise
+
+        with timed("summarize"):
+            summary_urdu, summary_pending = await _wait_for_summary(
+                document_id, summary_task, fallback_summary(results)
+            )
+
+        # Answer the standard questions for this kind of document in the background
+        schedule_precompute(document_id, index_data)
 
         high_risk   = sum(1 for r in results if r["risk"] == "high")
         medium_risk = sum(1 for r in results if r["risk"] == "medium")
         safe_risk   = len(results) - high_risk - medium_risk
 
-        return {
+        payload = {
             "document_id": document_id,
             "document_name": file.filename or "document",
             "clauses": results,
+            "summary_urdu": summary_urdu,
+            # True when summary_urdu is the count-based stand-in and the full
+            # summary is still being written (it appears in the PDF report)
+            "summary_pending": summary_pending,
             "summary": {
                 "total_clauses": len(results),
                 "high_risk": high_risk,
                 "medium_risk": medium_risk,
                 "safe_risk": safe_risk
-            }
+            },
+            # Time spent waiting for an admission slot (core/admission.py)
+            "queue_wait_ms": getattr(request.state, "queue_wait_ms", 0.0)
         }
+        return encode_response(request, shape_clauses(payload, clause_fields, compact),
+                               route="/api/analyze", fmt=response_format)
 
     except HTTPException:
         raise
@@ -83,6 +132,41 @@ async def analyze_document(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)[:200]}")
 
 
+async def _wait_for_summary(document_id: str, summary_task: asyncio.Task, fallback: str) -> tuple:
+    """
+    (summary, pending), with the summary stored in info.json. If it is not
+    ready within SUMMARY_WAIT_SECONDS, `fallback` is stored and returned and
+    a background task replaces it once the summary is done.
+    """
+    try:
+        summary = await asyncio.wait_for(asyncio.shield(summary_task), SUMMARY_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        # Stored before the late task starts, so it can never overwrite the summary
+        await run_in_executor(None, write_info, document_id, {"summary_urdu": fallback})
+        # A fresh context: the task outlives the request and must not add to its timings
+        task = asyncio.get_running_loop().create_task(
+            _store_late_summary(document_id, summary_task), context=contextvars.Context()
+        )
+        _summary_tasks.add(task)
+        task.add_done_callback(_summary_tasks.discard)
+        return fallback, True
+    except asyncio.CancelledError:
+        summary_task.cancel()
+        raise
+    await run_in_executor(None, write_info, document_id, {"summary_urdu": summary})
+    return summary, False
+
+
+async def _store_late_summary(document_id: str, summary_task: asyncio.Task):
+    try:
+        summary = await summary_task
+    except Exception as e:
+        print(f"[analyze] {document_id[:8]}: summary failed ({e})")
+        return
+    await run_in_executor(None, write_info, document_id, {"summary_urdu": summary})
+    print(f"[analyze] {document_id[:8]}: summary stored after the response")
+
+
 def _get_tooltip(risk_level: str, clause_type: str):
     tooltips = {
         ("high", "Termination"):         "Landlord can evict with minimal notice. Negotiate for 60+ days.",
@@ -0,0 +1,114 @@
+"""
+api/compare.py
+
+Clause-by-clause comparison of two analyzed documents, e.g. a landlord's
+draft against a standard template, or two competing job offers.
+"""
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Optional
+from core.compare import similarity_matrix, align, is_riskier
+from core.embeddings import embed_joint
+from core.metrics import timed, run_in_executor
+from core.rag import load_document
+from core.vectorstore import read_info
+import os
+
+router = APIRouter()
+
+# Aligned clauses less similar than this are reported as missing / added
+COMPARE_MIN_SIMILARITY = float(os.getenv("COMPARE_MIN_SIMILARITY", "0.5"))
+
+_CLAUSE_FIELDS = ("id", "type", "risk", "original", "urdu")
+
+
+class CompareRequest(BaseModel):
+    base_document_id: str
+    other_document_id: str
+    min_similarity: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+@router.post("/compare")
+async def compare_documents(req: CompareRequest):
+    """
+    Align the clauses of `other` (e.g. the draft) to those of `base` (e.g. the
+    template) and report clauses missing from other, added in other, and
+    matched clauses whose risk is higher in other, with Urdu explanations.
+    """
+    if not req.base_document_id or not req.other_document_id:
+        raise HTTPException(status_code=400, detail="base_document_id and other_document_id are required")
+
+    threshold = COMPARE_MIN_SIMILARITY if req.min_similarity is None else req.min_similarity
+
+    try:
+        with timed("compare"):
+            return await run_in_executor(
+                None, _compare, req.base_document_id, req.other_document_id, threshold
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)[:200]}")
+
+
+def _compare(base_id: str, other_id: str, threshold: float) -> dict:
+    base_vectors, base_clauses, other_vectors, other_clauses, embedding = _load_pair(base_id, other_id)
+
+    similarity = similarity_matrix(base_vectors, other_vectors)
+    pairs, missing, added = align(similarity, threshold)
+
+    riskier = [
+        {
+            "similarity": round(score, 4),
+            "base": _clause(base_clauses[i]),
+            "other": _clause(other_clauses[j]),
+        }
+        for i, j, score in pairs
+        if is_riskier(base_clauses[i], other_clauses[j])
+    ]
+
+    return {
+        "base_document_id": base_id,
+        "other_document_id": other_id,
+        "embedding": embedding,
+        "min_similarity": threshold,
+        "summary": {
+            "base_clauses": len(base_clauses),
+            "other_clauses": len(other_clauses),
+            "matched": len(pairs),
+            "missing": len(missing),
+            "added": len(added),
+            "riskier": len(riskier),
+        },
+        "matched": [
+            {"base_id": base_clauses[i]["id"], "other_id": other_clauses[j]["id"],
+             "similarity": round(score, 4)}
+            for i, j, score in pairs
+        ],
+        "missing": [_clause(base_clauses[i]) for i in missing],
+        "added": [_clause(other_clauses[j]) for j in added],
+        "riskier": riskier,
+    }
+
+
+def _load_pair(base_id: str, other_id: str) -> tuple:
+    """
+    Stored clause vectors of both documents. Vectors are only comparable when
+    both were embedded in the same space; otherwise both documents' clauses
+    are re-embedded together with a vectorizer fitted on their union.
+    """
+    base_index, base_clauses, _ = load_document(base_id)
+    other_index, other_clauses, _ = load_document(other_id)
+
+    base_space = read_info(base_id).get("embedding_space")
+    if base_space and base_space == read_info(other_id).get("embedding_space"):
+        return (base_index.reconstruct_n(0, base_index.ntotal), base_clauses,
+                other_index.reconstruct_n(0, other_index.ntotal), other_clauses, "stored")
+
+    vectors = embed_joint([c["original"] for c in base_clauses] + [c["original"] for c in other_clauses])
+    return (vectors[:len(base_clauses)], base_clauses,
+            vectors[len(base_clauses):], other_clauses, "re-embedded")
+
+
+def _clause(clause: dict) -> dict:
+    return {k: clause.get(k) for k in _CLAUSE_FIELDS}
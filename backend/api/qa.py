@@ -1,44 +1,31 @@
 """
 api/qa.py
 
-Uses same priority as urdu_explainer.py:
+Uses the shared providers in core/llm.py (same priority as urdu_explainer.py):
 1. Groq (free, fast)
 2. Gemini (backup)
+
+Single questions are answered by services/qa_answerer.py, which the
+background precompute (services/precompute.py) shares.
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from core.rag import retrieve
-from core.prompts import qa_prompt
-from dotenv import load_dotenv
+from typing import List
+from core.rag import retrieve_many
+from core.prompts import qa_batch_prompt, estimate_tokens
+from core.metrics import timed
+from core.ledger import set_document
+from core.llm import complete
+from services.precompute import lookup_precomputed
+from services.qa_answerer import answer_question, no_clauses_answer, parse_qa_response, unavailable_answer
 import asyncio
 import os
 import re
 
-load_dotenv()
-
-GROQ_API_KEY   = os.getenv("GROQ_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-_groq_client   = None
-_gemini_client = None
-_GEMINI_CONFIG = None
-
-if GROQ_API_KEY:
-    try:
-        from groq import Groq
-        _groq_client = Groq(api_key=GROQ_API_KEY)
-    except Exception:
-        pass
-
-if GEMINI_API_KEY:
-    try:
-        from google import genai
-        from google.genai import types as genai_types
-        _gemini_client = genai.Client(api_key=GEMINI_API_KEY)
-        _GEMINI_CONFIG = genai_types.GenerateContentConfig(
-            max_output_tokens=400, temperature=0.3)
-    except Exception:
-        pass
+# Batch Q&A limits: questions per request and prompt tokens per LLM call
+MAX_BATCH_QUESTIONS   = 25
+BATCH_PROMPT_TOKENS   = int(os.getenv("QA_BATCH_PROMPT_TOKENS", "3000"))
+BATCH_ANSWER_TOKENS   = 300
 
 router = APIRouter()
 
@@ -46,6 +33,13 @@ router = APIRouter()
 class QARequest(BaseModel):
     question: str
     document_id: str
+    include_urdu: bool = False
+
+
+class QABatchRequest(BaseModel):
+    questions: List[str]
+    document_id: str
+    include_urdu: bool = False
 
 
 @router.post("/qa")
@@ -53,43 +47,18 @@ async def ask_question(req: QARequest):
     if not req.question or not req.document_id:
         raise HTTPException(status_code=400, detail="question and document_id are required")
 
-    try:
-        chunks = retrieve(req.document_id, req.question, top_k=3)
+    set_document(req.document_id)
 
-        if not chunks:
-            return {
-                "answer_en": "No relevant clauses found in the document for this question.",
-                "answer_ur": "آپ کے سوال کے لیے دستاویز میں متعلقہ شق نہیں ملی۔",
-                "source_clause": None,
-                "confidence": 0.0
-            }
-
-        prompt = qa_prompt(req.question, chunks)
-        response_text = None
-
-        # Try Groq first
-        if _groq_client:
-            response_text = await _call_groq(prompt)
-
-        # Fallback to Gemini
-        if not response_text and _gemini_client:
-            response_text = await _call_gemini(prompt)
+    try:
+        # Standard questions answered in the background after analysis
+        if not req.include_urdu:
+            answer = lookup_precomputed(req.document_id, req.question)
+            if answer is not None:
+                # No LLM call was made for this request
+                return {**answer, "prompt_tokens": 0, "precomputed": True}
 
-        if not response_text:
-            return {
-                "answer_en": "AI service temporarily unavailable. Check your API keys in .env",
-                "answer_ur": "AI سروس عارضی طور پر دستیاب نہیں۔ .env فائل میں API key چیک کریں۔",
-                "source_clause": f"Clause {chunks[0]['id']} - {chunks[0]['type']}" if chunks else None,
-                "confidence": 0.0
-            }
-
-        answer_en, answer_ur, source, confidence = _parse_qa_response(response_text, chunks)
-        return {
-            "answer_en": answer_en,
-            "answer_ur": answer_ur,
-            "source_clause": source,
-            "confidence": confidence
-        }
+        return {**await answer_question(req.document_id, req.question, req.include_urdu),
+                "precomputed": False}
 
     except HTTPException:
         raise
@@ -97,65 +66,141 @@ async def ask_question(req: QARequest):
         raise HTTPException(status_code=500, detail=f"Q&A failed: {str(e)[:200]}")
 
 
-async def _call_groq(prompt: str):
-    try:
-        loop = asyncio.get_event_loop()
-        resp = await loop.run_in_executor(None, lambda: _groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=400,
-            temperature=0.3,
-        ))
-        text = resp.choices[0].message.content
-        return text.strip() if text and text.strip() else None
-    except Exception as e:
-        print(f"[qa] Groq failed: {e}")
-        return None
+@router.post("/qa/batch")
+async def ask_questions(req: QABatchRequest):
+    """
+    Answer a checklist of questions about one document.
 
+    All questions are retrieved in one batched FAISS search, the union of
+    retrieved clauses is deduplicated and questions sharing context are packed
+    into as few LLM calls as BATCH_PROMPT_TOKENS allows.
+    """
+    questions = [q.strip() for q in req.questions if q and q.strip()]
+    if not questions or not req.document_id:
+        raise HTTPException(status_code=400, detail="questions and document_id are required")
 
-async def _call_gemini(prompt: str):
-    try:
-        loop = asyncio.get_event_loop()
-        resp = await loop.run_in_executor(None, lambda: _gemini_client.models.generate_content(
-            model="gemini-2.0-flash-lite",
-            contents=prompt,
-            config=_GEMINI_CONFIG,
-        ))
-        if resp and resp.text and resp.text.strip():
-            return resp.text.strip()
-        return None
-    except Exception as e:
-        print(f"[qa] Gemini failed: {e}")
-        return None
+    if len(questions) > MAX_BATCH_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_QUESTIONS} questions per batch"
+        )
 
+    set_document(req.document_id)
 
-def _parse_qa_response(response_text: str, chunks: list) -> tuple:
     try:
-        en_match   = re.search(r'\[ENGLISH\](.*?)\[URDU\]',      response_text, re.DOTALL)
-        ur_match   = re.search(r'\[URDU\](.*?)\[SOURCE\]',       response_text, re.DOTALL)
-        src_match  = re.search(r'\[SOURCE\](.*?)\[CONFIDENCE\]', response_text, re.DOTALL)
-        conf_match = re.search(r'\[CONFIDENCE\](.*?)$',           response_text, re.DOTALL)
-
-        answer_en = en_match.group(1).strip()  if en_match  else response_text[:300]
-        answer_ur = ur_match.group(1).strip()  if ur_match  else "جواب دستیاب نہیں۔"
-        source    = src_match.group(1).strip() if src_match else (
-            f"Clause {chunks[0]['id']} - {chunks[0]['type']}" if chunks else None
+        with timed("retrieve"):
+            chunks_per_question = retrieve_many(req.document_id, questions, top_k=3)
+
+        answers = [None] * len(questions)
+        for qi, chunks in enumerate(chunks_per_question):
+            if not chunks:
+                answers[qi] = no_clauses_answer()
+
+        groups = _pack_questions(questions, chunks_per_question, req.include_urdu)
+        group_results = await asyncio.gather(*[
+            _answer_group(questions, chunks_per_question, group, req.include_urdu)
+            for group in groups
+        ])
+
+        prompt_tokens = 0
+        for group, (parsed, group_tokens) in zip(groups, group_results):
+            prompt_tokens += group_tokens
+            for qi, answer in zip(group, parsed):
+                answers[qi] = answer
+
+        return {
+            "document_id": req.document_id,
+            "answers": [
+                {"question": q, **answer} for q, answer in zip(questions, answers)
+            ],
+            "llm_calls": len(groups),
+            "prompt_tokens": prompt_tokens
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch Q&A failed: {str(e)[:200]}")
+
+
+def _pack_questions(questions: list, chunks_per_question: list, include_urdu: bool = False) -> list:
+    """
+    Greedily group question indices so each group's prompt fits BATCH_PROMPT_TOKENS.
+    Questions are ordered by their retrieved clause ids first, so questions that
+    hit the same clauses land in the same group and share context.
+    """
+    order = sorted(
+        (qi for qi, chunks in enumerate(chunks_per_question) if chunks),
+        key=lambda qi: sorted(c["id"] for c in chunks_per_question[qi])
+    )
+
+    groups, current = [], []
+    for qi in order:
+        candidate = current + [qi]
+        prompt = qa_batch_prompt(
+            [questions[i] for i in candidate],
+            _union_chunks(chunks_per_question, candidate),
+            include_urdu=include_urdu
         )
-        confidence = 0.85
-        if conf_match:
-            try:
-                raw = ''.join(c for c in conf_match.group(1).strip() if c.isdigit() or c == '.')
-                val = float(raw)
-                confidence = val / 100 if val > 1 else val
-                confidence = max(0.0, min(1.0, confidence))
-            except Exception:
-                confidence = 0.85
-
-        return answer_en, answer_ur, source, confidence
-    except Exception:
-        return (
-            response_text[:300] if response_text else "Could not process the answer.",
-            "جواب دستیاب نہیں۔",
-            f"Clause {chunks[0]['id']} - {chunks[0]['type']}" if chunks else None,
-            0.5
-        )
\ No newline at end of file
+        if current and estimate_tokens(prompt) > BATCH_PROMPT_TOKENS:
+            groups.append(current)
+            current = [qi]
+        else:
+            current = candidate
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _union_chunks(chunks_per_question: list, group: list) -> list:
+    """Deduplicated clauses retrieved for a group of questions, in clause order"""
+    seen = {}
+    for qi in group:
+        for chunk in chunks_per_question[qi]:
+            seen.setdefault(chunk["id"], chunk)
+    return [seen[cid] for cid in sorted(seen)]
+
+
+async def _answer_group(questions: list, chunks_per_question: list, group: list,
+                        include_urdu: bool = False) -> tuple:
+    """
+    Answer one packed group of questions with a single LLM call.
+    Returns (answers in group order, prompt tokens)
+    """
+    prompt = qa_batch_prompt(
+        [questions[qi] for qi in group],
+        _union_chunks(chunks_per_question, group),
+        include_urdu=include_urdu
+    )
+    prompt_tokens = estimate_tokens(prompt)
+    response_text = await complete(prompt, purpose="qa_batch", stage="qa",
+                                   max_tokens=BATCH_ANSWER_TOKENS * len(group))
+
+    if not response_text:
+        return [unavailable_answer(chunks_per_question[qi]) for qi in group], prompt_tokens
+
+    # Split the response on the [Q<n>] markers and parse each section on its own
+    sections = {}
+    parts = re.split(r'\[Q(\d+)\]', response_text)
+    for n, body in zip(parts[1::2], parts[2::2]):
+        sections.setdefault(int(n), body.strip())
+
+    answers = []
+    for n, qi in enumerate(group, start=1):
+        chunks = chunks_per_question[qi]
+        if n not in sections:
+            answers.append({
+                "answer_en": "Could not process the answer.",
+                "answer_ur": "جواب دستیاب نہیں۔",
+                "source_clause": f"Clause {chunks[0]['id']} - {chunks[0]['type']}",
+                "confidence": 0.0
+            })
+            continue
+        answer_en, answer_ur, source, confidence = parse_qa_response(sections[n], chunks)
+        answers.append({
+            "answer_en": answer_en,
+            "answer_ur": answer_ur,
+            "source_clause": source,
+            "confidence": confidence
+        })
+    return answers, prompt_tokens
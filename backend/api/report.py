@@ -1,22 +1,87 @@
-from fastapi import APIRouter, Response, HTTPException
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.colors import HexColor
-from reportlab.pdfgen import canvas
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer, PageBreak
-from reportlab.lib.units import inch
+from fastapi import APIRouter, Request, Response, HTTPException
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import hashlib
+import io
+import json
 import pickle
 import os
-import tempfile
+import re
+import threading
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from core.metrics import timed, run_in_executor
+from typing import List, Dict, Optional
 
 router = APIRouter()
 
 STORAGE_PATH = "storage/faiss_indexes"
 
+# Bump when the PDF layout changes so cached reports and ETags are invalidated
+REPORT_VERSION = "4"
+
+# Rendering runs in its own small pool so it never blocks the event loop
+# or competes with LLM calls in the default executor
+REPORT_WORKERS    = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "32"))
+# Total size of the cached PDFs; the entry cap above is the secondary limit
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_report_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+
+# LRU of rendered PDFs keyed by (document_id, etag); the lock also covers
+# readers on other threads (core/memory.py)
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+_report_cache_bytes = 0
+
+# ─── PAGE LAYOUT ──────────────────────────────────────────────
+# ReportLab is imported on first render to keep it out of start-up
+PAGE_WIDTH, PAGE_HEIGHT = 595.2755905511812, 841.8897637795277   # A4 in points
+MARGIN_X   = 40
+TOP_Y      = PAGE_HEIGHT - 40
+BOTTOM_Y   = 50                      # lowest baseline above the footer
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN_X
+
+COLOR_HIGH   = "#b83232"
+COLOR_MEDIUM = "#c47c1a"
+COLOR_SAFE   = "#2a7a4a"
+COLOR_GOLD   = "#b8892a"
+COLOR_INK    = "#111418"
+COLOR_MUTED  = "#7a7265"
+COLOR_RULE   = "#e2d9c8"
+
+# ─── URDU FONT ────────────────────────────────────────────────
+# TrueType fonts with Arabic-script glyphs, best first. ReportLab embeds the
+# font but applies no OpenType shaping, so text is pre-shaped with
+# arabic-reshaper + python-bidi; fonts that map the Arabic presentation forms
+# (Naskh, DejaVu, Arial) therefore render better than pure Nastaliq fonts.
+# backend/assets/fonts/ is checked before the system paths. Without any of
+# them the report says so in place of each Urdu text.
+ASSETS_FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "fonts")
+URDU_FONT_PATHS = [
+    os.getenv("REPORT_URDU_FONT", ""),
+    os.path.join(ASSETS_FONT_DIR, "NotoNaskhArabic-Regular.ttf"),
+    os.path.join(ASSETS_FONT_DIR, "NotoNastaliqUrdu-Regular.ttf"),
+    "fonts/NotoNaskhArabic-Regular.ttf",
+    "fonts/NotoNastaliqUrdu-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoNaskhArabic-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoNastaliqUrdu-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+]
+URDU_FONT_NAME = "LegalEaseUrdu"
+URDU_OMITTED   = "[Urdu omitted: no Urdu font on the server]"
+
+_urdu_font = None
+_urdu_font_checked = False
+_urdu_font_lock = threading.Lock()
+
+_RTL_RE = re.compile(r"[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]")
+
 @router.get("/report/{document_id}")
-async def generate_report(document_id: str):
+async def generate_report(document_id: str, request: Request):
     """
     Generate a comprehensive PDF report of all analyzed clauses.
     
@@ -25,8 +90,13 @@ async def generate_report(document_id: str):
     - Risk summary table
     - Color-coded rows based on risk level
     - Urdu explanations
+
+    Rendered reports are cached by document_id and a hash of the stored
+    metadata (clauses and document info), which is also the ETag: a matching
+    If-None-Match returns 304.
     """
     meta_path = os.path.join(STORAGE_PATH, str(document_id), "meta.pkl")
+    info_path = os.path.join(STORAGE_PATH, str(document_id), "info.json")
     
     if not os.path.exists(meta_path):
         raise HTTPException(
@@ -35,22 +105,44 @@ async def generate_report(document_id: str):
         )
     
     try:
-        # Load clause metadata
-        with open(meta_path, "rb") as f:
-            clauses = pickle.load(f)
-        
-        if not clauses:
-            raise HTTPException(status_code=400, detail="No clauses found in document")
-        
-        # Generate PDF
-        pdf_buffer = _generate_pdf(clauses, document_id)
-        
+        # Load clause metadata and derive the ETag from its content
+        meta_bytes = await run_in_executor(_report_executor, _read_bytes, meta_path, name="report")
+        info_bytes = await run_in_executor(_report_executor, _read_bytes, info_path, name="report")
+        etag = _report_etag(meta_bytes, info_bytes)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
+            "Content-Disposition": f"attachment; filename=LegalEase_Report_{document_id[:8]}.pdf"
+        }
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        cache_key = (document_id, etag)
+        with _report_cache_lock:
+            pdf_bytes = _report_cache.get(cache_key)
+            if pdf_bytes is not None:
+                _report_cache.move_to_end(cache_key)
+
+        if pdf_bytes is None:
+            clauses = pickle.loads(meta_bytes)
+            info = json.loads(info_bytes) if info_bytes else {}
+
+            if not clauses:
+                raise HTTPException(status_code=400, detail="No clauses found in document")
+
+            # Generate PDF off the event loop
+            with timed("generate_pdf"):
+                pdf_bytes = await run_in_executor(
+                    _report_executor, _generate_pdf, clauses, document_id,
+                    info.get("summary_urdu"), name="report"
+                )
+            _cache_report(cache_key, pdf_bytes)
+
         return Response(
-            pdf_buffer,
+            pdf_bytes,
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=LegalEase_Report_{document_id[:8]}.pdf"
-            }
+            headers=headers
         )
         
     except HTTPException:
@@ -61,102 +153,244 @@ async def generate_report(document_id: str):
             detail=f"PDF generation failed: {str(e)[:100]}"
         )
 
-def _generate_pdf(clauses: List[Dict], document_id: str) -> bytes:
+
+def _cache_report(cache_key: tuple, pdf_bytes: bytes):
+    """Add a rendered PDF, evicting the oldest beyond REPORT_CACHE_MAX_BYTES or REPORT_CACHE_SIZE"""
+    global _report_cache_bytes
+    if len(pdf_bytes) > REPORT_CACHE_MAX_BYTES:
+        return
+    with _report_cache_lock:
+        old = _report_cache.pop(cache_key, None)
+        _report_cache_bytes -= len(old) if old is not None else 0
+        _report_cache[cache_key] = pdf_bytes
+        _report_cache_bytes += len(pdf_bytes)
+        while len(_report_cache) > REPORT_CACHE_SIZE or _report_cache_bytes > REPORT_CACHE_MAX_BYTES:
+            _, evicted = _report_cache.popitem(last=False)
+            _report_cache_bytes -= len(evicted)
+
+
+def _read_bytes(path: str) -> bytes:
+    """File contents, b"" if it does not exist"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
+
+
+def _report_etag(meta_bytes: bytes, info_bytes: bytes = b"") -> str:
+    digest = hashlib.sha256(
+        REPORT_VERSION.encode() + b"\0" + meta_bytes + b"\0" + info_bytes
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header (possibly a list or weak tags) against an ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _get_urdu_font():
+    """Register the first available Urdu-capable font once. Returns its name or None."""
+    global _urdu_font, _urdu_font_checked
+    with _urdu_font_lock:
+        if _urdu_font_checked:
+            return _urdu_font
+        _urdu_font_checked = True
+
+        try:
+            import arabic_reshaper  # noqa: F401
+            import bidi  # noqa: F401
+        except ImportError:
+            print("[report] arabic-reshaper / python-bidi not installed → Urdu omitted from PDF")
+            return None
+
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        for path in URDU_FONT_PATHS:
+            if path and os.path.exists(path):
+                try:
+                    pdfmetrics.registerFont(TTFont(URDU_FONT_NAME, path))
+                    _urdu_font = URDU_FONT_NAME
+                    print(f"[report] Urdu font: {path}")
+                    break
+                except Exception as e:
+                    print(f"[report] Could not load font {path}: {e}")
+
+        if not _urdu_font:
+            print("[report] WARNING: no Urdu font found → Urdu is omitted from reports. "
+                  "Put a Naskh/Nastaliq .ttf in backend/assets/fonts/ or set REPORT_URDU_FONT")
+        return _urdu_font
+
+
+@lru_cache(maxsize=512)
+def _shape_rtl(text: str, font: str, size: float, width: float) -> tuple:
     """
-    Generate PDF report using ReportLab.
-    Works cross-platform (Windows, Linux, macOS).
+    Wrap Urdu text to `width` and return each line shaped in visual (RTL) order.
+    Cached because fallback explanations repeat across clauses and reports.
     """
-    # Use platform-independent temp directory
-    temp_dir = tempfile.gettempdir()
-    pdf_path = os.path.join(temp_dir, f"legalease_{document_id}.pdf")
-    
+    from arabic_reshaper import reshape
+    from bidi.algorithm import get_display
+    from reportlab.lib.utils import simpleSplit
+    return tuple(get_display(line) for line in simpleSplit(reshape(text), font, size, width))
+
+
+@lru_cache(maxsize=None)
+def _color(hex_color: str):
+    """ReportLab colour object for a hex string, parsed once"""
+    from reportlab.lib.colors import HexColor
+    return HexColor(hex_color)
+
+
+class _ReportWriter:
+    """
+    Line-by-line canvas writer that handles page breaks, running headers and
+    "Page N of M" footers. Pages are finished as soon as they fill up, with
+    page compression on, so memory stays proportional to the compressed PDF
+    rather than to the laid-out clauses.
+    """
+
+    def __init__(self, buffer, document_id: str):
+        from reportlab.pdfgen import canvas
+        self.c = canvas.Canvas(buffer, pagesize=(PAGE_WIDTH, PAGE_HEIGHT), pageCompression=1)
+        self.document_id = document_id
+        self.page = 1
+        self.y = TOP_Y
+
+    def ensure(self, height: float):
+        """Start a new page unless `height` points fit above the footer"""
+        if self.y - height < BOTTOM_Y:
+            self.new_page()
+
+    def new_page(self):
+        self._footer()
+        self.c.showPage()
+        self.page += 1
+        self.y = TOP_Y
+        self.c.setFont("Helvetica", 8)
+        self.c.setFillColor(_color(COLOR_MUTED))
+        self.c.drawString(MARGIN_X, self.y, f"LegalEase AI – Report {self.document_id[:8]}")
+        self.y -= 20
+
+    def text(self, text: str, font: str = "Helvetica", size: float = 9,
+             leading: float = 12, color=COLOR_INK, indent: float = 0):
+        """Draw wrapped left-to-right text"""
+        from reportlab.lib.utils import simpleSplit
+        for line in simpleSplit(text, font, size, TEXT_WIDTH - indent) or [""]:
+            self.ensure(leading)
+            self.c.setFont(font, size)
+            self.c.setFillColor(_color(color))
+            self.c.drawString(MARGIN_X + indent, self.y, line)
+            self.y -= leading
+
+    def rtl_text(self, text: str, font: str, size: float = 10,
+                 leading: float = 16, color=COLOR_INK):
+        """Draw wrapped, shaped right-to-left text aligned to the right margin"""
+        for line in _shape_rtl(text, font, size, TEXT_WIDTH):
+            self.ensure(leading)
+            self.c.setFont(font, size)
+            self.c.setFillColor(_color(color))
+            self.c.drawRightString(PAGE_WIDTH - MARGIN_X, self.y, line)
+            self.y -= leading
+
+    def rule(self, gap: float = 8):
+        self.ensure(gap)
+        self.c.setStrokeColor(_color(COLOR_RULE))
+        self.c.setLineWidth(0.5)
+        self.c.line(MARGIN_X, self.y + gap / 2, PAGE_WIDTH - MARGIN_X, self.y + gap / 2)
+        self.y -= gap
+
+    def finish(self):
+        self._footer()
+        self.c.showPage()
+        # The total page count is only known now; every footer references this form
+        self.c.beginForm("page_total")
+        self.c.setFont("Helvetica", 8)
+        self.c.setFillColor(_color(COLOR_MUTED))
+        self.c.drawString(0, 0, str(self.page))
+        self.c.endForm()
+        self.c.save()
+
+    def _footer(self):
+        from reportlab.pdfbase import pdfmetrics
+        self.c.setFont("Helvetica", 8)
+        self.c.setFillColor(_color(COLOR_MUTED))
+        self.c.drawString(MARGIN_X, 20, "LegalEase AI – Urdu Legal Document Assistant for Pakistani Citizens")
+        label = f"Page {self.page} of "
+        x = PAGE_WIDTH - MARGIN_X - 40
+        self.c.drawString(x, 20, label)
+        self.c.saveState()
+        self.c.translate(x + pdfmetrics.stringWidth(label, "Helvetica", 8), 20)
+        self.c.doForm("page_total")
+        self.c.restoreState()
+
+
+def _generate_pdf(clauses: List[Dict], document_id: str, summary_urdu: Optional[str] = None) -> bytes:
+    """
+    Generate the full PDF report using ReportLab into an in-memory buffer:
+    summary statistics, the Urdu document summary, then every clause with its type, risk, original text
+    and Urdu explanation, across as many numbered pages as needed.
+    Synchronous and CPU-bound: call it from the report executor.
+    """
+    buffer = io.BytesIO()
+    urdu_font = _get_urdu_font()
+
     try:
-        # Create PDF
-        c = canvas.Canvas(pdf_path, pagesize=A4)
-        width, height = A4
-        
-        # Color scheme
-        COLOR_HIGH = HexColor("#b83232")
-        COLOR_MEDIUM = HexColor("#c47c1a")
-        COLOR_SAFE = HexColor("#2a7a4a")
-        COLOR_GOLD = HexColor("#b8892a")
-        COLOR_INK = HexColor("#111418")
-        
-        y = height - 40
-        
+        w = _ReportWriter(buffer, document_id)
+        c = w.c
+
         # ─── HEADER ───────────────────────────────────────
         c.setFont("Helvetica-Bold", 20)
-        c.setFillColor(COLOR_INK)
-        c.drawString(40, y, "LegalEase AI – Legal Risk Analysis Report")
-        y -= 25
-        
+        c.setFillColor(_color(COLOR_INK))
+        c.drawString(MARGIN_X, w.y, "LegalEase AI – Legal Risk Analysis Report")
+        w.y -= 25
+
         # Subheader
-        c.setFont("Helvetica", 10)
-        c.setFillColor(HexColor("#7a7265"))
-        c.drawString(40, y, f"Generated: {datetime.now().strftime('%d %B %Y at %H:%M:%S')}")
-        y -= 15
-        c.drawString(40, y, f"Document ID: {document_id[:8]}")
-        y -= 30
-        
+        w.text(f"Generated: {datetime.now().strftime('%d %B %Y at %H:%M:%S')}",
+               size=10, leading=15, color=COLOR_MUTED)
+        w.text(f"Document ID: {document_id[:8]}", size=10, leading=15, color=COLOR_MUTED)
+        if not urdu_font:
+            w.text("Urdu explanations are omitted from this report: the server has no Urdu font. "
+                   "They are shown in full in the web app.", size=9, color=COLOR_HIGH)
+        w.y -= 15
+
         # ─── SUMMARY STATS ───────────────────────────────
-        high_count = sum(1 for c in clauses if c.get("risk") == "high")
-        med_count = sum(1 for c in clauses if c.get("risk") == "medium")
+        high_count = sum(1 for cl in clauses if cl.get("risk") == "high")
+        med_count = sum(1 for cl in clauses if cl.get("risk") == "medium")
         safe_count = len(clauses) - high_count - med_count
-        
-        c.setFont("Helvetica-Bold", 11)
-        c.setFillColor(COLOR_INK)
-        c.drawString(40, y, "Summary Statistics")
-        y -= 15
-        
-        c.setFont("Helvetica", 10)
-        c.setFillColor(COLOR_HIGH)
-        c.drawString(50, y, f"● High Risk Clauses: {high_count}")
-        y -= 12
-        
-        c.setFillColor(COLOR_MEDIUM)
-        c.drawString(50, y, f"● Medium Risk Clauses: {med_count}")
-        y -= 12
-        
-        c.setFillColor(COLOR_SAFE)
-        c.drawString(50, y, f"● Safe Clauses: {safe_count}")
-        y -= 12
-        
-        c.setFillColor(COLOR_INK)
-        c.drawString(50, y, f"● Total Clauses: {len(clauses)}")
-        y -= 30
-        
-        # ─── CLAUSES TABLE ────────────────────────────────
-        c.setFont("Helvetica-Bold", 11)
-        c.setFillColor(COLOR_INK)
-        c.drawString(40, y, "Detailed Clause Analysis")
-        y -= 20
-        
-        # Table headers
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(40, y, "ID")
-        c.drawString(70, y, "Type")
-        c.drawString(220, y, "Risk")
-        c.drawString(300, y, "Status")
-        y -= 12
-        
-        # Separator line
-        c.setStrokeColor(HexColor("#e2d9c8"))
-        c.setLineWidth(0.5)
-        c.line(40, y, 570, y)
-        y -= 8
-        
-        # ─── CLAUSES LIST ─────────────────────────────────
-        c.setFont("Helvetica", 9)
-        
+
+        w.text("Summary Statistics", font="Helvetica-Bold", size=11, leading=15)
+        w.text(f"● High Risk Clauses: {high_count}", size=10, color=COLOR_HIGH, indent=10)
+        w.text(f"● Medium Risk Clauses: {med_count}", size=10, color=COLOR_MEDIUM, indent=10)
+        w.text(f"● Safe Clauses: {safe_count}", size=10, color=COLOR_SAFE, indent=10)
+        w.text(f"● Total Clauses: {len(clauses)}", size=10, indent=10)
+        w.y -= 18
+
+        # ─── DOCUMENT SUMMARY ────────────────────────────
+        summary_urdu = " ".join((summary_urdu or "").split())
+        if summary_urdu:
+            w.text("Document Summary", font="Helvetica-Bold", size=11, leading=15)
+            _urdu(w, summary_urdu, urdu_font)
+            w.y -= 18
+
+        # ─── CLAUSES ──────────────────────────────────────
+        w.text("Detailed Clause Analysis", font="Helvetica-Bold", size=11, leading=15)
+        w.rule()
+
         for idx, clause in enumerate(clauses, start=1):
-            if y < 80:  # New page if too close to bottom
-                c.showPage()
-                y = height - 40
-            
             clause_id = clause.get("id", idx)
             clause_type = clause.get("type", "General")
             risk = clause.get("risk", "unknown")
-            
+            original = " ".join((clause.get("original") or "").split())
+            urdu = " ".join((clause.get("urdu") or "").split())
+
             # Risk color
             if risk == "high":
                 color = COLOR_HIGH
@@ -164,37 +398,38 @@ def _generate_pdf(clauses: List[Dict], document_id: str) -> bytes:
                 color = COLOR_MEDIUM
             else:
                 color = COLOR_SAFE
-            
-            # Draw row
-            c.setFillColor(color)
-            c.drawString(40, y, f"{clause_id}")
-            c.drawString(70, y, clause_type[:20])
-            c.drawString(220, y, risk.upper())
-            c.drawString(300, y, "⚠" if risk == "high" else ("!" if risk == "medium" else "✓"))
-            
-            y -= 12
-        
-        y -= 15
-        
-        # ─── FOOTER ───────────────────────────────────────
-        c.setFont("Helvetica", 8)
-        c.setFillColor(HexColor("#7a7265"))
-        c.drawString(40, 20, "LegalEase AI – Urdu Legal Document Assistant for Pakistani Citizens")
-        c.drawString(width - 100, 20, f"Page 1")
-        
-        # Save PDF
-        c.save()
-        
-        # Read PDF as bytes
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
-        
-        return pdf_bytes
-        
+
+            # Keep the clause heading together with its first lines
+            w.ensure(14 + 2 * 12)
+            c.setFillColor(_color(color))
+            c.rect(MARGIN_X, w.y - 2, 3, 11, fill=1, stroke=0)
+            w.text(f"Clause {clause_id} | {clause_type} | {risk.upper()} RISK",
+                   font="Helvetica-Bold", size=10, leading=14, color=color, indent=8)
+
+            if original:
+                if _RTL_RE.search(original):
+                    _urdu(w, original, urdu_font, size=9, leading=15)
+                else:
+                    w.text(original, indent=8)
+
+            if urdu:
+                w.y -= 3
+                _urdu(w, urdu, urdu_font, color=COLOR_GOLD if risk == "high" else COLOR_INK)
+
+            w.y -= 4
+            w.rule(gap=10)
+
+        w.finish()
+        return buffer.getvalue()
+
     finally:
-        # Clean up
-        if os.path.exists(pdf_path):
-            try:
-                os.remove(pdf_path)
-            except:
-                pass
\ No newline at end of file
+        buffer.close()
+
+
+def _urdu(w: _ReportWriter, text: str, font: Optional[str], size: float = 10,
+          leading: float = 16, color=COLOR_INK):
+    """Urdu text, or the URDU_OMITTED marker when no Urdu font is available"""
+    if font:
+        w.rtl_text(text, font, size=size, leading=leading, color=color)
+    else:
+        w.text(URDU_OMITTED, size=8, color=COLOR_MUTED, indent=8)
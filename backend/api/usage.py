@@ -0,0 +1,27 @@
+"""
+api/usage.py
+
+Aggregates over the LLM usage ledger (core/ledger.py) for cost and
+capacity planning. Token and cost data is operator-only: like the admin
+diagnostics, every call needs X-Admin-Token.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from api.admin import require_admin
+from core.ledger import document_usage, provider_usage
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/usage/documents/{document_id}")
+def usage_for_document(document_id: str):
+    """Tokens, latency and fallback paths of every LLM call made for a document"""
+    usage = document_usage(document_id)
+    if usage["calls"] == 0:
+        raise HTTPException(status_code=404, detail=f"No LLM usage recorded for document {document_id}")
+    return usage
+
+
+@router.get("/usage/providers")
+def usage_by_provider(hours: float = Query(24.0, gt=0, le=24 * 90)):
+    """Per provider/model calls, error rate, tokens and p50/p95/p99 latency over a time window"""
+    return provider_usage(hours)
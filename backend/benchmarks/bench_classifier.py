@@ -0,0 +1,76 @@
+"""
+benchmarks/bench_classifier.py
+
+Compares the clause classifier engines (services/risk_classifier.py):
+
+- accuracy of type, risk and both on the held-out "test" split of
+  models/clauses.jsonl (the shipped linear model is trained on "train" only)
+- throughput in clauses/second, classifying documents of --doc-clauses
+  clauses the way /api/analyze does (one classify_batch() call per document)
+
+With the shipped model: keyword 62.2% type / 37.8% risk / 26.7% both,
+linear 62.2% / 57.8% / 42.2% and about 10x the throughput.
+
+Run from backend/:
+  python -m benchmarks.bench_classifier
+  python -m benchmarks.bench_classifier --clauses 20000 --doc-clauses 100
+"""
+import argparse
+import time
+
+from benchmarks.corpus import generate_contract
+from models.train_classifier import load_clauses
+from services.risk_classifier import classify_batch, get_engine
+
+ENGINES = ("keyword", "linear")
+
+
+def accuracy(engine: str, rows: list) -> dict:
+    predicted = classify_batch([r["text"] for r in rows], engine=engine)
+    n = len(rows)
+    return {
+        "type": sum(p[1] == r["type"] for p, r in zip(predicted, rows)) / n,
+        "risk": sum(p[0] == r["risk"] for p, r in zip(predicted, rows)) / n,
+        "both": sum(p == (r["risk"], r["type"]) for p, r in zip(predicted, rows)) / n,
+    }
+
+
+def throughput(engine: str, clauses: list, doc_clauses: int) -> float:
+    classify_batch(clauses[:doc_clauses], engine=engine)     # load the engine first
+    start = time.perf_counter()
+    for i in range(0, len(clauses), doc_clauses):
+        classify_batch(clauses[i:i + doc_clauses], engine=engine)
+    return len(clauses) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clause classifier accuracy and throughput")
+    parser.add_argument("--clauses", type=int, default=10000, help="clauses for the throughput run")
+    parser.add_argument("--doc-clauses", type=int, default=100, help="clauses per document (batch size)")
+    args = parser.parse_args()
+
+    test = load_clauses(split="test")
+    lines = [l.split(". ", 1)[-1] for l in generate_contract(max(1, args.clauses // 20)).split("\n")
+             if l[:1].isdigit()]
+    clauses = ((lines + [r["text"] for r in load_clauses()]) * args.clauses)[:args.clauses]
+
+    print(f"accuracy on {len(test)} held-out clauses, throughput on {len(clauses)} clauses "
+          f"in documents of {args.doc_clauses}")
+    print(f"{'engine':>8} {'type':>7} {'risk':>7} {'both':>7} {'clauses/s':>11}")
+    results = {}
+    for engine in ENGINES:
+        if get_engine(engine).name != engine:
+            print(f"{engine:>8} unavailable")
+            continue
+        acc = results[engine] = accuracy(engine, test)
+        rate = throughput(engine, clauses, args.doc_clauses)
+        print(f"{engine:>8} {acc['type']:>7.1%} {acc['risk']:>7.1%} {acc['both']:>7.1%} {rate:>11,.0f}")
+
+    if len(results) == len(ENGINES):
+        diff = {k: 100 * (results["linear"][k] - results["keyword"][k]) for k in ("type", "risk", "both")}
+        print(f"linear vs keyword: type {diff['type']:+.1f}, risk {diff['risk']:+.1f}, "
+              f"both {diff['both']:+.1f} points (CLASSIFIER_ENGINE picks the engine)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+benchmarks/bench_ocr.py
+
+Tracks scanned-PDF OCR throughput (pages/second) against worker count.
+
+Builds an image-only PDF from the synthetic contract text (like a phone
+scan: no text layer), then OCRs every page with 1, 2, 4 ... workers, each
+run against an empty cache, plus one run against the warm cache. Needs
+Tesseract with the OCR_LANGS language packs installed.
+
+Run from backend/:
+  python -m benchmarks.bench_ocr
+  python -m benchmarks.bench_ocr --pages 8 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.corpus import LINES_PER_PAGE, generate_contract
+from services.ocr import ocr_available, ocr_pdf_pages
+
+
+def scanned_pdf(path: str, pages: int, dpi: int = 150):
+    """Image-only A4 PDF of the synthetic contract, one rendered bitmap per page"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", dpi // 8)
+    except OSError:
+        font = ImageFont.load_default()
+
+    lines = generate_contract(pages).split("\n")
+    images = []
+    for p in range(pages):
+        image = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        y = dpi // 2
+        for line in lines[p * LINES_PER_PAGE:(p + 1) * LINES_PER_PAGE]:
+            draw.text((dpi // 2, y), line[:90], fill=0, font=font)
+            y += int(dpi / 4.5)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=dpi)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scanned PDF OCR throughput benchmark")
+    parser.add_argument("--pages", type=int, default=8)
+    default_workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    if not ocr_available():
+        raise SystemExit("Tesseract is not installed; nothing to benchmark")
+
+    work = tempfile.mkdtemp(prefix="bench-ocr-")
+    pdf_path = os.path.join(work, "scan.pdf")
+    scanned_pdf(pdf_path, args.pages)
+    pages = list(range(args.pages))
+
+    print(f"{os.cpu_count()} cores, {args.pages} pages")
+    print(f"{'workers':>8} {'cache':>6} {'seconds':>8} {'pages/s':>8}")
+    for workers in args.workers:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Start the workers (and their imports) before timing
+            list(pool.map(abs, range(workers)))
+            cache_dir = tempfile.mkdtemp(dir=work)
+            runs = [("cold", cache_dir), ("warm", cache_dir)] if workers == args.workers[-1] \
+                else [("cold", cache_dir)]
+            for label, cache in runs:
+                start = time.perf_counter()
+                texts = ocr_pdf_pages(pdf_path, pages, pool=pool, cache_dir=cache)
+                elapsed = time.perf_counter() - start
+                assert len(texts) == args.pages
+                print(f"{workers:>8} {label:>6} {elapsed:>8.2f} {args.pages / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+benchmarks/bench_report.py
+
+Tracks PDF report render time and peak memory against clause count.
+
+Run from backend/:
+  python -m benchmarks.bench_report
+  python -m benchmarks.bench_report --counts 10 100 1000 --repeat 3
+"""
+import argparse
+import time
+import tracemalloc
+
+from api.report import _generate_pdf
+
+_ORIGINALS = [
+    "The landlord reserves the right to terminate this agreement with 7 days written notice for any reason deemed appropriate at their sole discretion.",
+    "Late payment of monthly rent shall incur a financial penalty of five percent (5%) per week on the outstanding amount, compounded on a monthly basis.",
+    "Any disputes arising under this agreement shall be submitted exclusively to binding arbitration. The tenant hereby waives the right to pursue matters through civil courts of law.",
+    "A security deposit equivalent to two (2) months rent shall be retained by the landlord and returned within sixty (60) days of vacating, subject to deductions for damages.",
+]
+_URDU = [
+    "مالک مکان بغیر کسی خاص وجہ کے صرف 7 دن کے نوٹس پر آپ کو گھر خالی کروا سکتا ہے۔ دستخط سے پہلے اس شق پر مذاکرہ ضرور کریں۔",
+    "اگر کرایہ دیر سے دیا تو ہر ہفتے 5 فیصد جرمانہ لگے گا۔ ایک مہینے کی تاخیر بھی بڑی رقم بن سکتی ہے۔",
+    "اگر کوئی تنازعہ ہو تو آپ عدالت نہیں جا سکتے۔ یہ عام طور پر مالک مکان کے حق میں ہوتا ہے۔",
+    "دو مہینے کا ڈپازٹ واپسی کے 60 دن بعد ملے گا۔ جاتے وقت گھر کی حالت کی تصویریں ضرور لیں۔",
+]
+_RISKS = ["high", "medium", "high", "safe"]
+_TYPES = ["Termination", "Payment & Penalty", "Arbitration", "Security Deposit"]
+
+
+def synthetic_clauses(n: int) -> list:
+    """n clauses cycling through realistic text; each one made unique by its number"""
+    return [
+        {
+            "id": i,
+            "type": _TYPES[i % 4],
+            "risk": _RISKS[i % 4],
+            "original": f"{i}. {_ORIGINALS[i % 4]} {_ORIGINALS[(i + 1) % 4]}",
+            "urdu": f"{_URDU[i % 4]} شق نمبر {i}۔",
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF report render benchmark")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Warm up font registration and imports
+    _generate_pdf(synthetic_clauses(2), "warmup00")
+
+    print(f"{'clauses':>8} {'best s':>8} {'clauses/s':>10} {'pdf KB':>8} {'peak MB':>8}")
+    for n in args.counts:
+        clauses = synthetic_clauses(n)
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            pdf = _generate_pdf(clauses, "benchmark")
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        # Separate run for memory, since tracing slows rendering down
+        tracemalloc.start()
+        _generate_pdf(clauses, "benchmark")
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{n:>8} {best:>8.2f} {n / best:>10.0f} {len(pdf) / 1024:>8.0f} {peak / 2**20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+benchmarks/corpus.py
+
+Synthetic contract corpus for offline benchmarks.
+
+Generates rental-agreement style contracts of a given page count as PDF,
+DOCX and TXT. Output is deterministic for a given seed so runs stay
+comparable.
+
+Run from backend/:
+  python -m benchmarks.corpus                              # 1, 10, 100, 1000 pages
+  python -m benchmarks.corpus --pages 1 5 --formats txt pdf --out benchmarks/corpus
+"""
+import argparse
+import os
+import random
+
+LINES_PER_PAGE = 40
+
+_PARTIES = ["the Landlord", "the Tenant", "the Employer", "the Employee", "the Lessor", "the Lessee"]
+_CITIES = ["Karachi", "Lahore", "Islamabad", "Peshawar", "Quetta", "Multan"]
+
+_CLAUSES = [
+    "{a} reserves the right to terminate this agreement with {n} days written notice for any reason deemed appropriate at their sole discretion.",
+    "Late payment of monthly rent shall incur a financial penalty of {p} percent ({p}%) per week on the outstanding amount, compounded on a monthly basis.",
+    "{a} shall remain solely responsible for all structural repairs and general maintenance where the cost thereof exceeds PKR {amount}.",
+    "Any disputes arising under this agreement shall be submitted exclusively to binding arbitration in {city}. {b} hereby waives the right to pursue matters through civil courts of law.",
+    "{a} shall not be held liable for any damages to the personal property of {b} arising from structural defects, water leaks, electrical failures, or utility disruptions.",
+    "{a} reserves the right to increase the monthly rent by up to {p} percent ({p}%) annually, with {n} days advance written notice to {b}.",
+    "{b} is strictly prohibited from subletting or sharing the premises with any third party without obtaining prior written consent from {a}.",
+    "A security deposit equivalent to {m} months rent shall be retained by {a} and returned within {n} days of vacating, subject to deductions for damages.",
+    "This agreement shall be governed by the laws of Pakistan and the courts at {city} shall have exclusive jurisdiction.",
+    "{b} shall pay all utility bills including electricity, gas and water on or before the due date and provide copies of paid bills to {a} on request.",
+]
+
+
+def generate_contract(pages: int, seed: int = 0) -> str:
+    """Plain-text contract of roughly `pages` pages (LINES_PER_PAGE lines each)"""
+    rng = random.Random(seed * 100003 + pages)
+    lines = [f"RENTAL AGREEMENT - {rng.choice(_CITIES).upper()}", ""]
+    number = 1
+    while len(lines) < pages * LINES_PER_PAGE:
+        a, b = rng.sample(_PARTIES, 2)
+        clause = rng.choice(_CLAUSES).format(
+            a=a, b=b,
+            n=rng.choice([7, 15, 30, 60, 90]),
+            p=rng.choice([5, 8, 10, 15, 20]),
+            m=rng.choice([1, 2, 3]),
+            amount=f"{rng.choice([5, 10, 25, 50]) * 1000:,}",
+            city=rng.choice(_CITIES),
+        )
+        lines.append(f"{number}. {clause[0].upper()}{clause[1:]}")
+        lines.append("")
+        number += 1
+    return "\n".join(lines[: pages * LINES_PER_PAGE])
+
+
+def write_txt(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_docx(path: str, text: str):
+    import docx
+    document = docx.Document()
+    for paragraph in text.split("\n\n"):
+        document.add_paragraph(paragraph.strip())
+    document.save(path)
+
+
+def write_pdf(path: str, text: str):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(path, pagesize=A4, pageCompression=1)
+    width, height = A4
+    y = height - 50
+    for paragraph in text.split("\n"):
+        for line in simpleSplit(paragraph, "Helvetica", 10, width - 100) or [""]:
+            if y < 50:
+                c.showPage()
+                y = height - 50
+            c.setFont("Helvetica", 10)
+            c.drawString(50, y, line)
+            y -= 13
+    c.save()
+
+
+WRITERS = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def build_corpus(out_dir: str, pages=(1, 10, 100, 1000), formats=("pdf", "docx", "txt"),
+                 seed: int = 0) -> list:
+    """Write one contract per (page count, format); returns the file paths"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for n in pages:
+        text = generate_contract(n, seed)
+        for fmt in formats:
+            path = os.path.join(out_dir, f"contract_{n:04d}p.{fmt}")
+            if not os.path.exists(path):
+                WRITERS[fmt](path, text)
+            paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic contract corpus")
+    parser.add_argument("--out", default="benchmarks/corpus")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--formats", nargs="+", default=["pdf", "docx", "txt"], choices=list(WRITERS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path in build_corpus(args.out, args.pages, args.formats, args.seed):
+        print(f"{os.path.getsize(path) / 1024:>10.0f} KB  {path}")
+
+
+if __name__ == "__main__":
+    main()
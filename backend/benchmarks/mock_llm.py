@@ -0,0 +1,162 @@
+"""
+benchmarks/mock_llm.py
+
+Local stand-in for the Groq chat completions API, so benchmarks run without
+API keys or network access. Point the backend at it with:
+
+  GROQ_API_KEY=mock GROQ_BASE_URL=http://127.0.0.1:8900
+
+Latency is drawn from a log-normal distribution; a configurable share of
+calls fail with 500, and a requests-per-minute budget answers overflow with
+429 + Retry-After, like the real free tier.
+
+Run from backend/:
+  python -m benchmarks.mock_llm --port 8900 --median-ms 800 --sigma 0.4 --error-rate 0.02 --rpm 30
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_URDU_ANSWER = "یہ شق آپ کے حقوق پر اثر ڈالتی ہے۔ دستخط سے پہلے اسے غور سے پڑھیں اور ضرورت ہو تو تبدیلی کا مطالبہ کریں۔"
+
+
+class MockLLMConfig:
+    def __init__(self, median_ms: float = 800.0, sigma: float = 0.4, error_rate: float = 0.0,
+                 rpm: int = 0, seed: int = 0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rpm = rpm              # 0 = unlimited
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = []            # request timestamps within the last minute
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+    def latency(self) -> float:
+        with self.lock:
+            return self.median_ms * math.exp(self.rng.gauss(0.0, self.sigma)) / 1000.0
+
+    def admit(self) -> float:
+        """0 if the request may proceed, else seconds until a slot frees up"""
+        now = time.monotonic()
+        with self.lock:
+            self.stats["requests"] += 1
+            self.window = [t for t in self.window if now - t < 60.0]
+            if self.rpm and len(self.window) >= self.rpm:
+                self.stats["rate_limited"] += 1
+                return max(0.1, 60.0 - (now - self.window[0]))
+            self.window.append(now)
+            return 0.0
+
+    def fail(self) -> bool:
+        with self.lock:
+            failed = self.rng.random() < self.error_rate
+            self.stats["errors" if failed else "ok"] += 1
+            return failed
+
+
+def _answer(prompt: str) -> str:
+    """Reply in the format the backend parses for each prompt kind"""
+    if "[ENGLISH]" not in prompt:
+        return _URDU_ANSWER
+
+    block = (
+        "[ENGLISH]\nThe document addresses this in the clause cited below.\n\n"
+        f"[URDU]\n{_URDU_ANSWER}\n\n[SOURCE]\nClause 1 - General Clause\n\n[CONFIDENCE]\n0.8"
+    )
+    questions = set(re.findall(r"^\[Q(\d+)\]", prompt, re.MULTILINE))
+    if not questions:
+        return block
+    return "\n\n".join(f"[Q{n}]\n{block}" for n in sorted(questions, key=int))
+
+
+def make_handler(config: MockLLMConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self._json(200, config.stats)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+            retry_after = config.admit()
+            if retry_after:
+                self._json(429, {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                           {"retry-after": f"{retry_after:.0f}"})
+                return
+
+            time.sleep(config.latency())
+            if config.fail():
+                self._json(500, {"error": {"message": "mock upstream error"}})
+                return
+
+            prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+            text = _answer(prompt)
+            self._json(200, {
+                "id": f"chatcmpl-mock-{config.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4 + 1,
+                    "completion_tokens": len(text) // 4 + 1,
+                    "total_tokens": (len(prompt) + len(text)) // 4 + 2,
+                },
+            })
+
+        def _json(self, status: int, payload: dict, headers: dict = None):
+            data = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def start_mock_llm(config: MockLLMConfig, port: int = 0):
+    """Serve in a daemon thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Groq-compatible LLM server")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--median-ms", type=float, default=800.0)
+    parser.add_argument("--sigma", type=float, default=0.4, help="log-normal spread of latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429 (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockLLMConfig(args.median_ms, args.sigma, args.error_rate, args.rpm, args.seed)
+    server, url = start_mock_llm(config, args.port)
+    print(f"[mock_llm] serving on {url} (GET / for stats)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
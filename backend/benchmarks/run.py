@@ -0,0 +1,281 @@
+"""
+benchmarks/run.py
+
+Offline end-to-end benchmark for /api/analyze, /api/qa and /api/report.
+
+Builds the synthetic corpus, starts the mock LLM, starts the backend with
+uvicorn pointed at the mock (in a temporary working directory, so indexes
+and ledgers do not touch backend/storage), drives the three endpoints
+concurrently and reports per-stage (from Server-Timing) and end-to-end
+latency percentiles plus documents/minute. Results are saved as JSON under
+benchmarks/results/ so runs can be compared over time.
+
+Run from backend/:
+  python -m benchmarks.run
+  python -m benchmarks.run --pages 1 10 --formats txt pdf --iterations 3 --concurrency 4 \\
+      --median-ms 300 --error-rate 0.02 --rpm 600
+  python -m benchmarks.run --base-url http://127.0.0.1:8000   # existing server, no mock
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.corpus import build_corpus
+from benchmarks.mock_llm import MockLLMConfig, start_mock_llm
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+QUESTIONS = [
+    "What is the notice period for termination?",
+    "Will my security deposit be refunded?",
+    "Can disputes go to court or only arbitration?",
+    "What penalty applies to late payment?",
+]
+
+_MIME = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+
+# ─── HTTP ─────────────────────────────────────────────────────
+def _request(url: str, data: bytes = None, headers: dict = None, method: str = None) -> dict:
+    """One timed request; never raises, errors are returned as status 0"""
+    req = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=600) as resp:
+            body = resp.read()
+            status, resp_headers = resp.status, resp.headers
+    except urllib.error.HTTPError as e:
+        body, status, resp_headers = e.read(), e.code, e.headers
+    except Exception as e:
+        return {"status": 0, "seconds": time.perf_counter() - start, "error": str(e)[:200],
+                "timing": {}, "body": b""}
+    return {
+        "status": status,
+        "seconds": time.perf_counter() - start,
+        "timing": parse_server_timing(resp_headers.get("Server-Timing", "")),
+        "body": body,
+    }
+
+
+def _upload(url: str, path: str) -> dict:
+    # One client id per worker thread, so admission quotas see them as separate users
+    body, headers = _multipart(path)
+    headers["X-Client-ID"] = f"bench-{threading.get_ident()}"
+    return {**_request(url, body, headers), "file": path}
+
+
+def _multipart(path: str) -> tuple:
+    boundary = uuid.uuid4().hex
+    with open(path, "rb") as f:
+        content = f.read()
+    name = os.path.basename(path)
+    mime = _MIME.get(os.path.splitext(name)[1], "application/octet-stream")
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{name}\"\r\n"
+        f"Content-Type: {mime}\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def parse_server_timing(header: str) -> dict:
+    """'stage;dur=12.3;desc="2 calls", total;dur=40' -> {stage: seconds}"""
+    timings = {}
+    for part in header.split(","):
+        match = re.match(r"\s*([^;]+);dur=([\d.]+)", part)
+        if match:
+            timings[match.group(1).strip()] = float(match.group(2)) / 1000.0
+    return timings
+
+
+# ─── STATS ────────────────────────────────────────────────────
+def percentiles(values: list) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(round(q * (len(values) - 1))))], 4)
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p95": pick(0.95), "p99": pick(0.99),
+            "max": round(values[-1], 4), "mean": round(sum(values) / len(values), 4)}
+
+
+def summarize(results: list, wall_seconds: float) -> dict:
+    ok = [r for r in results if 200 <= r["status"] < 400]
+    stages = {}
+    for r in ok:
+        for stage, seconds in r["timing"].items():
+            stages.setdefault(stage, []).append(seconds)
+    statuses = {}
+    for r in results:
+        statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "statuses": statuses,
+        "wall_seconds": round(wall_seconds, 3),
+        "per_minute": round(len(ok) / wall_seconds * 60, 2) if wall_seconds > 0 else None,
+        "latency_seconds": percentiles([r["seconds"] for r in ok]),
+        "stages_seconds": {stage: percentiles(v) for stage, v in sorted(stages.items())},
+    }
+
+
+def run_phase(jobs: list, concurrency: int) -> tuple:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda job: job(), jobs))
+    return results, time.perf_counter() - start
+
+
+# ─── SERVER ───────────────────────────────────────────────────
+def start_backend(port: int, llm_url: str, workdir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", ""),
+        "GROQ_API_KEY": "mock",
+        "GROQ_BASE_URL": llm_url,
+        "GEMINI_API_KEY": "",
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+
+
+def wait_healthy(base_url: str, timeout: float = 60.0) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if _request(base_url + "/health")["status"] == 200:
+            return time.perf_counter() - start
+        time.sleep(0.1)
+    raise RuntimeError(f"backend at {base_url} did not become healthy")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+# ─── MAIN ─────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--formats", nargs="+", default=["pdf", "docx", "txt"])
+    parser.add_argument("--iterations", type=int, default=2, help="uploads per corpus file")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--median-ms", type=float, default=300.0)
+    parser.add_argument("--sigma", type=float, default=0.4)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--base-url", help="benchmark an already running backend instead")
+    parser.add_argument("--corpus", default=os.path.join(BACKEND_DIR, "benchmarks", "corpus"))
+    parser.add_argument("--label", default="", help="free-form tag stored with the results")
+    args = parser.parse_args()
+
+    files = build_corpus(args.corpus, args.pages, args.formats)
+
+    server = mock = None
+    mock_config = MockLLMConfig(args.median_ms, args.sigma, args.error_rate, args.rpm)
+    workdir = tempfile.mkdtemp(prefix="legalease-bench-")
+    base_url = args.base_url
+    startup_seconds = None
+    try:
+        if not base_url:
+            mock, llm_url = start_mock_llm(mock_config)
+            server = start_backend(args.port, llm_url, workdir)
+            base_url = f"http://127.0.0.1:{args.port}"
+        startup_seconds = wait_healthy(base_url)
+
+        # /api/analyze
+        uploads = [path for path in files for _ in range(args.iterations)]
+        analyze, analyze_wall = run_phase(
+            [lambda p=p: _upload(base_url + "/api/analyze", p) for p in uploads],
+            args.concurrency,
+        )
+        doc_ids = [json.loads(r["body"])["document_id"] for r in analyze if r["status"] == 200]
+
+        # /api/qa
+        qa, qa_wall = run_phase(
+            [lambda d=d, q=q: _request(
+                base_url + "/api/qa",
+                json.dumps({"document_id": d, "question": q}).encode(),
+                {"Content-Type": "application/json"})
+             for d in doc_ids for q in QUESTIONS],
+            args.concurrency,
+        )
+
+        # /api/report
+        report, report_wall = run_phase(
+            [lambda d=d: _request(base_url + f"/api/report/{d}") for d in doc_ids],
+            args.concurrency,
+        )
+
+        by_file = {}
+        for r in analyze:
+            by_file.setdefault(os.path.basename(r["file"]), []).append(r)
+
+        results = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "label": args.label,
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "config": vars(args),
+            "startup_seconds": round(startup_seconds, 3),
+            "endpoints": {
+                "analyze": {**summarize(analyze, analyze_wall),
+                            "documents_per_minute": round(len(doc_ids) / analyze_wall * 60, 2)},
+                "qa": summarize(qa, qa_wall),
+                "report": summarize(report, report_wall),
+            },
+            "analyze_by_file": {
+                name: percentiles([r["seconds"] for r in rs if r["status"] == 200])
+                for name, rs in sorted(by_file.items())
+            },
+            "mock_llm": mock_config.stats if mock else None,
+        }
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+        if mock:
+            mock.shutdown()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'endpoint':<10} {'ok/total':>10} {'per min':>9} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8}")
+    for name, summary in results["endpoints"].items():
+        lat = summary["latency_seconds"]
+        print(f"{name:<10} {summary['ok']:>4}/{summary['requests']:<5} {summary['per_minute'] or 0:>9} "
+              f"{lat.get('p50', 0):>8} {lat.get('p95', 0):>8} {lat.get('p99', 0):>8}")
+    print(f"documents/minute: {results['endpoints']['analyze']['documents_per_minute']}")
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+benchmarks/soak.py
+
+Memory soak test: runs many synthetic analyses against one backend worker
+and fails (exit code 1) if its resident memory grows by more than
+--max-growth-mb between the end of the warm-up and the end of the run.
+
+Like benchmarks/run.py it starts the mock LLM and a backend with a random
+ADMIN_TOKEN, and reads the worker's memory through /api/admin/memory after
+a full garbage collection. With --trace the backend runs with MEMORY_TRACE=1
+(much slower) and the allocation sites that grew most are printed from a
+tracemalloc snapshot diff.
+
+Run from backend/:
+  python -m benchmarks.soak
+  python -m benchmarks.soak --analyses 1000 --max-growth-mb 30 --trace
+  python -m benchmarks.soak --base-url http://127.0.0.1:8000 --admin-token $ADMIN_TOKEN
+"""
+import argparse
+import json
+import os
+import secrets
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.corpus import build_corpus
+from benchmarks.mock_llm import MockLLMConfig, start_mock_llm
+from benchmarks.run import (
+    BACKEND_DIR, RESULTS_DIR, _git_commit, _request, _upload, run_phase,
+    start_backend, wait_healthy,
+)
+
+MB = 1024 * 1024
+
+
+class Admin:
+    def __init__(self, base_url: str, token: str):
+        self.base_url = base_url
+        self.headers = {"X-Admin-Token": token}
+
+    def call(self, path: str, method: str = "GET") -> dict:
+        r = _request(self.base_url + "/api/admin/memory" + path, data=b"" if method == "POST" else None,
+                     headers=self.headers, method=method)
+        if r["status"] != 200:
+            raise RuntimeError(f"{method} /api/admin/memory{path} -> {r['status']} {r['body'][:200]!r}")
+        return json.loads(r["body"])
+
+    def settled_rss(self) -> int:
+        """RSS after a full collection"""
+        return self.call("/gc", "POST")["rss_after_bytes"]
+
+
+def analyses(base_url: str, path: str, count: int, concurrency: int) -> int:
+    """Run `count` analyses; returns how many succeeded"""
+    results, _ = run_phase([lambda: _upload(base_url + "/api/analyze", path)] * count, concurrency)
+    return sum(1 for r in results if r["status"] == 200)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-growth soak test")
+    parser.add_argument("--analyses", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10, help="analyses before the baseline")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=5, help="pages per synthetic contract")
+    parser.add_argument("--format", default="pdf", choices=["pdf", "docx", "txt"])
+    parser.add_argument("--max-growth-mb", type=float, default=50.0)
+    parser.add_argument("--trace", action="store_true", help="run the backend with MEMORY_TRACE=1")
+    parser.add_argument("--median-ms", type=float, default=50.0, help="mock LLM latency")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--base-url", help="soak an already running backend instead")
+    parser.add_argument("--admin-token", default=os.getenv("ADMIN_TOKEN", ""))
+    parser.add_argument("--corpus", default=os.path.join(BACKEND_DIR, "benchmarks", "corpus"))
+    args = parser.parse_args()
+
+    path = build_corpus(args.corpus, [args.pages], [args.format])[0]
+
+    server = mock = None
+    base_url, token = args.base_url, args.admin_token
+    try:
+        if not base_url:
+            token = secrets.token_hex(16)
+            os.environ["ADMIN_TOKEN"] = token
+            if args.trace:
+                os.environ["MEMORY_TRACE"] = "1"
+            mock, llm_url = start_mock_llm(MockLLMConfig(args.median_ms))
+            server = start_backend(args.port, llm_url, tempfile.mkdtemp(prefix="legalease-soak-"))
+            base_url = f"http://127.0.0.1:{args.port}"
+        elif not token:
+            raise SystemExit("--admin-token (or ADMIN_TOKEN) is required with --base-url")
+        wait_healthy(base_url)
+        admin = Admin(base_url, token)
+
+        warm_ok = analyses(base_url, path, args.warmup, args.concurrency)
+        baseline = admin.settled_rss()
+        tracing = admin.call("")["tracemalloc"]["running"]
+        snapshot = admin.call("/snapshots", "POST")["id"] if tracing else None
+        print(f"baseline after {warm_ok}/{args.warmup} warm-up analyses: {baseline / MB:.1f} MB")
+
+        ok = analyses(base_url, path, args.analyses, args.concurrency)
+        final = admin.settled_rss()
+        overview = admin.call("")
+        growth = final - baseline
+
+        results = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "config": vars(args) | {"admin_token": None},
+            "analyses_ok": ok,
+            "baseline_rss_bytes": baseline,
+            "final_rss_bytes": final,
+            "growth_bytes": growth,
+            "growth_per_analysis_bytes": round(growth / max(ok, 1)),
+            "live": overview["live"],
+            "top_growth": (admin.call(f"/snapshots/{snapshot}/diff/now?limit=10")["top"]
+                           if snapshot else None),
+        }
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+        if mock:
+            mock.shutdown()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = os.path.join(RESULTS_DIR, f"soak-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{ok}/{args.analyses} analyses OK")
+    print(f"RSS {baseline / MB:.1f} MB -> {final / MB:.1f} MB "
+          f"({growth / MB:+.1f} MB, {results['growth_per_analysis_bytes'] / 1024:+.1f} KB per analysis)")
+    print(f"live: {json.dumps(results['live'])}")
+    for site in results["top_growth"] or []:
+        print(f"{site['size_diff_bytes'] / 1024:>+10.1f} KB  {site['site']}")
+    print(f"saved {out}")
+
+    if ok < args.analyses:
+        print("FAIL: some analyses failed")
+        sys.exit(1)
+    if growth > args.max_growth_mb * MB:
+        print(f"FAIL: memory grew more than {args.max_growth_mb} MB")
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# core/admission.py
+"""
+Admission control for expensive endpoints.
+
+At most ADMISSION_MAX_ACTIVE analyses run at once; further requests wait in a
+bounded FIFO queue (ADMISSION_MAX_QUEUE). Requests beyond that are rejected
+right away instead of piling up: 503 when the queue is full or a queued
+request waited longer than ADMISSION_QUEUE_TIMEOUT, with a Retry-After
+estimated from recent service times.
+
+Optionally (ADMISSION_PER_CLIENT > 0, off by default) each client may hold
+at most that many active or queued slots, else 429. Clients are told apart
+by the X-Client-ID header (the frontend sends a per-browser id), else the
+remote address. Only enable it where that identifier can be trusted: behind
+a proxy or load balancer every header-less user shares the proxy's address,
+and X-Client-ID is chosen by the client unless the proxy sets or verifies it.
+
+AdmissionMiddleware applies this before the upload body is read, so rejected
+requests cost almost nothing. The time spent queued is recorded as the
+`admission_wait` stage and passed to the endpoint as request.state.queue_wait_ms.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+
+from core.metrics import Counter, Gauge, record_stage
+
+ADMISSION_MAX_ACTIVE    = int(os.getenv("ADMISSION_MAX_ACTIVE", "4"))
+ADMISSION_MAX_QUEUE     = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+ADMISSION_PER_CLIENT    = int(os.getenv("ADMISSION_PER_CLIENT", "0"))      # 0 = no per-client quota
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "60"))
+
+# Paths guarded by AdmissionMiddleware (POST only)
+ADMISSION_PATHS = ("/api/analyze",)
+
+ADMISSION_ACTIVE = Gauge(
+    "legalease_admission_active",
+    "Requests currently holding an admission slot",
+    ("path",),
+)
+ADMISSION_QUEUED = Gauge(
+    "legalease_admission_queued",
+    "Requests waiting for an admission slot",
+    ("path",),
+)
+ADMISSION_REJECTED = Counter(
+    "legalease_admission_rejected_total",
+    "Requests rejected by admission control",
+    ("path", "reason"),
+)
+
+
+class Rejected(Exception):
+    def __init__(self, status: int, reason: str, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status = status
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounded slots plus a bounded FIFO queue with per-client quotas.
+    Lives on one event loop; no locking needed.
+    """
+
+    def __init__(self, name: str, max_active: int, max_queue: int, per_client: int,
+                 queue_timeout: float):
+        self.name = name
+        self.max_active = max(1, max_active)
+        self.max_queue = max(0, max_queue)
+        self.per_client = per_client
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiters = deque()          # futures of queued requests, FIFO
+        self.clients = {}               # client id -> active + queued slots
+        self.service_seconds = 10.0     # EWMA of time a slot is held
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new request"""
+        backlog = (len(self.waiters) + 1) / self.max_active
+        return max(1, math.ceil(backlog * self.service_seconds))
+
+    async def acquire(self, client: str) -> float:
+        """Wait for a slot; returns seconds spent queued or raises Rejected"""
+        if self.per_client and self.clients.get(client, 0) >= self.per_client:
+            raise Rejected(429, "client_quota",
+                           f"Too many concurrent analyses for this client (limit {self.per_client})",
+                           self.retry_after())
+
+        if self.active < self.max_active and not self.waiters:
+            self._take(client)
+            return 0.0
+
+        if len(self.waiters) >= self.max_queue:
+            raise Rejected(503, "queue_full", "Server is busy, please retry shortly",
+                           self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.clients[client] = self.clients.get(client, 0) + 1
+        ADMISSION_QUEUED.inc(path=self.name)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up; pass it on
+                self.release(client, 0.0)
+            else:
+                waiter.cancel()
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+                self._forget(client)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise Rejected(503, "queue_timeout", "Server is busy, please retry shortly",
+                           self.retry_after())
+        finally:
+            ADMISSION_QUEUED.dec(path=self.name)
+        return time.perf_counter() - started
+
+    def release(self, client: str, held_seconds: float):
+        """Give the slot back, handing it straight to the oldest waiter if any"""
+        if held_seconds:
+            self.service_seconds = 0.8 * self.service_seconds + 0.2 * held_seconds
+        self.active -= 1
+        self._forget(client)
+        ADMISSION_ACTIVE.dec(path=self.name)
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                ADMISSION_ACTIVE.inc(path=self.name)
+                waiter.set_result(None)
+                return
+
+    def _take(self, client: str):
+        self.active += 1
+        self.clients[client] = self.clients.get(client, 0) + 1
+        ADMISSION_ACTIVE.inc(path=self.name)
+
+    def _forget(self, client: str):
+        remaining = self.clients.get(client, 0) - 1
+        if remaining > 0:
+            self.clients[client] = remaining
+        else:
+            self.clients.pop(client, None)
+
+
+def client_id(scope) -> str:
+    """X-Client-ID header if sent, else the remote address"""
+    for key, value in scope.get("headers", []):
+        if key == b"x-client-id" and value:
+            return value.decode("latin-1")[:128]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController per guarded path"""
+
+    def __init__(self, app, paths=ADMISSION_PATHS):
+        self.app = app
+        self.controllers = {
+            path: AdmissionController(path, ADMISSION_MAX_ACTIVE, ADMISSION_MAX_QUEUE,
+                                      ADMISSION_PER_CLIENT, ADMISSION_QUEUE_TIMEOUT)
+            for path in paths
+        }
+
+    async def __call__(self, scope, receive, send):
+        controller = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            controller = self.controllers.get(scope["path"].rstrip("/"))
+        if controller is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = client_id(scope)
+        try:
+            waited = await controller.acquire(client)
+        except Rejected as e:
+            ADMISSION_REJECTED.inc(path=controller.name, reason=e.reason)
+            await _reject(send, e)
+            return
+
+        record_stage("admission_wait", waited)
+        scope.setdefault("state", {})["queue_wait_ms"] = round(waited * 1000, 1)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(client, time.perf_counter() - started)
+
+
+async def _reject(send, e: Rejected):
+    body = json.dumps({"detail": e.detail, "retry_after": e.retry_after}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": e.status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(e.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -1,52 +1,79 @@
 import numpy as np
+import threading
+import uuid
 
 EMBEDDING_DIM = 128
 _vectorizer = None
+_fit_lock = threading.Lock()   # documents are indexed from executor threads
+
+def _new_vectorizer():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.decomposition import TruncatedSVD
+    return {"tfidf": TfidfVectorizer(max_features=512), "svd": TruncatedSVD(n_components=EMBEDDING_DIM), "fitted": False}
 
 def _get_vectorizer():
     global _vectorizer
     if _vectorizer is None:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.decomposition import TruncatedSVD
-        import pickle, os
-        _vectorizer = {"tfidf": TfidfVectorizer(max_features=512), "svd": TruncatedSVD(n_components=EMBEDDING_DIM), "fitted": False}
+        with _fit_lock:
+            if _vectorizer is None:
+                _vectorizer = _new_vectorizer()
     return _vectorizer
 
-def embed(texts):
+def _clean(texts):
     if isinstance(texts, str):
         texts = [texts]
     texts = [t.strip() for t in texts if t and t.strip()]
     if not texts:
         raise ValueError("No valid texts to embed")
+    return texts
+
+def _fit(v, texts):
+    # Fit on whatever we have
+    tfidf_matrix = v["tfidf"].fit_transform(texts)
+    if tfidf_matrix.shape[0] >= EMBEDDING_DIM:
+        v["svd"].fit(tfidf_matrix)
+        vectors = v["svd"].transform(tfidf_matrix)
+    else:
+        vectors = _pad(tfidf_matrix.toarray())
+    v["fitted"] = True
+    # Vectors are only comparable within one fitted vectorizer ("space")
+    v["space_id"] = uuid.uuid4().hex
+    v["last_texts"] = texts
+    return vectors.astype(np.float32)
+
+def _pad(vectors):
+    # Pad or truncate to EMBEDDING_DIM
+    if vectors.shape[1] < EMBEDDING_DIM:
+        return np.pad(vectors, ((0,0),(0, EMBEDDING_DIM - vectors.shape[1])))
+    return vectors[:, :EMBEDDING_DIM]
+
+def embed(texts):
+    texts = _clean(texts)
     
     v = _get_vectorizer()
     if not v["fitted"]:
-        # Fit on whatever we have
-        tfidf_matrix = v["tfidf"].fit_transform(texts)
-        if tfidf_matrix.shape[0] >= EMBEDDING_DIM:
-            v["svd"].fit(tfidf_matrix)
-            vectors = v["svd"].transform(tfidf_matrix)
-        else:
-            vectors = tfidf_matrix.toarray()
-            # Pad or truncate to EMBEDDING_DIM
-            if vectors.shape[1] < EMBEDDING_DIM:
-                vectors = np.pad(vectors, ((0,0),(0, EMBEDDING_DIM - vectors.shape[1])))
-            else:
-                vectors = vectors[:, :EMBEDDING_DIM]
-        v["fitted"] = True
-        v["last_texts"] = texts
-        return vectors.astype(np.float32)
-    else:
-        tfidf_matrix = v["tfidf"].transform(texts)
-        try:
-            vectors = v["svd"].transform(tfidf_matrix)
-        except Exception:
-            vectors = tfidf_matrix.toarray()
-            if vectors.shape[1] < EMBEDDING_DIM:
-                vectors = np.pad(vectors, ((0,0),(0, EMBEDDING_DIM - vectors.shape[1])))
-            else:
-                vectors = vectors[:, :EMBEDDING_DIM]
-        return vectors.astype(np.float32)
+        with _fit_lock:
+            if not v["fitted"]:
+                return _fit(v, texts)
+
+    tfidf_matrix = v["tfidf"].transform(texts)
+    try:
+        vectors = v["svd"].transform(tfidf_matrix)
+    except Exception:
+        vectors = _pad(tfidf_matrix.toarray())
+    return vectors.astype(np.float32)
+
+def embed_joint(texts):
+    """
+    Embed texts with a fresh vectorizer fitted on exactly these texts, leaving
+    the shared one untouched. Used to compare documents whose stored vectors
+    come from different embedding spaces.
+    """
+    return _fit(_new_vectorizer(), _clean(texts))
+
+def get_space_id():
+    """Id of the shared vectorizer's embedding space, None before the first fit"""
+    return _get_vectorizer().get("space_id")
 
 def get_embedding_dim():
     return EMBEDDING_DIM
\ No newline at end of file
@@ -0,0 +1,140 @@
+# core/encoding.py
+"""
+Negotiated response encoding for large JSON payloads (/api/analyze).
+
+- Field selection: `fields=id,risk,urdu` keeps only those clause fields
+  (`id` is always kept); `compact=true` replaces repeated tooltip strings with
+  indexes into a top-level `tooltips` list.
+- Serialization: JSON via orjson when installed (stdlib json otherwise), or
+  MessagePack when the client sends `Accept: application/msgpack` or
+  `format=msgpack` (needs the optional `msgpack` package).
+- Compression: brotli (if installed) or gzip per Accept-Encoding, only for
+  bodies over COMPRESS_MIN_BYTES.
+
+Every encoded response is recorded in the response size histogram.
+"""
+import gzip
+import json
+import os
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request, Response
+
+from core.metrics import Histogram
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL         = 6
+BROTLI_QUALITY     = 5
+
+CLAUSE_FIELDS = ("id", "type", "risk", "original", "urdu", "tooltip")
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+RESPONSE_BYTES = Histogram(
+    "legalease_response_size_bytes",
+    "Encoded response body size",
+    ("route", "format", "encoding"),
+    buckets=(512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    """`fields` query value -> tuple of clause fields (id always first), None for all"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in CLAUSE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown clause fields: {', '.join(unknown)}. Choose from {', '.join(CLAUSE_FIELDS)}"
+        )
+    return ("id",) + tuple(f for f in CLAUSE_FIELDS if f in requested and f != "id")
+
+
+def shape_clauses(payload: Dict, fields: Optional[tuple] = None, compact: bool = False) -> Dict:
+    """Apply field selection and tooltip deduplication to payload["clauses"]"""
+    if fields is None and not compact:
+        return payload
+
+    clauses = payload["clauses"]
+    if fields is not None:
+        clauses = [{k: c[k] for k in fields if k in c} for c in clauses]
+
+    shaped = {**payload, "clauses": clauses}
+    if compact and (fields is None or "tooltip" in fields):
+        tooltips, index = [], {}
+        clauses = [dict(c) for c in clauses]
+        for c in clauses:
+            tip = c.get("tooltip")
+            if tip is not None:
+                if tip not in index:
+                    index[tip] = len(tooltips)
+                    tooltips.append(tip)
+                c["tooltip"] = index[tip]
+        shaped["clauses"] = clauses
+        shaped["tooltips"] = tooltips
+    return shaped
+
+
+def negotiate_format(request: Request, format: Optional[str] = None) -> str:
+    """
+    "json" or "msgpack" from the `format` parameter or the Accept header.
+    Call before doing the work, so an unsupported format fails fast with 406.
+    """
+    accept = request.headers.get("accept", "").lower()
+    if (format or "").lower() == "msgpack" or any(t in accept for t in MSGPACK_TYPES):
+        if msgpack is None:
+            raise HTTPException(status_code=406, detail="MessagePack is not available on this server")
+        return "msgpack"
+    return "json"
+
+
+def encode_response(request: Request, payload: Dict, route: str, fmt: str = "json") -> Response:
+    """Serialize `payload` in the negotiated format and compress it if worthwhile"""
+    if fmt == "msgpack":
+        body, media_type = msgpack.packb(payload, use_bin_type=True), "application/msgpack"
+    elif orjson is not None:
+        body, media_type = orjson.dumps(payload), "application/json"
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        media_type = "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = "identity"
+    if len(body) >= COMPRESS_MIN_BYTES:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            body, encoding = brotli.compress(body, quality=BROTLI_QUALITY), "br"
+        elif "gzip" in accepted:
+            body, encoding = gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    RESPONSE_BYTES.observe(len(body), route=route, format=fmt, encoding=encoding)
+    return Response(body, media_type=media_type, headers=headers)
+
+
+def _accepted_encodings(header: str) -> set:
+    """Codings from Accept-Encoding, excluding ones sent with q=0"""
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding)
+    return accepted
@@ -0,0 +1,271 @@
+# core/ledger.py
+"""
+LLM usage ledger.
+
+Every provider call is recorded with provider, model, purpose, prompt and
+completion tokens, latency, the fallback path taken and the document it was
+made for. A caller that joined an identical call already in flight
+(core/singleflight.py) gets a zero-token row with provider "shared", so a
+document's usage shows the sharing while tokens are counted once, against
+the document that started the call. Records are buffered in memory and written in batches by a
+background thread to SQLite (default) or JSONL, selected with LLM_LEDGER:
+
+  LLM_LEDGER=sqlite   storage/llm_ledger.db     (default)
+  LLM_LEDGER=jsonl    storage/llm_ledger.jsonl
+  LLM_LEDGER=off      nothing is recorded
+"""
+import atexit
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from typing import Dict, List, Optional
+
+LEDGER_BACKEND       = os.getenv("LLM_LEDGER", "sqlite").lower()
+LEDGER_DIR           = "storage"
+LEDGER_BATCH_SIZE    = 50
+LEDGER_FLUSH_SECONDS = 2.0
+
+_SQLITE_PATH = os.path.join(LEDGER_DIR, "llm_ledger.db")
+_JSONL_PATH  = os.path.join(LEDGER_DIR, "llm_ledger.jsonl")
+
+_COLUMNS = ("ts", "provider", "model", "purpose", "prompt_tokens", "completion_tokens",
+            "latency_ms", "ok", "fallback_path", "document_id")
+
+_buffer = []
+_buffer_lock = threading.Lock()
+_write_lock = threading.Lock()
+_flush_event = threading.Event()
+_writer = None
+_schema_ready = set()       # SQLite files whose table and indexes exist
+
+# Document the current request works on; set once per request, inherited by its tasks
+_document_id = contextvars.ContextVar("ledger_document_id", default=None)
+
+
+def set_document(document_id: str):
+    """Attribute LLM calls made by the current request (and its tasks) to a document"""
+    _document_id.set(document_id)
+
+
+def record_llm_call(provider: str, model: str, purpose: str, started: float,
+                    resp=None, fallback_path: str = "", ok: bool = False):
+    """
+    Record one provider call. `started` is the time.perf_counter() value taken
+    before the call; `resp` is the SDK response (None if the call raised), used
+    for token counts; `ok` is whether usable text came back, as core/llm.py
+    decides it (an empty or refused completion is not a success).
+    """
+    if LEDGER_BACKEND == "off":
+        return
+
+    prompt_tokens, completion_tokens = _usage(provider, resp)
+    _append({
+        "ts": time.time(),
+        "provider": provider,
+        "model": model,
+        "purpose": purpose,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "ok": bool(ok),
+        "fallback_path": fallback_path or provider,
+        "document_id": _document_id.get(),
+    })
+
+
+def record_shared_call(purpose: str, started: float, ok: bool):
+    """Record a call answered by joining an identical call in flight (zero tokens)"""
+    if LEDGER_BACKEND == "off":
+        return
+    _append({
+        "ts": time.time(),
+        "provider": "shared",
+        "model": "",
+        "purpose": purpose,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "ok": bool(ok),
+        "fallback_path": "shared",
+        "document_id": _document_id.get(),
+    })
+
+
+def _append(row: Dict):
+    _ensure_writer()
+    with _buffer_lock:
+        _buffer.append(row)
+        full = len(_buffer) >= LEDGER_BATCH_SIZE
+    if full:
+        _flush_event.set()
+
+
+def _usage(provider: str, resp) -> tuple:
+    """(prompt_tokens, completion_tokens) from a Groq or Gemini response, None if absent"""
+    if resp is None:
+        return None, None
+    if provider == "gemini":
+        meta = getattr(resp, "usage_metadata", None)
+        return (getattr(meta, "prompt_token_count", None),
+                getattr(meta, "candidates_token_count", None))
+    usage = getattr(resp, "usage", None)
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+
+
+# ─── WRITER ───────────────────────────────────────────────────
+def _ensure_writer():
+    global _writer
+    if _writer is None:
+        with _write_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_writer_loop, name="llm-ledger", daemon=True)
+                _writer.start()
+
+
+def _writer_loop():
+    while True:
+        _flush_event.wait(LEDGER_FLUSH_SECONDS)
+        _flush_event.clear()
+        try:
+            flush()
+        except Exception as e:
+            print(f"[ledger] flush failed: {e}")
+
+
+def flush():
+    """Write all buffered records"""
+    with _buffer_lock:
+        rows = _buffer[:]
+        _buffer.clear()
+    if not rows:
+        return
+
+    with _write_lock:
+        os.makedirs(LEDGER_DIR, exist_ok=True)
+        if LEDGER_BACKEND == "jsonl":
+            with open(_JSONL_PATH, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        else:
+            with _connect() as conn:
+                conn.executemany(
+                    f"INSERT INTO llm_calls ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                    [tuple(row[c] for c in _COLUMNS) for row in rows],
+                )
+
+
+@contextmanager
+def _connect():
+    """A connection for one transaction, closed afterwards; the schema is created on first use"""
+    with closing(sqlite3.connect(_SQLITE_PATH, timeout=10)) as conn:
+        path = os.path.abspath(_SQLITE_PATH)
+        if path not in _schema_ready:
+            _create_schema(conn)
+            _schema_ready.add(path)
+        with conn:
+            yield conn
+
+
+def _create_schema(conn: sqlite3.Connection):
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_calls ("
+            "ts REAL, provider TEXT, model TEXT, purpose TEXT, prompt_tokens INTEGER, "
+            "completion_tokens INTEGER, latency_ms REAL, ok INTEGER, fallback_path TEXT, "
+            "document_id TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_doc ON llm_calls (document_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_ts ON llm_calls (ts)")
+
+
+atexit.register(flush)
+
+
+# ─── QUERIES ──────────────────────────────────────────────────
+def _rows(document_id: Optional[str] = None, since: Optional[float] = None) -> List[Dict]:
+    flush()
+    if LEDGER_BACKEND == "jsonl":
+        if not os.path.exists(_JSONL_PATH):
+            return []
+        with open(_JSONL_PATH, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return [
+            r for r in rows
+            if (document_id is None or r["document_id"] == document_id)
+            and (since is None or r["ts"] >= since)
+        ]
+
+    if not os.path.exists(_SQLITE_PATH):
+        return []
+    query, params = f"SELECT {', '.join(_COLUMNS)} FROM llm_calls WHERE 1=1", []
+    if document_id is not None:
+        query += " AND document_id = ?"
+        params.append(document_id)
+    if since is not None:
+        query += " AND ts >= ?"
+        params.append(since)
+    with _connect() as conn:
+        return [dict(zip(_COLUMNS, r)) for r in conn.execute(query, params)]
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def _summarize(rows: List[Dict]) -> Dict:
+    latencies = [r["latency_ms"] for r in rows if r["ok"]]
+    errors = sum(1 for r in rows if not r["ok"])
+    return {
+        "calls": len(rows),
+        "errors": errors,
+        "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+        "prompt_tokens": sum(r["prompt_tokens"] or 0 for r in rows),
+        "completion_tokens": sum(r["completion_tokens"] or 0 for r in rows),
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+        },
+    }
+
+
+def _group(rows: List[Dict], key) -> Dict:
+    groups = {}
+    for r in rows:
+        groups.setdefault(key(r), []).append(r)
+    return {k: _summarize(v) for k, v in sorted(groups.items())}
+
+
+def document_usage(document_id: str) -> Dict:
+    """
+    Token and latency totals for one document, overall and by provider and
+    purpose. Calls shared with another document's identical in-flight call
+    appear under provider "shared" with zero tokens; their tokens are billed
+    to the document that started the call.
+    """
+    rows = _rows(document_id=document_id)
+    return {
+        "document_id": document_id,
+        **_summarize(rows),
+        "by_provider": _group(rows, lambda r: r["provider"]),
+        "by_purpose": _group(rows, lambda r: r["purpose"]),
+        "fallback_paths": _group(rows, lambda r: r["fallback_path"]),
+    }
+
+
+def provider_usage(hours: float = 24.0) -> Dict:
+    """Per provider/model call counts, error rates, tokens and latency percentiles"""
+    rows = _rows(since=time.time() - hours * 3600)
+    return {
+        "window_hours": hours,
+        **_summarize(rows),
+        "by_provider": _group(rows, lambda r: f"{r['provider']}/{r['model']}"),
+    }
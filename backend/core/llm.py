@@ -0,0 +1,216 @@
+# core/llm.py
+"""
+Shared LLM provider registry.
+
+Priority order:
+1. Groq API  (FREE, fast, high limits) - get key at console.groq.com
+2. Gemini    (free tier, lower limits) - get key at aistudio.google.com
+
+Clients are created once, on first use, and shared by every caller; the SDKs
+are only imported then, which keeps them out of application start-up.
+complete() walks the providers in order and records each attempt in the
+metrics and the usage ledger. Identical completions requested while one is
+already in flight (the same agreement uploaded by several tenants at once)
+share that one call, whatever their purpose: a live question joins the
+background precompute of the same question.
+"""
+from dotenv import load_dotenv
+from core.metrics import timed, run_in_executor, LLM_INFLIGHT
+from core.ledger import record_llm_call, record_shared_call
+from core.singleflight import SingleFlight
+from functools import lru_cache
+from typing import Optional
+import asyncio
+import hashlib
+import os
+import threading
+import time
+
+load_dotenv()
+
+GROQ_API_KEY   = os.getenv("GROQ_API_KEY")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+GROQ_MODEL   = "llama-3.3-70b-versatile"
+GEMINI_MODEL = "gemini-2.0-flash-lite"
+
+PROVIDERS = ("groq", "gemini")
+
+# Provider calls in flight across all requests. Beyond this, calls wait their
+# turn instead of all hitting the provider (and its rate limits) at once.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Share one provider call among concurrent identical completions
+LLM_SINGLEFLIGHT = os.getenv("LLM_SINGLEFLIGHT", "1") == "1"
+
+_clients = {}
+_clients_lock = threading.Lock()
+_slots = {}     # event loop -> asyncio.Semaphore
+_busy = 0       # provider calls holding or waiting for a slot
+_flights = SingleFlight("llm")
+
+if not GROQ_API_KEY and not GEMINI_API_KEY:
+    print("[llm] No AI API → using static fallbacks")
+    print("[llm] Add GROQ_API_KEY to .env for real Urdu explanations and Q&A")
+
+
+def get_groq():
+    """Shared Groq client, or None if not configured / not installed"""
+    return _client("groq")
+
+
+def get_gemini():
+    """Shared Gemini client, or None if not configured / not installed"""
+    return _client("gemini")
+
+
+def _client(provider: str):
+    if provider in _clients:
+        return _clients[provider]
+    with _clients_lock:
+        if provider not in _clients:
+            _clients[provider] = _create_client(provider)
+    return _clients[provider]
+
+
+def _create_client(provider: str):
+    if provider == "groq" and GROQ_API_KEY:
+        try:
+            from groq import Groq
+            client = Groq(api_key=GROQ_API_KEY)
+            print("[llm] Groq initialized (llama-3.3-70b)")
+            return client
+        except ImportError:
+            print("[llm] groq not installed → pip install groq")
+        except Exception as e:
+            print(f"[llm] Groq init error: {e}")
+
+    if provider == "gemini" and GEMINI_API_KEY:
+        try:
+            from google import genai
+            client = genai.Client(api_key=GEMINI_API_KEY)
+            print("[llm] Gemini initialized (gemini-2.0-flash-lite)")
+            return client
+        except ImportError:
+            print("[llm] google-genai not installed → pip install google-genai")
+        except Exception as e:
+            print(f"[llm] Gemini init error: {e}")
+
+    return None
+
+
+def busy_calls() -> int:
+    """Provider calls currently running or waiting for a slot (LLM_MAX_CONCURRENCY)"""
+    return _busy
+
+
+def has_provider() -> bool:
+    """True if at least one provider is usable"""
+    return any(_client(p) for p in PROVIDERS)
+
+
+@lru_cache(maxsize=32)
+def _gemini_config(max_tokens: int, temperature: float):
+    from google.genai import types as genai_types
+    return genai_types.GenerateContentConfig(max_output_tokens=max_tokens, temperature=temperature)
+
+
+async def complete(prompt: str, *, purpose: str, max_tokens: int = 400,
+                   temperature: float = 0.3, stage: str = None) -> Optional[str]:
+    """
+    Complete `prompt` with the first provider that answers.
+    Returns the stripped text, or None if every provider failed or none is set up.
+    `stage` prefixes the per-provider timing stage (default: `purpose`).
+    """
+    if not LLM_SINGLEFLIGHT:
+        return await _complete(prompt, purpose, max_tokens, temperature, stage)
+    key = _flight_key(prompt, max_tokens, temperature)
+    joined = []
+    started = time.perf_counter()
+    text = await _flights.do(key, lambda: _complete(prompt, purpose, max_tokens, temperature, stage),
+                             on_join=lambda: joined.append(True))
+    if joined:
+        # The provider call is billed to the caller that started it; this
+        # caller's document gets a zero-token row showing it shared that call
+        record_shared_call(purpose, started, ok=text is not None)
+    return text
+
+
+def _flight_key(prompt: str, max_tokens: int, temperature: float) -> str:
+    """
+    Prompts that differ only in whitespace are the same request. The purpose
+    only labels metrics and the ledger, so it is not part of the key.
+    """
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{max_tokens}|{temperature}|{normalized}".encode("utf-8")).hexdigest()
+
+
+async def _complete(prompt: str, purpose: str, max_tokens: int, temperature: float,
+                    stage: Optional[str]) -> Optional[str]:
+    path = []   # providers tried so far, recorded in the usage ledger
+    for provider in PROVIDERS:
+        client = _client(provider)
+        if not client:
+            continue
+        path.append(provider)
+        text = await _call(provider, client, prompt, max_tokens, temperature,
+                           purpose, stage or purpose, ">".join(path))
+        if text:
+            return text
+    return None
+
+
+def _llm_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _slots.get(loop)
+    if slots is None:
+        _slots.clear()
+        slots = _slots[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return slots
+
+
+async def _call(provider: str, client, prompt: str, max_tokens: int, temperature: float,
+                purpose: str, stage: str, fallback_path: str) -> Optional[str]:
+    global _busy
+    _busy += 1
+    try:
+        async with _llm_slots():
+            return await _call_provider(provider, client, prompt, max_tokens, temperature,
+                                        purpose, stage, fallback_path)
+    finally:
+        _busy -= 1
+
+
+async def _call_provider(provider: str, client, prompt: str, max_tokens: int, temperature: float,
+                         purpose: str, stage: str, fallback_path: str) -> Optional[str]:
+    model = GROQ_MODEL if provider == "groq" else GEMINI_MODEL
+    LLM_INFLIGHT.inc(provider=provider)
+    started = time.perf_counter()
+    resp = text = None
+    try:
+        with timed(f"{stage}.{provider}"):
+            if provider == "groq":
+                resp = await run_in_executor(None, lambda: client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                ))
+                text = resp.choices[0].message.content
+            else:
+                resp = await run_in_executor(None, lambda: client.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=_gemini_config(max_tokens, temperature),
+                ))
+                text = resp.text if resp else None
+        # Only usable text counts as an answer; empty or refused completions fall through
+        text = text.strip() if text and text.strip() else None
+        return text
+    except Exception as e:
+        print(f"[llm] {provider} failed ({purpose}): {e}")
+        resp = text = None
+        return None
+    finally:
+        LLM_INFLIGHT.dec(provider=provider)
+        record_llm_call(provider, model, purpose, started, resp, fallback_path, ok=text is not None)
@@ -0,0 +1,252 @@
+# core/memory.py
+"""
+Memory diagnostics for long-running workers (served by api/admin.py).
+
+- Resident set size from /proc (peak from getrusage)
+- tracemalloc: start/stop, named snapshots, top allocation sites and the
+  difference between two snapshots
+- Live objects: FAISS indexes still referenced and the sizes of the
+  process-wide caches
+- Per-request peak traced memory, recorded by main.py's middleware when
+  MEMORY_TRACE=1 (tracing then starts with the process)
+
+tracemalloc slows allocation-heavy code noticeably, so it is off unless
+MEMORY_TRACE=1 or an admin starts it.
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from fastapi import HTTPException
+from core.metrics import Histogram
+
+MEMORY_TRACE         = os.getenv("MEMORY_TRACE", "").lower() in ("1", "true", "yes")
+MEMORY_TRACE_FRAMES  = int(os.getenv("MEMORY_TRACE_FRAMES", "10"))
+MEMORY_MAX_SNAPSHOTS = int(os.getenv("MEMORY_MAX_SNAPSHOTS", "4"))
+
+REQUEST_PEAK_BYTES = Histogram(
+    "legalease_request_peak_memory_bytes",
+    "Peak traced memory above the request's starting point (MEMORY_TRACE=1)",
+    ("method", "route"),
+    buckets=(2 ** 20, 4 * 2 ** 20, 16 * 2 ** 20, 64 * 2 ** 20, 256 * 2 ** 20, 1024 * 2 ** 20),
+)
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+_snapshots = OrderedDict()      # id -> (created, tracemalloc.Snapshot)
+_recent = deque(maxlen=100)     # latest per-request peaks
+_requests = {"active": 0, "started": 0}
+
+# Allocations made by the diagnostics themselves
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+# ─── PROCESS ──────────────────────────────────────────────────
+def rss_bytes() -> int:
+    """Current resident set size (0 where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024     # bytes on macOS, KB on Linux
+
+
+# ─── TRACEMALLOC ──────────────────────────────────────────────
+def start_tracing(frames: int = MEMORY_TRACE_FRAMES):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        print(f"[memory] tracemalloc started ({frames} frames)")
+
+
+def stop_tracing():
+    """Stop tracing and drop the snapshots (they are only comparable within one run)"""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        print("[memory] tracemalloc stopped")
+    _snapshots.clear()
+
+
+def tracing_status() -> dict:
+    if not tracemalloc.is_tracing():
+        return {"running": False}
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "running": True,
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_bytes": current,
+        "traced_peak_bytes": peak,
+        "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+    }
+
+
+def take_snapshot() -> dict:
+    """Store a snapshot for later diffs; the oldest is dropped beyond MEMORY_MAX_SNAPSHOTS"""
+    snapshot = _snapshot()
+    snapshot_id = f"s{int(time.time() * 1000):x}"
+    _snapshots[snapshot_id] = (time.time(), snapshot)
+    while len(_snapshots) > MEMORY_MAX_SNAPSHOTS:
+        _snapshots.popitem(last=False)
+    return _snapshot_info(snapshot_id)
+
+
+def list_snapshots() -> list:
+    return [_snapshot_info(snapshot_id) for snapshot_id in _snapshots]
+
+
+def top_allocations(limit: int = 20, group_by: str = "lineno") -> list:
+    """Largest live allocation sites right now"""
+    stats = _snapshot().statistics(group_by)
+    return [_stat(s) for s in stats[:limit]]
+
+
+def diff_snapshots(old_id: str, new_id: str = "now", limit: int = 20, group_by: str = "lineno") -> dict:
+    """Allocation sites that grew most from snapshot `old_id` to `new_id` ("now": a fresh one)"""
+    old = _get_snapshot(old_id)
+    new = _snapshot() if new_id == "now" else _get_snapshot(new_id)
+    stats = new.compare_to(old, group_by)
+    return {
+        "from": old_id,
+        "to": new_id,
+        "size_diff_bytes": sum(s.size_diff for s in stats),
+        "count_diff": sum(s.count_diff for s in stats),
+        "top": [_stat(s) for s in stats[:limit]],
+    }
+
+
+def _snapshot():
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="tracemalloc is not running; start it first")
+    return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+
+def _get_snapshot(snapshot_id: str):
+    if snapshot_id not in _snapshots:
+        raise HTTPException(status_code=404, detail=f"Snapshot {snapshot_id} not found")
+    return _snapshots[snapshot_id][1]
+
+
+def _snapshot_info(snapshot_id: str) -> dict:
+    created, snapshot = _snapshots[snapshot_id]
+    return {
+        "id": snapshot_id,
+        "created": created,
+        "traced_bytes": sum(t.size for t in snapshot.traces),
+    }
+
+
+def _stat(stat) -> dict:
+    frames = [f"{f.filename}:{f.lineno}" for f in reversed(stat.traceback)]    # innermost first
+    entry = {"site": frames[0], "size_bytes": stat.size, "count": stat.count}
+    if len(frames) > 1:
+        entry["traceback"] = frames
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+# ─── LIVE OBJECTS ─────────────────────────────────────────────
+def live_objects() -> dict:
+    """Live FAISS indexes and process-wide cache sizes (walks the GC heap: admin use only)"""
+    faiss = sys.modules.get("faiss")
+    faiss_indexes = sum(1 for obj in gc.get_objects() if isinstance(obj, faiss.Index)) if faiss else 0
+    return {
+        "faiss_indexes": faiss_indexes,
+        "gc_objects": len(gc.get_objects()),
+        "gc_counts": gc.get_count(),
+        "caches": _cache_sizes(),
+    }
+
+
+def _cache_sizes() -> dict:
+    """Only modules that are already imported are inspected"""
+    caches = {}
+    modules = sys.modules
+
+    report = modules.get("api.report")
+    if report:
+        # Runs in a worker thread while requests update the LRU: copy under its lock
+        with report._report_cache_lock:
+            pdfs = list(report._report_cache.values())
+        caches["report_pdfs"] = {"entries": len(pdfs), "bytes": sum(len(b) for b in pdfs)}
+
+    embeddings = modules.get("core.embeddings")
+    if embeddings and embeddings._vectorizer is not None:
+        v = embeddings._vectorizer
+        caches["vectorizer"] = {
+            "fitted": v.get("fitted", False),
+            "vocabulary": len(getattr(v["tfidf"], "vocabulary_", {}) or {}),
+            "last_texts": len(v.get("last_texts") or ()),
+        }
+
+    classifier = modules.get("services.risk_classifier")
+    if classifier:
+        caches["classifier_engines"] = sorted(classifier._engines)
+
+    llm = modules.get("core.llm")
+    if llm:
+        caches["llm_clients"] = sorted(p for p, c in llm._clients.items() if c)
+        caches["llm_busy_calls"] = llm.busy_calls()
+        caches["llm_singleflight"] = len(llm._flights._flights)
+
+    precompute = modules.get("services.precompute")
+    if precompute:
+        caches["precompute_tasks"] = len(precompute._tasks)
+
+    ledger = modules.get("core.ledger")
+    if ledger:
+        caches["ledger_buffer"] = len(ledger._buffer)
+
+    return caches
+
+
+# ─── PER-REQUEST PEAK ─────────────────────────────────────────
+def request_memory_start() -> tuple:
+    """
+    Call when a request starts. tracemalloc's peak is process-wide, so it is
+    reset only when no other request is running; a request that overlapped
+    others gets an upper bound, flagged exact=False.
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    if _requests["active"] == 0:
+        tracemalloc.reset_peak()
+    _requests["active"] += 1
+    _requests["started"] += 1
+    exclusive = _requests["active"] == 1
+    return tracemalloc.get_traced_memory()[0], _requests["started"], exclusive
+
+
+def request_memory_end(probe: tuple, method: str, route: str):
+    if probe is None:
+        return
+    _requests["active"] -= 1
+    if not tracemalloc.is_tracing():
+        return
+    start_bytes, seq, exclusive = probe
+    peak = max(0, tracemalloc.get_traced_memory()[1] - start_bytes)
+    exact = exclusive and seq == _requests["started"] and _requests["active"] == 0
+    REQUEST_PEAK_BYTES.observe(peak, method=method, route=route)
+    _recent.append({"method": method, "route": route, "peak_bytes": peak,
+                    "exact": exact, "at": time.time()})
+
+
+def recent_requests() -> list:
+    """Latest per-request peaks, newest first"""
+    return list(reversed(_recent))
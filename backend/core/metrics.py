@@ -0,0 +1,231 @@
+# core/metrics.py
+"""
+In-process metrics for the analysis pipeline.
+
+Histograms, gauges and counters are rendered in Prometheus text format at
+/metrics. Stage timings are also collected per request (through a context
+variable shared by the request's tasks) for the Server-Timing header.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from core.profiling import current_profiler
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [f"{self.name}{self._labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}   # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            for key, series in self._series.items():
+                for bound, count in zip(self.buckets, series):
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{self._labels(key, le)} {count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{self._labels(key, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{self._labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{self._labels(key)} {series[-1]}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# ─── PIPELINE METRICS ─────────────────────────────────────────
+STAGE_SECONDS = Histogram(
+    "legalease_stage_duration_seconds",
+    "Duration of pipeline stages (extract_text, split_clauses, ..., explain_urdu.groq)",
+    ("stage",),
+)
+HTTP_SECONDS = Histogram(
+    "legalease_http_request_duration_seconds",
+    "HTTP request duration by route",
+    ("method", "route", "status"),
+)
+LLM_INFLIGHT = Gauge(
+    "legalease_llm_inflight_calls",
+    "LLM provider calls currently in flight",
+    ("provider",),
+)
+EXECUTOR_QUEUE = Gauge(
+    "legalease_executor_queue_depth",
+    "Jobs submitted to an executor that are still waiting for a worker",
+    ("executor",),
+)
+STARTUP_SECONDS = Gauge(
+    "legalease_startup_seconds",
+    "Start-up time by phase (import, startup, warmup)",
+    ("phase",),
+)
+
+
+# ─── PER-REQUEST TIMINGS ──────────────────────────────────────
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+_timings_lock = threading.Lock()     # executor jobs record into the same dict
+
+
+def start_request_timing():
+    """Begin collecting stage timings for the current request; returns a reset token"""
+    return _request_timings.set({})
+
+
+def end_request_timing(token) -> dict:
+    """Stop collecting and return {stage: [total seconds, calls]}"""
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        with _timings_lock:
+            entry = timings.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+
+@contextmanager
+def timed(stage: str):
+    """Time a block as a pipeline stage, even when it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def server_timing_header(timings: dict, total: float) -> str:
+    """Format stage timings as a Server-Timing header value (durations in ms)"""
+    parts = []
+    for stage, (seconds, calls) in timings.items():
+        entry = f"{stage};dur={seconds * 1000:.1f}"
+        if calls > 1:
+            entry += f';desc="{calls} calls"'
+        parts.append(entry)
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+async def run_in_executor(executor, fn, *args, name: str = "default"):
+    """
+    loop.run_in_executor() that keeps EXECUTOR_QUEUE up to date: a job counts
+    as queued from submission until a worker picks it up (or it is cancelled).
+    Like asyncio.to_thread(), the job runs in a copy of the caller's context,
+    so stages it times itself (e.g. "ocr") reach the request's Server-Timing.
+    """
+    context = contextvars.copy_context()
+    profiler = current_profiler()
+    lock = threading.Lock()
+    queued = [True]
+
+    def dequeue():
+        with lock:
+            if queued[0]:
+                queued[0] = False
+                EXECUTOR_QUEUE.dec(executor=name)
+
+    def job():
+        dequeue()
+        if profiler is None:
+            return context.run(fn, *args)
+        # Attribute this thread to the profiled request while the job runs
+        profiler.enter_thread()
+        try:
+            return context.run(fn, *args)
+        finally:
+            profiler.exit_thread()
+
+    EXECUTOR_QUEUE.inc(executor=name)
+    try:
+        return await asyncio.get_event_loop().run_in_executor(executor, job)
+    finally:
+        dequeue()
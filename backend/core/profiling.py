@@ -0,0 +1,195 @@
+# core/profiling.py
+"""
+Opt-in per-request sampling profiler.
+
+Enabled with PROFILE_REQUESTS=1; main.py only installs the middleware then,
+so there is no per-request cost otherwise. A request is profiled when it
+carries `X-Profile: 1` and an `X-Admin-Token` matching ADMIN_TOKEN.
+
+While the request runs, a background thread samples every
+PROFILE_INTERVAL_MS only the threads working for that request: the event
+loop thread while one of the request's tasks is running on it, and executor
+threads while they run a job the request submitted (core.metrics
+.run_in_executor). Other requests running at the same time do not show up
+in the profile. The loop's tasks are tagged by a task factory that is only
+installed while a profile is running; the previous factory is restored
+when the last one stops. Stacks are written in collapsed-stack format, one
+`thread;outer;...;inner count` line per stack, ready for flamegraph.pl or
+speedscope. Files are named after the request id and the directory is
+pruned to the newest PROFILE_MAX_FILES.
+
+Work in other processes (the OCR pool) and in tasks started with a fresh
+context (precompute) is not attributed to the request.
+"""
+import asyncio
+import contextvars
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILE_REQUESTS    = os.getenv("PROFILE_REQUESTS", "").lower() in ("1", "true", "yes")
+PROFILE_DIR         = os.getenv("PROFILE_DIR", os.path.join("storage", "profiles"))
+PROFILE_MAX_FILES   = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+ADMIN_TOKEN         = os.getenv("ADMIN_TOKEN", "")
+
+# Leaf frames in these modules mean a thread is parked waiting for work
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+_REQUEST_ID_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+# Profiler of the request the current task works for, inherited by its child tasks
+_current = contextvars.ContextVar("profiler", default=None)
+
+# loop -> [task factory before ours, running profilers]; only touched on the loop thread
+_factories = {}
+
+
+def is_admin(token: str) -> bool:
+    """Constant-time check of an X-Admin-Token header; False when ADMIN_TOKEN is unset"""
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token or "", ADMIN_TOKEN)
+
+
+def profile_id(request_id: str = None) -> str:
+    """Filesystem-safe id from X-Request-ID, or a fresh one"""
+    cleaned = _REQUEST_ID_RE.sub("", request_id or "")[:64]
+    return cleaned or uuid.uuid4().hex
+
+
+def current_profiler():
+    """Profiler of the request being handled, or None"""
+    return _current.get()
+
+
+def _task_factory(loop, coro, **kwargs):
+    """
+    Tags new tasks with the profiled request they belong to. Installed only
+    while a profile is running; newer Pythons also pass name= and eager_start=.
+    """
+    previous = _factories[loop][0] if loop in _factories else None
+    if previous is not None:
+        task = previous(loop, coro, **kwargs)
+    else:
+        task = asyncio.Task(coro, loop=loop, **kwargs)
+    profiler = (kwargs.get("context") or contextvars.copy_context()).get(_current)
+    if profiler is not None:
+        profiler.tasks.add(task)
+    return task
+
+
+def _install_task_factory(loop):
+    if loop not in _factories:
+        _factories[loop] = [loop.get_task_factory(), 0]
+        loop.set_task_factory(_task_factory)
+    _factories[loop][1] += 1
+
+
+def _remove_task_factory(loop):
+    """Put the previous factory back once the loop's last profile has stopped"""
+    entry = _factories.get(loop)
+    if entry is None:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        del _factories[loop]
+        loop.set_task_factory(entry[0])
+
+
+class SamplingProfiler:
+    """
+    Samples, from a daemon thread until stop(), the stacks of the threads
+    working for one request. Call start() from the request's task.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000.0):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.tasks = weakref.WeakSet()     # the request's tasks (tagged by _task_factory)
+        self._threads = Counter()           # executor threads running the request's jobs
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        _install_task_factory(self.loop)
+        self.tasks.add(asyncio.current_task())
+        self._token = _current.set(self)
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        _current.reset(self._token)
+        _remove_task_factory(self.loop)
+        self._stop.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    def enter_thread(self):
+        """Mark the calling executor thread as working for this request"""
+        with self._threads_lock:
+            self._threads[threading.get_ident()] += 1
+
+    def exit_thread(self):
+        with self._threads_lock:
+            ident = threading.get_ident()
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def _sampled_threads(self) -> set:
+        with self._threads_lock:
+            idents = set(self._threads)
+        if asyncio.current_task(self.loop) in self.tasks:
+            idents.add(self.loop_thread)
+        return idents
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            idents = self._sampled_threads()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident not in idents or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def save(self, name: str) -> str:
+        """Write collapsed stacks to PROFILE_DIR/<name>.folded and prune old files"""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        _prune()
+        return path
+
+
+def _prune():
+    files = sorted(
+        (os.path.join(PROFILE_DIR, f) for f in os.listdir(PROFILE_DIR) if f.endswith(".folded")),
+        key=os.path.getmtime,
+    )
+    for path in files[:-PROFILE_MAX_FILES] if PROFILE_MAX_FILES > 0 else files:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
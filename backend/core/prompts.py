@@ -1,4 +1,10 @@
 # core/prompts.py
+import os
+import re
+
+# Default token budget for the clause context of a single Q&A prompt
+QA_CONTEXT_TOKENS = int(os.getenv("QA_CONTEXT_TOKENS", "600"))
+
 
 def urdu_explanation_prompt(clause_text: str, clause_type: str = "", risk_level: str = "") -> str:
     """Build prompt for Urdu explanation"""
@@ -17,19 +23,15 @@ Requirements:
 Provide ONLY the Urdu explanation."""
 
 
-def qa_prompt(question: str, chunks: list) -> str:
+def qa_prompt(question: str, chunks: list, token_budget: int = QA_CONTEXT_TOKENS,
+              include_urdu: bool = False) -> str:
     """
     Build a structured prompt for Q&A using RAG.
-    chunks = list of clause dicts with keys: id, type, risk, original, urdu
+    chunks = list of clause dicts with keys: id, type, risk, original, urdu (and score)
+    The clause context is assembled by build_context() within `token_budget`.
     """
-    clauses_text = "\n\n".join([
-        f"[Clause {c.get('id', '?')} - {c.get('type', 'General')}]\n"
-        f"Risk: {c.get('risk', 'unknown')}\n"
-        f"Text: {c.get('original', '')}\n"
-        f"Urdu: {c.get('urdu', '')}"
-        for c in chunks
-    ])
-    
+    clauses_text = build_context(chunks, token_budget=token_budget, include_urdu=include_urdu)
+
     prompt = f"""You are a legal assistant helping Pakistani citizens understand contracts.
 
 IMPORTANT: Answer ONLY based on the clauses provided. If the answer is not in these clauses, say you cannot answer.
@@ -54,3 +56,137 @@ Provide your response in this exact format:
 <0.0 to 1.0 - how confident are you this answer is correct based on the document>"""
     
     return prompt
+
+
+def qa_batch_prompt(questions: list, chunks: list, include_urdu: bool = False) -> str:
+    """
+    Build one prompt answering several questions against a shared clause context.
+    questions = list of question strings, numbered [Q1], [Q2], ... in the prompt
+    chunks = deduplicated union of clauses retrieved for all the questions
+    The caller packs questions to its own budget, so no clause is dropped here.
+    """
+    questions_text = "\n".join(f"[Q{n}] {q}" for n, q in enumerate(questions, start=1))
+    clauses_text = build_context(chunks, token_budget=None, include_urdu=include_urdu)
+
+    prompt = f"""You are a legal assistant helping Pakistani citizens understand contracts.
+
+IMPORTANT: Answer ONLY based on the clauses provided. If the answer to a question is not in these clauses, say you cannot answer it.
+
+User Questions (in Urdu or English):
+{questions_text}
+
+Relevant Document Clauses:
+{clauses_text}
+
+Answer EVERY question, in order, using this exact format for each one:
+[Q<number>]
+[ENGLISH]
+<2-3 sentence answer in English>
+
+[URDU]
+<2-3 sentence answer in simple Urdu>
+
+[SOURCE]
+<Which clause(s) this answer is based on (e.g., "Clause 1 - Termination")>
+
+[CONFIDENCE]
+<0.0 to 1.0 - how confident are you this answer is correct based on the document>"""
+
+    return prompt
+
+
+def build_context(chunks: list, token_budget: int = QA_CONTEXT_TOKENS,
+                  include_urdu: bool = False, mmr_lambda: float = 0.7) -> str:
+    """
+    Assemble the clause context of a prompt within a token budget.
+
+    Chunks are picked greedily by maximal marginal relevance: retrieval score
+    minus a penalty for word overlap with chunks already picked. Text a chunk
+    shares with a picked neighbour (the splitter's 100-character overlap) is
+    trimmed. Picked chunks are emitted in clause order. token_budget=None
+    keeps every chunk.
+    """
+    if not chunks:
+        return ""
+
+    max_score = max((c.get("score") or 0.0) for c in chunks)
+    relevance = {
+        id(c): (c.get("score") or 0.0) / max_score if max_score > 0 else 1.0 - i / len(chunks)
+        for i, c in enumerate(chunks)
+    }
+    words = {id(c): set(_WORD_RE.findall(c.get("original", "").lower())) for c in chunks}
+
+    remaining = list(chunks)
+    selected = []   # (chunk, trimmed text)
+    used = 0
+    while remaining:
+        best = max(remaining, key=lambda c: mmr_lambda * relevance[id(c)] - (1 - mmr_lambda) * max(
+            (_jaccard(words[id(c)], words[id(s)]) for s, _ in selected), default=0.0))
+        remaining.remove(best)
+
+        text = _trim_overlap(best, [s for s, _ in selected])
+        cost = estimate_tokens(_format_clause(best, text, include_urdu))
+        if token_budget is not None and used + cost > token_budget:
+            if selected:
+                continue
+            # Always keep the best chunk, cut down to the budget
+            text = text[:max(token_budget * 4 - 100, 200)] + "…"
+            cost = estimate_tokens(_format_clause(best, text, include_urdu))
+        selected.append((best, text))
+        used += cost
+
+    selected.sort(key=lambda pair: pair[0].get("id", 0))
+    return "\n\n".join(_format_clause(c, text, include_urdu) for c, text in selected)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for prompt budgeting"""
+    return len(text) // 4 + 1
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _format_clause(c: dict, text: str, include_urdu: bool) -> str:
+    block = (
+        f"[Clause {c.get('id', '?')} - {c.get('type', 'General')}]\n"
+        f"Risk: {c.get('risk', 'unknown')}\n"
+        f"Text: {text}"
+    )
+    if include_urdu and c.get("urdu"):
+        block += f"\nUrdu: {c['urdu']}"
+    return block
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _trim_overlap(chunk: dict, selected: list, min_overlap: int = 20, max_overlap: int = 200) -> str:
+    """Drop text a chunk shares with the picked clause directly before or after it"""
+    text = chunk.get("original", "")
+    cid = chunk.get("id")
+    if not isinstance(cid, int):
+        return text
+
+    for other in selected:
+        other_text = other.get("original", "")
+        if other.get("id") == cid - 1:
+            k = _overlap_len(other_text, text, min_overlap, max_overlap)
+            if k:
+                text = "…" + text[k:].lstrip()
+        elif other.get("id") == cid + 1:
+            k = _overlap_len(text, other_text, min_overlap, max_overlap)
+            if k:
+                text = text[:-k].rstrip() + "…"
+    return text
+
+
+def _overlap_len(a: str, b: str, min_overlap: int, max_overlap: int) -> int:
+    """Length of the longest suffix of `a` that is also a prefix of `b`"""
+    for k in range(min(len(a), len(b), max_overlap), min_overlap - 1, -1):
+        if a.endswith(b[:k]):
+            return k
+    return 0
@@ -1,68 +1,138 @@
 # core/rag.py
-import faiss
 import pickle
 import os
 import numpy as np
 from typing import List, Dict
 from core.embeddings import embed
+from core.lexical import search_bm25
 from fastapi import HTTPException
 
 STORAGE_PATH = "storage/faiss_indexes"
 
+# Reciprocal rank fusion constant and candidates taken from each ranker
+RRF_K = 60
+MIN_CANDIDATES = 20
+
 def retrieve(document_id: str, query: str, top_k: int = 3) -> List[Dict]:
     """
     Retrieve top-k most relevant clauses for a query using RAG.
-    
+
     Args:
         document_id: Document ID from previous analysis
         query: User's question/query
         top_k: Number of relevant clauses to return
-    
+
     Returns:
         List of relevant clause dictionaries with id, type, text, risk, urdu
+        and a similarity `score`
     """
     if not document_id or not query:
         raise HTTPException(status_code=400, detail="document_id and query are required")
-    
+
+    results = retrieve_many(document_id, [query], top_k=top_k)[0]
+
+    if not results:
+        raise HTTPException(
+            status_code=404,
+            detail="No relevant clauses found for this query"
+        )
+
+    return results
+
+
+def retrieve_many(document_id: str, queries: List[str], top_k: int = 3) -> List[List[Dict]]:
+    """
+    Retrieve top-k clauses for several queries against the same document.
+
+    The index and metadata are loaded once, all queries are embedded in a
+    single vectorized call and searched as one FAISS batch. When the document
+    has a BM25 index, vector and lexical rankings are merged with reciprocal
+    rank fusion and `score` is the fused score.
+
+    Returns:
+        One list of clause dictionaries per query, in the order of `queries`
+    """
+    if not document_id or not queries or any(not q or not q.strip() for q in queries):
+        raise HTTPException(status_code=400, detail="document_id and query are required")
+
+    index, clauses, bm25 = load_document(document_id)
+
+    try:
+        # Embed all queries at once
+        query_embeddings = embed(list(queries))
+
+        # Search FAISS index with the whole query matrix
+        n_candidates = top_k if bm25 is None else max(top_k * 4, MIN_CANDIDATES)
+        distances, indices = index.search(query_embeddings.astype(np.float32), n_candidates)
+
+        results = []
+        for query, row_distances, row in zip(queries, distances, indices):
+            vector_hits = [
+                (int(idx), float(dist)) for dist, idx in zip(row_distances, row)
+                if 0 <= idx < len(clauses)
+            ]
+
+            if bm25 is None:
+                # Legacy index without BM25: score by L2 similarity
+                scored = [(idx, 1.0 / (1.0 + max(dist, 0.0))) for idx, dist in vector_hits]
+            else:
+                lexical_hits, _ = search_bm25(bm25, query, n_candidates)
+                scored = _rrf([idx for idx, _ in vector_hits], [int(i) for i in lexical_hits])
+
+            matches = []
+            for idx, score in scored[:top_k]:
+                clause = clauses[idx].copy()
+                clause["score"] = float(score)
+                matches.append(clause)
+            results.append(matches)
+
+        return results
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"RAG retrieval failed: {str(e)}"
+        )
+
+
+def _rrf(*rankings: List[int]) -> List[tuple]:
+    """Reciprocal rank fusion of several best-first rankings of clause indices"""
+    fused = {}
+    for ranking in rankings:
+        for rank, idx in enumerate(ranking):
+            fused[idx] = fused.get(idx, 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def load_document(document_id: str):
+    """
+    Load the FAISS index, clause metadata and BM25 index stored for a document.
+    The BM25 index is None for documents indexed before it was introduced.
+    Raises 404 if the document was never indexed.
+    """
     index_path = os.path.join(STORAGE_PATH, str(document_id), "index.faiss")
     meta_path = os.path.join(STORAGE_PATH, str(document_id), "meta.pkl")
-    
+    bm25_path = os.path.join(STORAGE_PATH, str(document_id), "bm25.pkl")
+
     # Check if document exists
     if not os.path.exists(index_path) or not os.path.exists(meta_path):
         raise HTTPException(
-            status_code=404, 
+            status_code=404,
             detail=f"Document {document_id} not found. Please re-upload and analyze the document."
         )
-    
+
     try:
-        # Load FAISS index and metadata
+        import faiss  # imported on first use to keep it out of start-up
         index = faiss.read_index(index_path)
         with open(meta_path, "rb") as f:
             clauses = pickle.load(f)
-        
-        # Embed the query
-        query_embedding = embed([query])
-        
-        # Search FAISS index
-        distances, indices = index.search(query_embedding.astype(np.float32), top_k)
-        
-        # Retrieve matching clauses
-        results = []
-        for idx in indices[0]:
-            if 0 <= idx < len(clauses):
-                clause = clauses[idx].copy()
-                results.append(clause)
-        
-        if not results:
-            raise HTTPException(
-                status_code=404,
-                detail="No relevant clauses found for this query"
-            )
-        
-        return results
-        
-    except HTTPException:
-        raise
+        bm25 = None
+        if os.path.exists(bm25_path):
+            with open(bm25_path, "rb") as f:
+                bm25 = pickle.load(f)
+        return index, clauses, bm25
     except Exception as e:
         raise HTTPException(
             status_code=500,
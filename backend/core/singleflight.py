@@ -0,0 +1,84 @@
+# core/singleflight.py
+"""
+Single-flight coalescing of identical concurrent calls.
+
+While a call for a key is in flight, further callers with the same key do
+not start their own: they await the first call's task and get its result
+(or its exception). The shared task runs shielded, so one caller being
+cancelled does not cancel it for the others; it is cancelled only when
+every caller waiting on it has gone.
+
+Results are not kept once the call finishes - this only removes the
+duplicates that a completed-result cache cannot see yet.
+
+The shared task runs in the context of the caller that started it, so
+per-request stage timings and ledger attribution go to that request.
+"""
+import asyncio
+from core.metrics import Counter, Gauge
+
+SINGLEFLIGHT_SHARED = Counter(
+    "legalease_singleflight_shared_total",
+    "Calls that joined an identical call already in flight instead of making their own",
+    ("group",),
+)
+SINGLEFLIGHT_INFLIGHT = Gauge(
+    "legalease_singleflight_inflight",
+    "Distinct calls currently in flight",
+    ("group",),
+)
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, group: str):
+        self.group = group
+        self._loop = None
+        self._flights = {}      # key -> _Flight, for self._loop
+
+    def _current(self) -> dict:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Tasks belong to one event loop; start over on a new one
+            self._loop = loop
+            self._flights = {}
+        return self._flights
+
+    async def do(self, key, fn, on_join=None):
+        """
+        Await `fn()` (a coroutine function), sharing one call among concurrent
+        callers of `key`. `on_join()` is called, in the caller's context, when
+        this caller joins a call another caller started.
+        """
+        flights = self._current()
+        flight = flights.get(key)
+        if flight is None:
+            flight = flights[key] = _Flight(asyncio.ensure_future(fn()))
+            SINGLEFLIGHT_INFLIGHT.inc(group=self.group)
+            flight.task.add_done_callback(lambda _: self._finish(flights, key, flight))
+        else:
+            SINGLEFLIGHT_SHARED.inc(group=self.group)
+            if on_join is not None:
+                on_join()
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller was cancelled: nobody wants the result any more
+                flight.task.cancel()
+                self._finish(flights, key, flight)
+
+    def _finish(self, flights: dict, key, flight: _Flight):
+        if flights.get(key) is flight:
+            del flights[key]
+            SINGLEFLIGHT_INFLIGHT.dec(group=self.group)
@@ -0,0 +1,89 @@
+# core/uploads.py
+"""
+Request body limits for upload endpoints.
+
+UploadLimitMiddleware rejects an upload with 413 as soon as it is known to
+be too large: up front from Content-Length when the client sends one, and
+otherwise while the body streams in (chunked uploads), without waiting for
+the rest of it. The file itself is checked again, exactly, when
+services/text_extractor.py spools it.
+"""
+import json
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Room for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Paths guarded by UploadLimitMiddleware (POST only)
+UPLOAD_PATHS = ("/api/analyze",)
+
+
+class UploadLimitMiddleware:
+    def __init__(self, app, max_body: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+                 paths=UPLOAD_PATHS):
+        self.app = app
+        self.max_body = max_body
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or scope["path"].rstrip("/") not in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        for key, value in scope.get("headers", []):
+            if key == b"content-length":
+                try:
+                    too_large = int(value) > self.max_body
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    await _send_413(send)
+                    return
+
+        state = {"received": 0, "exceeded": False, "started": False}
+
+        async def limited_receive():
+            if state["exceeded"]:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > self.max_body:
+                    # Stop feeding the parser; the app's error response is replaced below
+                    state["exceeded"] = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if state["exceeded"]:
+                if message["type"] == "http.response.start" and not state["started"]:
+                    state["started"] = True
+                    await _send_413(send)
+                return
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not state["exceeded"]:
+                raise
+        if state["exceeded"] and not state["started"]:
+            await _send_413(send)
+
+
+async def _send_413(send):
+    body = json.dumps({"detail": "File exceeds 10MB limit"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -1,15 +1,22 @@
-import faiss
+import json
 import os
 import pickle
+import threading
+import time
+import uuid
 import numpy as np
-from core.embeddings import embed, get_embedding_dim
+from core.embeddings import embed, get_embedding_dim, get_space_id
+from core.lexical import build_bm25
 from fastapi import HTTPException
 
 BASE = "storage/faiss_indexes"
 
+# Serializes info.json read-modify-writes within the process (indexing, summaries)
+_info_lock = threading.Lock()
+
 def create_index(document_id, clauses):
     """
-    Create and store a FAISS index for a document.
+    Create and store a FAISS index and a BM25 lexical index for a document.
     
     Args:
         document_id: Unique identifier for the document
@@ -35,7 +42,8 @@ def create_index(document_id, clauses):
                 detail=f"Embedding dimension mismatch: {vectors.shape[1]} vs {get_embedding_dim()}"
             )
         
-        # Create FAISS index
+        # Create FAISS index (faiss is imported on first use to keep it out of start-up)
+        import faiss
         index = faiss.IndexFlatL2(vectors.shape[1])
         index.add(vectors.astype(np.float32))
         
@@ -49,6 +57,18 @@ def create_index(document_id, clauses):
         # Save clause metadata
         with open(os.path.join(path, "meta.pkl"), "wb") as f:
             pickle.dump(clauses, f)
+
+        # Save BM25 inverted index for exact-term retrieval
+        with open(os.path.join(path, "bm25.pkl"), "wb") as f:
+            pickle.dump(build_bm25(texts), f)
+
+        # Document info; embedding_space tells whether stored vectors of two
+        # documents are comparable (same fitted vectorizer)
+        write_info(document_id, {
+            "num_clauses": len(clauses),
+            "embedding_space": get_space_id(),
+            "created": time.time(),
+        })
         
         return {
             "document_id": document_id,
@@ -62,3 +82,25 @@ def create_index(document_id, clauses):
             status_code=500,
             detail=f"FAISS indexing failed: {str(e)}"
         )
+
+
+def read_info(document_id) -> dict:
+    """info.json of a document, {} if it has none (indexed before it existed)"""
+    path = os.path.join(BASE, str(document_id), "info.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_info(document_id, updates: dict) -> dict:
+    """Merge `updates` into a document's info.json (atomic replace). Blocking."""
+    with _info_lock:
+        info = {**read_info(document_id), **updates}
+        path = os.path.join(BASE, str(document_id), "info.json")
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    return info
+
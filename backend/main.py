@@ -1,19 +1,108 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
+import asyncio
+import importlib
+import os
 import traceback
 
+from core.metrics import (
+    HTTP_SECONDS, STARTUP_SECONDS, start_request_timing, end_request_timing,
+    server_timing_header, render_prometheus,
+)
+from core.admission import AdmissionMiddleware
+from core.uploads import UploadLimitMiddleware
+from core.profiling import (
+    PROFILE_REQUESTS, SamplingProfiler, is_admin, profile_id,
+)
+from core.memory import (
+    MEMORY_TRACE, start_tracing, request_memory_start, request_memory_end,
+)
+
 from api.analyze import router as analyze_router
 from api.qa import router as qa_router
 from api.report import router as report_router
+from api.usage import router as usage_router
+from api.compare import router as compare_router
+from api.admin import router as admin_router
+
+# Heavy dependencies are imported on first use. With WARMUP=1 they are
+# preloaded in a background thread once the server is accepting requests,
+# so the first upload does not pay for them either.
+WARMUP              = os.getenv("WARMUP", "").lower() in ("1", "true", "yes")
+WARMUP_DELAY_SECONDS = float(os.getenv("WARMUP_DELAY_SECONDS", "0.5"))
+
+WARMUP_MODULES = (
+    "faiss",
+    "sklearn.feature_extraction.text",
+    "sklearn.decomposition",
+    "pdfplumber",
+    "docx",
+    "langchain_text_splitters",
+    "reportlab.pdfgen.canvas",
+)
+
+# ─── START-UP ─────────────────────────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup = time.perf_counter() - _IMPORT_STARTED
+    STARTUP_SECONDS.set(startup, phase="startup")
+    print(f"[main] Ready in {startup:.2f}s (imports {_IMPORT_SECONDS:.2f}s)"
+          + (", warming up in background" if WARMUP else ""))
+    if WARMUP:
+        warmup_task = asyncio.create_task(_warm_up())
+    yield
+    if WARMUP and not warmup_task.done():
+        warmup_task.cancel()
+
+async def _warm_up():
+    """Preload heavy modules and LLM clients after the port is bound"""
+    await asyncio.sleep(WARMUP_DELAY_SECONDS)
+    started = time.perf_counter()
+    await asyncio.get_running_loop().run_in_executor(None, _preload)
+    seconds = time.perf_counter() - started
+    STARTUP_SECONDS.set(seconds, phase="warmup")
+    print(f"[main] Warm-up finished in {seconds:.2f}s")
+
+def _preload():
+    from core.llm import get_groq, get_gemini
+    from api.report import _get_urdu_font
+    from services.risk_classifier import get_engine
+
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"[main] Warm-up could not import {name}: {e}")
+    for step in (get_groq, get_gemini, _get_urdu_font, get_engine):
+        try:
+            step()
+        except Exception as e:
+            print(f"[main] Warm-up step {step.__name__} failed: {e}")
 
 app = FastAPI(
     title="LegalEase AI Backend",
     description="Urdu Legal Document Analysis API for Pakistani Citizens",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# ─── ADMISSION CONTROL ────────────────────────────────────────
+# Bounded slots, queue and per-client quotas for /api/analyze (see
+# core/admission.py). Added first so it sits inside CORS and request timing:
+# rejections still carry CORS headers and show up in the metrics.
+app.add_middleware(AdmissionMiddleware)
+
+# ─── UPLOAD LIMITS ────────────────────────────────────────────
+# 413 from Content-Length or while the body streams in, before queueing
+# (see core/uploads.py)
+app.add_middleware(UploadLimitMiddleware)
+
 # ─── CORS MIDDLEWARE ──────────────────────────────────────────
 # Allow frontend to communicate with backend
 app.add_middleware(
@@ -30,6 +119,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ─── REQUEST TIMING MIDDLEWARE ────────────────────────────────
+# Collects per-stage timings for the Server-Timing header and the
+# request duration histogram exposed at /metrics
+@app.middleware("http")
+async def server_timing_middleware(request: Request, call_next):
+    token = start_request_timing()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        total = time.perf_counter() - start
+        timings = end_request_timing(token)
+        HTTP_SECONDS.observe(
+            total,
+            method=request.method,
+            route=_route_label(request),
+            status=status,
+        )
+
+    response.headers["Server-Timing"] = server_timing_header(timings, total)
+    return response
+
+def _route_label(request: Request) -> str:
+    """Route template incl. router prefix (e.g. /api/report/{document_id}), never raw ids"""
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    # Included routers may store the template without their prefix
+    static = template.split("{")[0]
+    idx = request.url.path.find(static)
+    return request.url.path[:idx] + template if idx > 0 else template
+
+# ─── PROFILING MIDDLEWARE ─────────────────────────────────────
+# Only installed with PROFILE_REQUESTS=1; profiles requests sent with
+# X-Profile: 1 and a valid X-Admin-Token (see core/profiling.py)
+if PROFILE_REQUESTS:
+    print("[main] Request profiling enabled (X-Profile + X-Admin-Token)")
+
+    @app.middleware("http")
+    async def profiling_middleware(request: Request, call_next):
+        if request.headers.get("x-profile") != "1" or not is_admin(request.headers.get("x-admin-token")):
+            return await call_next(request)
+
+        name = profile_id(request.headers.get("x-request-id"))
+        profiler = SamplingProfiler().start()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.stop()
+            path = profiler.save(name)
+            print(f"[profile] {request.method} {request.url.path}: "
+                  f"{profiler.samples} samples in {profiler.seconds:.2f}s -> {path}")
+        response.headers["X-Profile-Id"] = name
+        return response
+
+# ─── MEMORY TRACING MIDDLEWARE ────────────────────────────────
+# Only installed with MEMORY_TRACE=1, which also starts tracemalloc; records
+# each request's peak traced memory (see core/memory.py, /api/admin/memory)
+if MEMORY_TRACE:
+    start_tracing()
+
+    @app.middleware("http")
+    async def memory_middleware(request: Request, call_next):
+        probe = request_memory_start()
+        try:
+            return await call_next(request)
+        finally:
+            request_memory_end(probe, request.method, _route_label(request))
+
 # ─── GLOBAL ERROR HANDLER ─────────────────────────────────────
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -75,6 +236,9 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 app.include_router(analyze_router, prefix="/api", tags=["Analysis"])
 app.include_router(qa_router, prefix="/api", tags=["Q&A"])
 app.include_router(report_router, prefix="/api", tags=["Report"])
+app.include_router(usage_router, prefix="/api", tags=["Usage"])
+app.include_router(compare_router, prefix="/api", tags=["Compare"])
+app.include_router(admin_router, prefix="/api", tags=["Admin"])
 
 # ─── HEALTH CHECK ──────────────────────────────────────────────
 @app.get("/")
@@ -90,4 +254,13 @@ def health_check():
 @app.get("/health")
 def health():
     """Alternative health endpoint"""
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+# ─── METRICS ───────────────────────────────────────────────────
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text-format metrics"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+STARTUP_SECONDS.set(_IMPORT_SECONDS, phase="import")
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+models/train_classifier.py
+
+Trains the linear clause classifier (services/clause_model.py) on the
+"train" split of models/clauses.jsonl and writes models/clause_classifier.npz.
+Type and risk are fitted as two multinomial logistic regressions on the
+same hashed features and stored side by side in one weight matrix, with
+log P(risk | type) from the training labels (Laplace-smoothed over the
+pairs that occur) to tie the predicted risk to the predicted type.
+C=30 was chosen by 5-fold cross-validation on the train split.
+
+Needs scikit-learn (training only; serving needs numpy and scipy).
+
+Run from backend/:
+  python -m models.train_classifier
+  python -m models.train_classifier --all     # also train on the test split
+"""
+import argparse
+import json
+import os
+import numpy as np
+
+from services.clause_model import LinearClauseModel, MODEL_PATH, featurize
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "clauses.jsonl")
+
+
+def load_clauses(path: str = DATA_PATH, split: str = None) -> list:
+    """Labeled clauses ({text, type, risk, split}), optionally one split only"""
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [r for r in rows if split is None or r["split"] == split]
+
+
+def _fit(features, labels: list, c: float):
+    from sklearn.linear_model import LogisticRegression
+
+    classes = sorted(set(labels))
+    model = LogisticRegression(C=c, max_iter=2000)
+    model.fit(features, [classes.index(label) for label in labels])
+    # (features x classes) weights; the binary case has a single column
+    coef, bias = model.coef_, model.intercept_
+    if len(classes) == 2:
+        coef, bias = np.vstack([-coef, coef]) / 2, np.array([-bias[0], bias[0]]) / 2
+    return classes, coef.T, bias
+
+
+def _pair_log_prior(rows: list, types: list, risks: list) -> np.ndarray:
+    """log P(risk | type) over the pairs seen in `rows`, -inf for the rest"""
+    counts = np.zeros((len(types), len(risks)))
+    for r in rows:
+        counts[types.index(r["type"]), risks.index(r["risk"])] += 1
+    smoothed = np.where(counts > 0, counts + 1, 0)
+    with np.errstate(divide="ignore"):
+        return np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+
+
+def train(rows: list, c: float = 30.0) -> LinearClauseModel:
+    from scipy.sparse import csr_matrix, hstack
+
+    features = featurize([r["text"] for r in rows])
+    types, type_w, type_b = _fit(features, [r["type"] for r in rows], c)
+    risks, risk_w, risk_b = _fit(features, [r["risk"] for r in rows], c)
+
+    # Only hashed features seen in training get non-zero weights
+    weights = hstack([csr_matrix(type_w), csr_matrix(risk_w)]).tocsr().astype(np.float32)
+    return LinearClauseModel(weights, np.concatenate([type_b, risk_b]), types, risks,
+                             _pair_log_prior(rows, types, risks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the linear clause classifier")
+    parser.add_argument("--all", action="store_true", help="train on both splits")
+    parser.add_argument("--c", type=float, default=30.0, help="inverse regularization strength")
+    parser.add_argument("--out", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    rows = load_clauses() if args.all else load_clauses(split="train")
+    model = train(rows, c=args.c)
+    model.save(args.out)
+    print(f"Trained on {len(rows)} clauses → {os.path.normpath(args.out)} "
+          f"({os.path.getsize(args.out) / 1024:.0f} KB)")
+
+    test = load_clauses(split="test")
+    if test and not args.all:
+        predicted = model.classify([r["text"] for r in test])
+        type_acc = np.mean([p[1] == r["type"] for p, r in zip(predicted, test)])
+        risk_acc = np.mean([p[0] == r["risk"] for p, r in zip(predicted, test)])
+        print(f"Test split ({len(test)} clauses): type accuracy {type_acc:.1%}, risk accuracy {risk_acc:.1%}")
+
+
+if __name__ == "__main__":
+    main()
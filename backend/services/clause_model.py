@@ -0,0 +1,116 @@
+"""
+services/clause_model.py
+
+Linear clause classifier over hashed n-gram features (the "linear" engine of
+services/risk_classifier.py).
+
+Every clause becomes a sparse row of word unigram and bigram counts, hashed
+with CRC-32 into N_FEATURES columns (log-scaled, L2-normalized), so there is
+no vocabulary to ship. The model is one sparse weight matrix whose columns
+are the clause types followed by the risk levels: a whole document is scored
+with a single sparse matrix product, then each clause takes the best type
+column. Risk is tied to that type: risk scores are added to log P(risk | type)
+from the training labels, and risk levels never seen with the type are ruled
+out, so the engine cannot return a (type, risk) pair absent from training.
+
+The artifact (models/clause_classifier.npz) is produced by
+models/train_classifier.py from the labeled clauses in models/clauses.jsonl.
+On the 45-clause test split (python -m benchmarks.bench_classifier):
+
+    engine    type   risk   both
+    keyword   62.2%  37.8%  26.7%
+    linear    62.2%  57.8%  42.2%
+
+The linear engine matches keyword on type and is well ahead on risk; both
+are limited by the small labeled set.
+"""
+import os
+import re
+import zlib
+import numpy as np
+
+N_FEATURES = 2 ** 18
+
+MODEL_PATH = os.getenv(
+    "CLASSIFIER_MODEL",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models", "clause_classifier.npz"),
+)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _hashed_ngrams(text: str) -> list:
+    tokens = _TOKEN_RE.findall(text.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return [zlib.crc32(g.encode("utf-8")) & (N_FEATURES - 1) for g in grams]
+
+
+def featurize(texts: list):
+    """CSR matrix (len(texts) x N_FEATURES) of hashed n-gram features"""
+    from scipy.sparse import csr_matrix
+
+    columns, lengths = [], []
+    for text in texts:
+        hashed = _hashed_ngrams(text)
+        columns.extend(hashed)
+        lengths.append(len(hashed))
+
+    # Repeated (row, column) entries are summed into counts
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    ones = np.ones(len(columns), dtype=np.float32)
+    matrix = csr_matrix((ones, (rows, columns)), shape=(len(texts), N_FEATURES))
+    matrix.sum_duplicates()
+
+    matrix.data = np.log1p(matrix.data)
+    row_of = np.repeat(np.arange(len(texts)), np.diff(matrix.indptr))
+    norms = np.sqrt(np.bincount(row_of, weights=matrix.data ** 2, minlength=len(texts)))
+    matrix.data /= norms[row_of].astype(np.float32)
+    return matrix
+
+
+class LinearClauseModel:
+    name = "linear"
+
+    def __init__(self, weights, bias: np.ndarray, types: list, risks: list, pairs: np.ndarray = None):
+        self.weights = weights      # CSR, N_FEATURES x (len(types) + len(risks))
+        self.bias = bias
+        self.types = types
+        self.risks = risks
+        # len(types) x len(risks): log P(risk | type), -inf for pairs never seen
+        self.pairs = pairs if pairs is not None else np.zeros((len(types), len(risks)), dtype=np.float32)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "LinearClauseModel":
+        from scipy.sparse import csr_matrix
+
+        with np.load(path, allow_pickle=False) as npz:
+            weights = csr_matrix(
+                (npz["data"], npz["indices"], npz["indptr"]),
+                shape=tuple(npz["shape"]),
+            )
+            pairs = npz["pairs"] if "pairs" in npz.files else None
+            return cls(weights, npz["bias"], npz["types"].tolist(), npz["risks"].tolist(), pairs)
+
+    def save(self, path: str):
+        w = self.weights.tocsr()
+        w.eliminate_zeros()
+        np.savez_compressed(
+            path, data=w.data.astype(np.float32), indices=w.indices, indptr=w.indptr,
+            shape=np.array(w.shape), bias=self.bias.astype(np.float32),
+            types=np.array(self.types), risks=np.array(self.risks),
+            pairs=self.pairs.astype(np.float32),
+        )
+
+    def scores(self, texts: list) -> np.ndarray:
+        """(len(texts) x columns) type and risk scores"""
+        return (featurize(texts) @ self.weights).toarray() + self.bias
+
+    def classify(self, texts: list) -> list:
+        """[(risk_level, clause_type), ...] for a batch of clauses"""
+        if not texts:
+            return []
+        scores = self.scores(texts)
+        n_types = len(self.types)
+        type_idx = scores[:, :n_types].argmax(axis=1)
+        risk_idx = (scores[:, n_types:] + self.pairs[type_idx]).argmax(axis=1)
+        return [(self.risks[r], self.types[t]) for r, t in zip(risk_idx.tolist(), type_idx.tolist())]
@@ -1,6 +1,21 @@
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from fastapi import HTTPException
 
+_splitter = None
+
+def _get_splitter():
+    # langchain is slow to import, so it is only loaded for the first document
+    global _splitter
+    if _splitter is None:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        # RecursiveCharacterTextSplitter respects sentence boundaries
+        _splitter = RecursiveCharacterTextSplitter(
+            separators=["\n\n", "\n", ". ", " ", ""],
+            chunk_size=600,      # Size of each clause
+            chunk_overlap=100,   # Context overlap between clauses
+            length_function=len,
+        )
+    return _splitter
+
 def split_clauses(text):
     """
     Split document text into clauses/chunks for analysis.
@@ -18,15 +33,7 @@ def split_clauses(text):
             detail="Document is too short. Provide at least 100 characters."
         )
     
-    # RecursiveCharacterTextSplitter respects sentence boundaries
-    splitter = RecursiveCharacterTextSplitter(
-        separators=["\n\n", "\n", ". ", " ", ""],
-        chunk_size=600,      # Size of each clause
-        chunk_overlap=100,   # Context overlap between clauses
-        length_function=len,
-    )
-    
-    chunks = splitter.split_text(text)
+    chunks = _get_splitter().split_text(text)
     
     if not chunks:
         raise HTTPException(status_code=400, detail="Could not split document into clauses")
@@ -0,0 +1,158 @@
+"""
+services/ocr.py
+
+Local OCR fallback for scanned PDFs (phone scans of stamp-paper agreements).
+
+Uses Tesseract through pytesseract with English + Urdu (OCR_LANGS), so the
+server needs the engine and language packs installed, e.g.:
+  apt install tesseract-ocr tesseract-ocr-eng tesseract-ocr-urd
+
+Only pages without a usable text layer are OCR'd. Each such page is
+rendered with pypdfium2 and recognized in a process pool (OCR_WORKERS,
+default: all cores), and the text is cached on disk by the SHA-256 of the
+rendered page image, so a re-uploaded scan costs a render, not an OCR pass.
+
+A page whose OCR fails (missing language pack, Tesseract crash, broken
+worker) is logged, counted as source="ocr_failed" and left out; the rest
+of the document is still read.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from core.metrics import Counter
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+
+OCR_ENABLED         = os.getenv("OCR_ENABLED", "auto").lower()     # auto | on | off
+OCR_LANGS           = os.getenv("OCR_LANGS", "eng+urd")
+OCR_DPI             = int(os.getenv("OCR_DPI", "300"))
+OCR_WORKERS         = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+OCR_CACHE_DIR       = os.getenv("OCR_CACHE_DIR", os.path.join("storage", "ocr_cache"))
+
+# A page whose text layer has fewer letters than this is treated as scanned
+OCR_MIN_PAGE_CHARS  = int(os.getenv("OCR_MIN_PAGE_CHARS", "20"))
+
+OCR_PAGES = Counter(
+    "legalease_ocr_pages_total",
+    "PDF pages by how their text was obtained",
+    ("source",),
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+_available = None
+
+
+def ocr_available() -> bool:
+    """True if OCR is enabled and pytesseract plus the tesseract binary are installed"""
+    global _available
+    if _available is None:
+        if OCR_ENABLED == "off":
+            _available = False
+        else:
+            try:
+                import pytesseract  # noqa: F401
+                _available = shutil.which("tesseract") is not None
+            except ImportError:
+                _available = False
+            if not _available:
+                print("[ocr] Tesseract not available → scanned PDFs cannot be read "
+                      "(pip install pytesseract; apt install tesseract-ocr tesseract-ocr-urd)")
+    return _available
+
+
+def has_text_layer(text: str) -> bool:
+    """Whether a page's extracted text is usable as-is"""
+    return sum(1 for ch in text or "" if ch.isalpha()) >= OCR_MIN_PAGE_CHARS
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared OCR process pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs an event loop and thread pools is unsafe
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def ocr_pdf_pages(path: str, pages: list, pool: ProcessPoolExecutor = None,
+                  cache_dir: str = OCR_CACHE_DIR) -> dict:
+    """
+    OCR the given 0-based page indexes of the PDF at `path` in parallel.
+    Returns {page_index: text} for the pages that could be read.
+    Blocking: call it off the event loop.
+    """
+    texts = {}
+    try:
+        pool = pool or get_pool()
+        futures = {
+            page: pool.submit(_ocr_page, path, page, OCR_DPI, OCR_LANGS, cache_dir)
+            for page in pages
+        }
+    except Exception as e:
+        _ocr_failed(pages, e)
+        return texts
+
+    for page, future in futures.items():
+        try:
+            _, text, cached = future.result()
+        except Exception as e:
+            _ocr_failed([page], e)
+            continue
+        texts[page] = text
+        OCR_PAGES.inc(source="ocr_cache" if cached else "ocr")
+    return texts
+
+
+def _ocr_failed(pages: list, error: Exception):
+    global _pool
+    OCR_PAGES.inc(len(pages), source="ocr_failed")
+    print(f"[ocr] {len(pages)} page(s) could not be OCR'd ({type(error).__name__}: {error})")
+    if isinstance(error, BrokenProcessPool):
+        # A crashed worker breaks the pool for good: the next upload gets a new one
+        with _pool_lock:
+            _pool = None
+
+
+def ocr_pdf_stream(stream, pages: list) -> dict:
+    """ocr_pdf_pages() for an in-memory or spooled PDF; workers read it from a temp file"""
+    stream.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        shutil.copyfileobj(stream, tmp)
+        path = tmp.name
+    try:
+        return ocr_pdf_pages(path, pages)
+    finally:
+        os.remove(path)
+
+
+def _ocr_page(path: str, page_index: int, dpi: int, langs: str, cache_dir: str) -> tuple:
+    """Worker: render one page, then OCR it unless its image was seen before"""
+    import pypdfium2 as pdfium
+    import pytesseract
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        image = pdf[page_index].render(scale=dpi / 72, grayscale=True).to_pil()
+    finally:
+        pdf.close()
+
+    digest = hashlib.sha256(f"{image.size}".encode() + image.tobytes()).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{digest}.{langs}.txt")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            return page_index, f.read(), True
+
+    text = pytesseract.image_to_string(image, lang=langs)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, cache_path)
+    return page_index, text, False
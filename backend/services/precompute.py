@@ -0,0 +1,185 @@
+"""
+services/precompute.py
+
+Speculative answers to the standard questions users ask first (notice
+period, deposit refund, penalties ...), computed in the background after a
+document is indexed and stored next to it in precomputed.json. A matching
+/api/qa question is then answered from the file without retrieval or an LLM
+call.
+
+Lowest priority: questions are answered one at a time, and each waits until
+fewer than PRECOMPUTE_MAX_BUSY provider calls are running or queued
+(core/llm.py), so live requests always get the LLM slots first. A document
+whose questions are still waiting after PRECOMPUTE_MAX_WAIT_SECONDS is left
+with what it has; those questions are answered live as before.
+
+Questions per document kind (rental, employment, general) default to
+DEFAULT_QUESTIONS; PRECOMPUTE_QUESTIONS_FILE may point to a JSON file of
+the same shape to replace them.
+"""
+from core.llm import busy_calls, has_provider, LLM_MAX_CONCURRENCY
+from core.ledger import set_document
+from core.metrics import Counter
+from services.qa_answerer import answer_question
+from typing import Dict, List, Optional
+import asyncio
+import contextvars
+import json
+import os
+import re
+import time
+import uuid
+
+PRECOMPUTE_QA               = os.getenv("PRECOMPUTE_QA", "1") == "1"
+PRECOMPUTE_QUESTIONS_FILE   = os.getenv("PRECOMPUTE_QUESTIONS_FILE")
+PRECOMPUTE_MAX_BUSY         = int(os.getenv("PRECOMPUTE_MAX_BUSY", str(max(1, LLM_MAX_CONCURRENCY // 4))))
+PRECOMPUTE_MAX_WAIT_SECONDS = float(os.getenv("PRECOMPUTE_MAX_WAIT_SECONDS", "300"))
+PRECOMPUTE_POLL_SECONDS     = 0.25
+
+STORAGE_PATH = "storage/faiss_indexes"
+
+# The first three rental questions are the Q&A page's suggestions (frontend/pages/qa.html)
+DEFAULT_QUESTIONS = {
+    "rental": [
+        "اگر میں نے کرایہ دیر سے دیا تو کیا ہوگا؟",
+        "کیا مالک مکان مجھے بغیر وجہ نکال سکتا ہے؟",
+        "ڈپازٹ واپس کب ملے گا؟",
+        "What is the notice period for ending this agreement?",
+        "When will my security deposit be refunded?",
+        "What penalties apply for late payment?",
+    ],
+    "employment": [
+        "What is the notice period for resignation or termination?",
+        "What penalties apply if I leave early?",
+        "نوکری چھوڑنے کے لیے کتنا نوٹس دینا ہوگا؟",
+    ],
+    "general": [
+        "What happens if I break this agreement?",
+        "How can this agreement be ended?",
+    ],
+}
+
+PRECOMPUTED_QA = Counter(
+    "legalease_precomputed_qa_total",
+    "Q&A questions by whether a precomputed answer served them (hit) or not (miss)",
+    ("result",),
+)
+PRECOMPUTE_QUESTIONS = Counter(
+    "legalease_precompute_questions_total",
+    "Standard questions answered in the background, or dropped waiting for spare LLM capacity",
+    ("status",),
+)
+
+_tasks = set()      # running precompute tasks (keeps them referenced)
+
+_KIND_WORDS = {
+    "rental": ("landlord", "tenant", "lessor", "lessee", "lease", "rent", "rental", "premises", "کرایہ"),
+    "employment": ("employer", "employee", "salary", "employment", "probation", "ملازم"),
+}
+# Whole words only: "rent" must not count inside "current" or "parent"
+_KIND_PATTERNS = {
+    kind: re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")\b")
+    for kind, words in _KIND_WORDS.items()
+}
+
+
+def load_questions() -> Dict[str, List[str]]:
+    """Standard questions per document kind"""
+    if PRECOMPUTE_QUESTIONS_FILE:
+        with open(PRECOMPUTE_QUESTIONS_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    return DEFAULT_QUESTIONS
+
+
+def detect_kind(clauses: List[Dict]) -> str:
+    """rental, employment or general, by which parties the clauses talk about"""
+    text = " ".join(c.get("original", "") for c in clauses).lower()
+    hits = {kind: len(pattern.findall(text)) for kind, pattern in _KIND_PATTERNS.items()}
+    kind = max(hits, key=hits.get)
+    return kind if hits[kind] else "general"
+
+
+def normalize_question(question: str) -> str:
+    """Case, punctuation (including ؟ and ۔) and spacing do not matter for matching"""
+    return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+
+
+def schedule_precompute(document_id: str, clauses: List[Dict]):
+    """Start answering the document's standard questions in the background"""
+    if not PRECOMPUTE_QA or not has_provider():
+        return
+    kind = detect_kind(clauses)
+    questions = load_questions().get(kind) or []
+    if not questions:
+        return
+
+    # A fresh context: the task outlives the request and must not add to its timings
+    task = asyncio.get_running_loop().create_task(
+        _precompute(document_id, kind, questions), context=contextvars.Context()
+    )
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def lookup_precomputed(document_id: str, question: str) -> Optional[Dict]:
+    """Stored answer for `question`, or None; counted as a hit or a miss"""
+    answers = _read(document_id).get("answers", {})
+    answer = answers.get(normalize_question(question))
+    PRECOMPUTED_QA.inc(result="hit" if answer else "miss")
+    if answer is None:
+        return None
+    return {k: v for k, v in answer.items() if k != "question"}
+
+
+async def _precompute(document_id: str, kind: str, questions: List[str]):
+    set_document(document_id)
+    deadline = time.monotonic() + PRECOMPUTE_MAX_WAIT_SECONDS
+    answered = 0
+    for question in questions:
+        if not await _wait_for_spare_capacity(deadline):
+            PRECOMPUTE_QUESTIONS.inc(len(questions) - answered, status="dropped")
+            print(f"[precompute] {document_id[:8]}: no spare LLM capacity, "
+                  f"{len(questions) - answered} questions left for live Q&A")
+            return
+        try:
+            answer = await answer_question(document_id, question, purpose="qa_precompute")
+        except Exception as e:
+            print(f"[precompute] {document_id[:8]}: failed ({e})")
+            return
+        answered += 1
+        # Failed LLM answers are not kept: live Q&A may do better later
+        if answer.get("confidence", 0) > 0:
+            _store(document_id, kind, question, answer)
+        PRECOMPUTE_QUESTIONS.inc(status="answered")
+
+
+async def _wait_for_spare_capacity(deadline: float) -> bool:
+    while busy_calls() >= PRECOMPUTE_MAX_BUSY:
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(PRECOMPUTE_POLL_SECONDS)
+    return True
+
+
+def _path(document_id: str) -> str:
+    return os.path.join(STORAGE_PATH, str(document_id), "precomputed.json")
+
+
+def _read(document_id: str) -> Dict:
+    try:
+        with open(_path(document_id), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _store(document_id: str, kind: str, question: str, answer: Dict):
+    data = _read(document_id)
+    data["kind"] = kind
+    data.setdefault("answers", {})[normalize_question(question)] = {"question": question, **answer}
+
+    path = _path(document_id)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
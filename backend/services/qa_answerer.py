@@ -0,0 +1,98 @@
+"""
+services/qa_answerer.py
+
+Answers one question about an indexed document: hybrid retrieval
+(core/rag.py), a prompt built within the context budget (core/prompts.py)
+and the shared providers in core/llm.py (Groq first, Gemini as fallback).
+
+Used by POST /api/qa and by the background precompute of standard
+questions (services/precompute.py); /api/qa/batch parses its sections with
+the same parse_qa_response().
+"""
+from core.rag import retrieve
+from core.prompts import qa_prompt, estimate_tokens
+from core.metrics import timed
+from core.llm import complete
+import re
+
+# Candidate clauses retrieved per question; build_context() keeps what fits the budget
+QA_CANDIDATES = 5
+
+
+async def answer_question(document_id: str, question: str, include_urdu: bool = False,
+                          purpose: str = "qa") -> dict:
+    """Retrieve context for one question and answer it with the LLM"""
+    with timed("retrieve"):
+        chunks = retrieve(document_id, question, top_k=QA_CANDIDATES)
+
+    if not chunks:
+        return no_clauses_answer()
+
+    prompt = qa_prompt(question, chunks, include_urdu=include_urdu)
+    prompt_tokens = estimate_tokens(prompt)
+
+    # Groq first, Gemini as fallback
+    response_text = await complete(prompt, purpose=purpose, max_tokens=400, stage="qa")
+
+    if not response_text:
+        return {**unavailable_answer(chunks), "prompt_tokens": prompt_tokens}
+
+    answer_en, answer_ur, source, confidence = parse_qa_response(response_text, chunks)
+    return {
+        "answer_en": answer_en,
+        "answer_ur": answer_ur,
+        "source_clause": source,
+        "confidence": confidence,
+        "prompt_tokens": prompt_tokens
+    }
+
+
+def no_clauses_answer() -> dict:
+    return {
+        "answer_en": "No relevant clauses found in the document for this question.",
+        "answer_ur": "آپ کے سوال کے لیے دستاویز میں متعلقہ شق نہیں ملی۔",
+        "source_clause": None,
+        "confidence": 0.0
+    }
+
+
+def unavailable_answer(chunks: list) -> dict:
+    return {
+        "answer_en": "AI service temporarily unavailable. Check your API keys in .env",
+        "answer_ur": "AI سروس عارضی طور پر دستیاب نہیں۔ .env فائل میں API key چیک کریں۔",
+        "source_clause": f"Clause {chunks[0]['id']} - {chunks[0]['type']}" if chunks else None,
+        "confidence": 0.0
+    }
+
+
+def parse_qa_response(response_text: str, chunks: list) -> tuple:
+    """(answer_en, answer_ur, source, confidence) from a [ENGLISH]/[URDU]/[SOURCE]/[CONFIDENCE] reply"""
+    try:
+        en_match   = re.search(r'\[ENGLISH\](.*?)\[URDU\]',      response_text, re.DOTALL)
+        ur_match   = re.search(r'\[URDU\](.*?)\[SOURCE\]',       response_text, re.DOTALL)
+        src_match  = re.search(r'\[SOURCE\](.*?)\[CONFIDENCE\]', response_text, re.DOTALL)
+        conf_match = re.search(r'\[CONFIDENCE\](.*?)$',           response_text, re.DOTALL)
+
+        answer_en = en_match.group(1).strip()  if en_match  else response_text[:300]
+        answer_ur = ur_match.group(1).strip()  if ur_match  else "جواب دستیاب نہیں۔"
+        source    = src_match.group(1).strip() if src_match else (
+            f"Clause {chunks[0]['id']} - {chunks[0]['type']}" if chunks else None
+        )
+        confidence = 0.85
+        if conf_match:
+            try:
+                raw = ''.join(c for c in conf_match.group(1).strip() if c.isdigit() or c == '.')
+                val = float(raw)
+                confidence = val / 100 if val > 1 else val
+                confidence = max(0.0, min(1.0, confidence))
+            except Exception:
+                confidence = 0.85
+
+        return answer_en, answer_ur, source, confidence
+    except Exception:
+        return (
+            response_text[:300] if response_text else "Could not process the answer.",
+            "جواب دستیاب نہیں۔",
+            f"Clause {chunks[0]['id']} - {chunks[0]['type']}" if chunks else None,
+            0.5
+        )
@@ -0,0 +1,126 @@
+"""
+services/summarizer.py
+
+One-paragraph Urdu summary of a whole document, map-reduce style:
+
+1. Map: clauses are grouped by (type, risk) and every group's Urdu
+   explanations are condensed into one or two sentences, all groups
+   concurrently (subject to LLM_MAX_CONCURRENCY in core/llm.py). A group
+   with a single clause uses its explanation as-is, and a group whose map
+   call fails or comes back empty falls back to its shortest explanations,
+   so one failed call does not drop that part of the contract.
+2. Reduce: the group summaries, riskiest first, are combined into the
+   final paragraph.
+
+Both stages work from the per-clause `urdu` text already generated, never
+the original clauses, so prompts stay small however long the contract is.
+Without an LLM a count-based summary is returned instead.
+"""
+from core.llm import complete
+from core.metrics import timed
+import asyncio
+import os
+
+# Characters of Urdu explanations per map prompt; larger groups are split
+SUMMARY_GROUP_CHARS = int(os.getenv("SUMMARY_GROUP_CHARS", "3000"))
+# Explanations a group keeps when its map call fails
+SUMMARY_FALLBACK_TEXTS = 2
+
+RISK_ORDER = {"high": 0, "medium": 1, "safe": 2}
+RISK_URDU  = {"high": "زیادہ خطرہ", "medium": "درمیانہ خطرہ", "safe": "محفوظ"}
+
+
+async def summarize_document(clauses: list) -> str:
+    """Urdu summary of a document from its analyzed clauses (dicts with type, risk, urdu)"""
+    if not clauses:
+        return ""
+
+    groups = _group(clauses)
+    with timed("summarize.map"):
+        partials = await asyncio.gather(*[
+            _summarize_group(clause_type, risk, texts)
+            for (clause_type, risk), texts in groups
+        ])
+
+    partials = [p for p in partials if p]
+    if not partials:
+        return fallback_summary(clauses)
+    if len(partials) == 1:
+        return partials[0]
+
+    prompt = (
+        "You are a Pakistani legal assistant. Below are short Urdu summaries of the "
+        "parts of one contract, most risky first. Combine them into ONE paragraph "
+        "(4-6 sentences) of VERY SIMPLE Urdu for the person about to sign it.\n\n"
+        "Rules:\n"
+        "- Start with what kind of agreement this is\n"
+        "- Mention the risky parts first and clearly\n"
+        "- End with one practical tip\n"
+        "- NO English words except proper nouns\n\n"
+        + "\n".join(f"- {p}" for p in partials)
+        + "\n\nUrdu summary:"
+    )
+    with timed("summarize.reduce"):
+        result = await complete(prompt, purpose="summarize", max_tokens=350, temperature=0.4)
+    return result or fallback_summary(clauses)
+
+
+def _group(clauses: list) -> list:
+    """[((type, risk), [urdu, ...]), ...], riskiest groups first, oversized groups split"""
+    grouped = {}
+    for clause in clauses:
+        urdu = " ".join((clause.get("urdu") or "").split())
+        if urdu:
+            grouped.setdefault((clause.get("type", "General"), clause.get("risk", "safe")), []).append(urdu)
+
+    groups = []
+    for key in sorted(grouped, key=lambda k: (RISK_ORDER.get(k[1], 3), k[0])):
+        chunk, size = [], 0
+        for text in grouped[key]:
+            if chunk and size + len(text) > SUMMARY_GROUP_CHARS:
+                groups.append((key, chunk))
+                chunk, size = [], 0
+            chunk.append(text)
+            size += len(text)
+        groups.append((key, chunk))
+    return groups
+
+
+async def _summarize_group(clause_type: str, risk: str, texts: list) -> str:
+    if len(texts) == 1:
+        return texts[0]
+
+    prompt = (
+        "Below are Urdu explanations of several clauses of the same contract, all of type "
+        f"'{clause_type}' with risk level '{risk}'. Summarize what they say together in "
+        "1-2 sentences of VERY SIMPLE Urdu. Keep any warning. NO English words except "
+        "proper nouns.\n\n"
+        + "\n".join(f"- {t}" for t in texts)
+        + "\n\nUrdu summary:"
+    )
+    try:
+        result = await complete(prompt, purpose="summarize_group", max_tokens=150, temperature=0.4)
+    except Exception as e:
+        print(f"[summarizer] group '{clause_type}/{risk}' failed ({e})")
+        result = None
+    if result and result.strip():
+        return result
+    # The shortest explanations, in clause order, stand in for the group summary
+    shortest = sorted(sorted(range(len(texts)), key=lambda i: len(texts[i]))[:SUMMARY_FALLBACK_TEXTS])
+    return " ".join(texts[i] for i in shortest)
+
+
+def fallback_summary(clauses: list) -> str:
+    """Count-based Urdu summary, used when no LLM summary is available"""
+    counts = {risk: 0 for risk in RISK_ORDER}
+    for clause in clauses:
+        counts[clause.get("risk", "safe")] = counts.get(clause.get("risk", "safe"), 0) + 1
+
+    summary = (
+        f"اس دستاویز میں کل {len(clauses)} شقیں ہیں: "
+        f"{counts['high']} {RISK_URDU['high']}، {counts['medium']} {RISK_URDU['medium']} "
+        f"اور {counts['safe']} {RISK_URDU['safe']}۔"
+    )
+    if counts["high"]:
+        summary += " دستخط کرنے سے پہلے خطرناک شقوں کو غور سے پڑھیں اور کسی ماہر سے مشورہ کریں۔"
+    return summary
@@ -1,97 +1,184 @@
-import pdfplumber
-import docx
 import tempfile
+import zipfile
 import os
 from fastapi import HTTPException
 from typing import Union
+from core.metrics import run_in_executor, timed
+from core.uploads import MAX_UPLOAD_BYTES
+from services.ocr import OCR_PAGES, has_text_layer, ocr_available, ocr_pdf_stream
+
+UPLOAD_CHUNK_BYTES = 64 * 1024
+SPOOL_MEMORY_BYTES = 1024 * 1024     # larger uploads spill to a temp file on disk
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+# Magic numbers checked against the first bytes of the upload
+_PDF_MAGIC = b"%PDF-"
+_PDF_LEAD  = 16                                     # BOM/whitespace allowed before %PDF-
+_ZIP_MAGIC = b"PK\x03\x04"
+_OLE_MAGIC = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"    # legacy .doc / .xls / .ppt
 
 async def extract_text(file) -> str:
     """
     Extract text from uploaded file (PDF, DOCX, TXT).
-    Handles multiple encodings and file types safely.
+    The upload is copied in chunks into a spooled buffer (aborting past
+    MAX_UPLOAD_BYTES), its type is sniffed from magic bytes rather than
+    trusted from the filename, and parsing runs off the event loop.
     """
     if not file or not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
     
     suffix = file.filename.lower()
     
+    # Legacy Word files can't be parsed; reject before reading the body
+    if suffix.endswith(".doc"):
+        raise HTTPException(
+            status_code=400,
+            detail="Legacy .doc files are not supported. Save the document as DOCX or PDF."
+        )
+
     # Validate file type
-    if not any(suffix.endswith(ext) for ext in [".pdf", ".docx", ".doc", ".txt"]):
+    if not suffix.endswith(SUPPORTED_EXTENSIONS):
         raise HTTPException(
             status_code=400, 
-            detail="Unsupported file format. Use PDF, DOCX, DOC, or TXT"
+            detail="Unsupported file format. Use PDF, DOCX, or TXT"
         )
     
-    temp_path = None
+    spool = None
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(suffix)[1]) as tmp:
-            content = file.file.read()
-            tmp.write(content)
-            temp_path = tmp.name
-        
-        # Extract text based on file type
-        if suffix.endswith(".pdf"):
-            return _extract_pdf(temp_path)
-        elif suffix.endswith((".docx", ".doc")):
-            return _extract_docx(temp_path)
-        elif suffix.endswith(".txt"):
-            return _extract_txt(temp_path)
+        spool = await _spool_upload(file)
+        kind = _sniff(spool, suffix)
+
+        # Extract text based on the detected type
+        extractor = {"pdf": _extract_pdf, "docx": _extract_docx, "txt": _extract_txt}[kind]
+        return await run_in_executor(None, extractor, spool)
             
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File extraction failed: {str(e)}")
     finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-
-def _extract_pdf(path: str) -> str:
-    """Extract text from PDF file"""
+        if spool is not None:
+            spool.close()
+
+async def _spool_upload(file) -> tempfile.SpooledTemporaryFile:
+    """Copy the upload in chunks, failing as soon as it exceeds MAX_UPLOAD_BYTES"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            spool.close()
+            raise HTTPException(status_code=413, detail="File exceeds 10MB limit")
+        spool.write(chunk)
+    if size == 0:
+        spool.close()
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    spool.seek(0)
+    return spool
+
+def _sniff(spool, suffix: str) -> str:
+    """Detect pdf / docx / txt from the content; the extension only decides for plain text"""
+    head = spool.read(1024)
+    spool.seek(0)
+
+    if _is_pdf(head):
+        return "pdf"
+    if head.startswith(_OLE_MAGIC):
+        raise HTTPException(
+            status_code=400,
+            detail="Legacy .doc files are not supported. Save the document as DOCX or PDF."
+        )
+    if head.startswith(_ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(spool) as archive:
+                is_docx = "word/document.xml" in archive.namelist()
+        except zipfile.BadZipFile:
+            is_docx = False
+        spool.seek(0)
+        if not is_docx:
+            raise HTTPException(status_code=400, detail="ZIP archive is not a Word (DOCX) document")
+        return "docx"
+    if suffix.endswith(".txt") and _looks_like_text(head):
+        return "txt"
+    raise HTTPException(
+        status_code=400,
+        detail=f"File content does not match its {os.path.splitext(suffix)[1]} extension"
+    )
+
+def _is_pdf(head: bytes) -> bool:
+    """%PDF- at the start, after at most a UTF-8 BOM and a little whitespace"""
+    lead = head[:_PDF_LEAD + len(_PDF_MAGIC)]
+    if lead.startswith(b"\xef\xbb\xbf"):
+        lead = lead[3:]
+    return lead.lstrip(b" \t\r\n\x00").startswith(_PDF_MAGIC)
+
+def _looks_like_text(head: bytes) -> bool:
+    """No NUL bytes, unless it is UTF-16 with a byte order mark"""
+    return head.startswith((b"\xff\xfe", b"\xfe\xff")) or b"\x00" not in head
+
+def _extract_pdf(stream) -> str:
+    """
+    Extract text from PDF file. Pages without a usable text layer (scans)
+    are OCR'd when Tesseract is installed, see services/ocr.py.
+    """
+    import pdfplumber  # parsers are imported on first use to keep them out of start-up
+    from pdfplumber.utils.exceptions import MalformedPDFException, PdfminerException
     try:
-        with pdfplumber.open(path) as pdf:
+        with pdfplumber.open(stream) as pdf:
             if len(pdf.pages) == 0:
                 raise HTTPException(status_code=400, detail="PDF file is empty")
-            text = "\n".join(
-                (page.extract_text() or "") for page in pdf.pages
+            pages = [(page.extract_text() or "") for page in pdf.pages]
+
+        scanned = [i for i, page_text in enumerate(pages) if not has_text_layer(page_text)]
+        OCR_PAGES.inc(len(pages) - len(scanned), source="text_layer")
+        if scanned and ocr_available():
+            with timed("ocr"):
+                for i, page_text in ocr_pdf_stream(stream, scanned).items():
+                    pages[i] = page_text
+
+        text = "\n".join(pages)
+        if not text.strip():
+            raise HTTPException(
+                status_code=400, 
+                detail="PDF contains no readable text, even after OCR." if ocr_available()
+                else "PDF contains no extractable text. Scanned images need OCR, "
+                     "which is not installed on this server."
             )
-            if not text.strip():
-                raise HTTPException(
-                    status_code=400, 
-                    detail="PDF contains no extractable text. Scanned images need OCR."
-                )
-            return text
-    except pdfplumber.exceptions.PDFException as e:
-        raise HTTPException(status_code=400, detail=f"PDF parsing error: {str(e)}")
+        return text
     except HTTPException:
         raise
+    except (PdfminerException, MalformedPDFException) as e:
+        raise HTTPException(status_code=400, detail=f"PDF parsing error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"PDF processing failed: {str(e)}")
 
-def _extract_docx(path: str) -> str:
+def _extract_docx(stream) -> str:
     """Extract text from DOCX file"""
+    import docx
     try:
-        doc = docx.Document(path)
+        doc = docx.Document(stream)
         text = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
         if not text.strip():
             raise HTTPException(status_code=400, detail="DOCX file contains no text")
         return text
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"DOCX parsing error: {str(e)}")
 
-def _extract_txt(path: str) -> str:
+def _extract_txt(stream) -> str:
     """Extract text from TXT file with encoding detection"""
     encodings = ["utf-8", "utf-16", "latin-1", "cp1252", "iso-8859-1"]
+    raw = stream.read()
     text = None
     
     for encoding in encodings:
         try:
-            with open(path, "r", encoding=encoding) as f:
-                text = f.read()
+            text = raw.decode(encoding)
             if text.strip():
                 return text
         except (UnicodeDecodeError, LookupError):
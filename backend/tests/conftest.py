@@ -0,0 +1,26 @@
+# tests/conftest.py
+"""
+Run from backend/:  python -m pytest -q
+
+Modules are imported the way main.py imports them (core.x, api.x,
+services.x). No API keys or network are needed: LLM calls are patched.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests must never reach a real provider
+os.environ["GROQ_API_KEY"] = ""
+os.environ["GEMINI_API_KEY"] = ""
+# ...or write a usage ledger into the source tree (test_ledger.py turns it on per test)
+os.environ["LLM_LEDGER"] = "off"
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory: storage/ paths are relative to the working directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
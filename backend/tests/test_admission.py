@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from core.admission import AdmissionController, AdmissionMiddleware, Rejected, client_id
+
+
+def _controller(**kwargs):
+    options = dict(max_active=1, max_queue=1, per_client=0, queue_timeout=5.0)
+    options.update(kwargs)
+    return AdmissionController("/test", **options)
+
+
+def test_queue_full_is_503_with_retry_after():
+    async def main():
+        c = _controller()
+        await c.acquire("a")
+        queued = asyncio.create_task(c.acquire("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as err:
+            await c.acquire("c")
+        c.release("a", 2.0)
+        assert await queued >= 0.0
+        return err.value
+
+    e = asyncio.run(main())
+    assert (e.status, e.reason) == (503, "queue_full")
+    assert e.retry_after >= 1
+
+
+def test_slot_is_handed_to_the_oldest_waiter():
+    async def main():
+        c = _controller(max_queue=2)
+        await c.acquire("a")
+        order = []
+
+        async def waiter(name):
+            await c.acquire(name)
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter(n)) for n in ("b", "c")]
+        await asyncio.sleep(0)
+        c.release("a", 1.0)
+        await asyncio.sleep(0)
+        c.release("b", 1.0)
+        await asyncio.gather(*tasks)
+        return order, c
+
+    order, c = asyncio.run(main())
+    assert order == ["b", "c"]
+    assert c.active == 1 and not c.waiters
+
+
+def test_queue_timeout_is_503_and_frees_the_place():
+    async def main():
+        c = _controller(queue_timeout=0.05)
+        await c.acquire("a")
+        with pytest.raises(Rejected) as err:
+            await c.acquire("b")
+        return err.value, c
+
+    e, c = asyncio.run(main())
+    assert e.reason == "queue_timeout"
+    assert not c.waiters and "b" not in c.clients
+
+
+def test_per_client_quota_is_429_only_when_enabled():
+    async def main(per_client):
+        c = _controller(max_active=5, per_client=per_client)
+        await c.acquire("same")
+        await c.acquire("same")
+        await c.acquire("same")
+
+    with pytest.raises(Rejected) as err:
+        asyncio.run(main(per_client=2))
+    assert (err.value.status, err.value.reason) == (429, "client_quota")
+
+    asyncio.run(main(per_client=0))     # disabled by default: no quota
+
+
+def test_client_id_prefers_header():
+    scope = {"headers": [(b"x-client-id", b"browser-1")], "client": ("10.0.0.1", 5000)}
+    assert client_id(scope) == "browser-1"
+    assert client_id({"headers": [], "client": ("10.0.0.1", 5000)}) == "10.0.0.1"
+
+
+def test_middleware_rejects_before_reading_the_body():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = AdmissionMiddleware(app)
+    middleware.controllers["/api/analyze"] = _controller(max_queue=0)
+
+    async def request():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            raise AssertionError("body must not be read")
+
+        scope = {"type": "http", "method": "POST", "path": "/api/analyze", "headers": [], "client": ("1.2.3.4", 1)}
+        await middleware(scope, receive, send)
+        return sent
+
+    async def main():
+        return await asyncio.gather(request(), request())
+
+    first, second = asyncio.run(main())
+    assert first[0]["status"] == 200
+    assert second[0]["status"] == 503
+    assert dict(second[0]["headers"])[b"retry-after"].isdigit()
+    assert calls == ["/api/analyze"]
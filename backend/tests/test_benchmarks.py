@@ -0,0 +1,56 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.corpus import LINES_PER_PAGE, build_corpus, generate_contract
+from benchmarks.mock_llm import MockLLMConfig, _answer, start_mock_llm
+from services.text_extractor import _extract_docx, _extract_pdf, _extract_txt
+
+EXTRACTORS = {"txt": _extract_txt, "docx": _extract_docx, "pdf": _extract_pdf}
+
+
+def test_contract_is_deterministic_and_sized():
+    text = generate_contract(3, seed=1)
+    assert text == generate_contract(3, seed=1)
+    assert text != generate_contract(3, seed=2)
+    assert len(text.split("\n")) == 3 * LINES_PER_PAGE
+
+
+@pytest.mark.parametrize("fmt", ["txt", "docx", "pdf"])
+def test_corpus_formats_are_extractable(tmp_path, fmt):
+    (path,) = build_corpus(str(tmp_path), pages=[1], formats=[fmt])
+    with open(path, "rb") as f:
+        text = EXTRACTORS[fmt](f)
+    assert "RENTAL AGREEMENT" in text
+
+
+def test_mock_answers_every_batch_question():
+    reply = _answer("[Q1] a\n[Q2] b\n[ENGLISH]")
+    assert reply.count("[ENGLISH]") == 2
+    assert reply.index("[Q1]") < reply.index("[Q2]")
+    assert "[ENGLISH]" not in _answer("Explain this clause in Urdu")
+
+
+def _post(url):
+    body = json.dumps({"model": "m", "messages": [{"role": "user", "content": "[ENGLISH] q"}]}).encode()
+    req = urllib.request.Request(url + "/chat/completions", data=body, method="POST",
+                                 headers={"Content-Type": "application/json"})
+    return urllib.request.urlopen(req, timeout=5)
+
+
+def test_mock_server_rate_limits_with_retry_after():
+    server, url = start_mock_llm(MockLLMConfig(median_ms=1, rpm=1))
+    try:
+        with _post(url) as resp:
+            payload = json.loads(resp.read())
+        assert payload["choices"][0]["message"]["content"].startswith("[ENGLISH]")
+        assert payload["usage"]["prompt_tokens"] > 0
+
+        with pytest.raises(urllib.error.HTTPError) as err:
+            _post(url)
+        assert err.value.code == 429
+        assert float(err.value.headers["retry-after"]) > 0
+    finally:
+        server.shutdown()
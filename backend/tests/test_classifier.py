@@ -0,0 +1,82 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from services import clause_model, risk_classifier
+from services.clause_model import LinearClauseModel, featurize
+
+pytest.importorskip("scipy")
+
+
+@pytest.fixture(autouse=True)
+def fresh_engines(monkeypatch):
+    monkeypatch.setattr(risk_classifier, "_engines", {})
+
+
+def test_featurize_rows_are_l2_normalized():
+    matrix = featurize(["rent rent is due", "deposit", ""])
+    assert matrix.shape == (3, clause_model.N_FEATURES)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+    assert norms[:2] == pytest.approx([1.0, 1.0], abs=1e-6)
+    assert matrix[2].nnz == 0
+
+
+def test_featurize_counts_repeats_and_bigrams():
+    row = featurize(["rent rent"])
+    # "rent" twice (log-scaled count) and the bigram "rent rent" once
+    assert row.nnz == 2
+    assert sorted(row.data / row.data.min()) == pytest.approx([1.0, np.log1p(2) / np.log1p(1)])
+
+
+def test_linear_engine_loads_the_shipped_model():
+    engine = risk_classifier.get_engine("linear")
+    assert engine.name == "linear"
+    assert risk_classifier.get_engine("LINEAR") is engine
+    assert "Termination" in engine.types and set(engine.risks) <= {"high", "medium", "safe"}
+
+
+def test_missing_model_falls_back_to_keyword(monkeypatch, tmp_path):
+    monkeypatch.setattr(clause_model, "MODEL_PATH", str(tmp_path / "missing.npz"))
+    assert risk_classifier.get_engine("linear").name == "keyword"
+
+
+def test_unknown_engine_falls_back_to_keyword():
+    assert risk_classifier.get_engine("neural").name == "keyword"
+
+
+def test_classify_batch_keeps_order_and_short_clauses():
+    texts = [
+        "The landlord may terminate this agreement with seven days notice.",
+        "Short.",
+        "",
+        "The security deposit shall be refunded within thirty days of vacating.",
+    ]
+    for engine in ("keyword", "linear"):
+        results = risk_classifier.classify_batch(texts, engine=engine)
+        assert len(results) == 4
+        assert results[1] == results[2] == risk_classifier.SHORT_CLAUSE
+        assert all(risk in ("high", "medium", "safe") for risk, _ in results)
+        assert results[0][1] == "Termination"
+
+
+def test_saved_model_loads_back(tmp_path):
+    model = LinearClauseModel.load(clause_model.MODEL_PATH)
+    path = str(tmp_path / "copy.npz")
+    model.save(path)
+    copy = LinearClauseModel.load(path)
+    with open(os.path.join(os.path.dirname(clause_model.MODEL_PATH), "clauses.jsonl"), encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f][:20]
+    assert copy.classify(texts) == model.classify(texts)
+
+
+def test_linear_risk_is_tied_to_the_predicted_type():
+    model = LinearClauseModel.load(clause_model.MODEL_PATH)
+    assert model.pairs.shape == (len(model.types), len(model.risks))
+    assert np.isneginf(model.pairs).any()
+
+    with open(os.path.join(os.path.dirname(clause_model.MODEL_PATH), "clauses.jsonl"), encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f]
+    for risk, type_ in model.classify(texts):
+        assert np.isfinite(model.pairs[model.types.index(type_), model.risks.index(risk)])
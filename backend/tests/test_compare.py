@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import compare
+from core.compare import align, is_riskier, similarity_matrix
+from core.vectorstore import create_index, write_info
+
+TEMPLATE = [
+    ("Payment", "safe", "The tenant shall pay the monthly rent before the fifth day of each month."),
+    ("Termination", "safe", "Either party may terminate this agreement with sixty days written notice."),
+    ("Security Deposit", "safe", "The security deposit is refunded within thirty days of vacating the premises."),
+]
+DRAFT = [
+    ("Termination", "high", "The landlord may terminate this agreement with seven days written notice."),
+    ("Payment", "safe", "The tenant shall pay the monthly rent before the fifth day of each month."),
+    ("Arbitration", "high", "All disputes go to binding arbitration and the tenant waives court remedies."),
+]
+
+
+def test_similarity_matrix_is_cosine():
+    a = np.array([[1.0, 0.0], [0.0, 2.0]])
+    b = np.array([[3.0, 0.0], [1.0, 1.0], [0.0, 0.0]])
+    s = similarity_matrix(a, b)
+    assert s.shape == (2, 3)
+    assert s[0, 0] == pytest.approx(1.0)
+    assert s[1, 1] == pytest.approx(np.sqrt(0.5))
+    assert s[0, 2] == 0.0      # zero vectors do not divide by zero
+
+
+def test_align_is_one_to_one_and_optimal():
+    # Greedy would pair row 0 with col 0 (0.9) and leave row 1 with 0.1
+    s = np.array([[0.9, 0.8], [0.85, 0.1]])
+    pairs, rows, cols = align(s, threshold=0.5)
+    assert sorted((i, j) for i, j, _ in pairs) == [(0, 1), (1, 0)]
+    assert rows == [] and cols == []
+
+
+def test_align_threshold_and_rectangular_input():
+    s = np.array([[0.9, 0.2, 0.1], [0.3, 0.4, 0.2]])
+    pairs, rows, cols = align(s, threshold=0.5)
+    assert [(i, j) for i, j, _ in pairs] == [(0, 0)]
+    assert rows == [1]
+    assert cols == [1, 2]
+
+
+def test_is_riskier():
+    assert is_riskier({"risk": "safe"}, {"risk": "high"})
+    assert not is_riskier({"risk": "high"}, {"risk": "medium"})
+    assert not is_riskier({"risk": "medium"}, {"risk": "unknown"})
+
+
+def _index(document_id, rows):
+    create_index(document_id, [
+        {"id": i + 1, "type": t, "risk": r, "original": text, "urdu": ""}
+        for i, (t, r, text) in enumerate(rows)
+    ])
+
+
+@pytest.mark.parametrize("same_space", [True, False])
+def test_compare_endpoint(workdir, same_space):
+    _index("template", TEMPLATE)
+    _index("draft", DRAFT)
+    if not same_space:
+        write_info("draft", {"embedding_space": "another-vectorizer"})
+
+    app = FastAPI()
+    app.include_router(compare.router, prefix="/api")
+    response = TestClient(app).post("/api/compare", json={
+        "base_document_id": "template", "other_document_id": "draft", "min_similarity": 0.3,
+    })
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["embedding"] == ("stored" if same_space else "re-embedded")
+    assert {"base_id": 1, "other_id": 2} in [
+        {k: m[k] for k in ("base_id", "other_id")} for m in body["matched"]
+    ]
+    assert [r["other"]["type"] for r in body["riskier"]] == ["Termination"]
+    assert [c["type"] for c in body["missing"]] == ["Security Deposit"]
+    assert [c["type"] for c in body["added"]] == ["Arbitration"]
+
+
+def test_compare_unknown_document_is_404(workdir):
+    app = FastAPI()
+    app.include_router(compare.router, prefix="/api")
+    response = TestClient(app).post("/api/compare", json={
+        "base_document_id": "nope", "other_document_id": "nada",
+    })
+    assert response.status_code == 404
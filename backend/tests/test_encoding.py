@@ -0,0 +1,88 @@
+import gzip
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from core import encoding
+from core.encoding import encode_response, negotiate_format, parse_fields, shape_clauses
+
+PAYLOAD = {
+    "document_id": "doc",
+    "clauses": [
+        {"id": 1, "type": "Payment", "risk": "high", "original": "a", "urdu": "b", "tooltip": "Negotiate"},
+        {"id": 2, "type": "Payment", "risk": "low", "original": "c", "urdu": "d", "tooltip": None},
+        {"id": 3, "type": "Term", "risk": "high", "original": "e", "urdu": "f", "tooltip": "Negotiate"},
+    ],
+}
+
+
+def _request(headers=None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "query_string": b""})
+
+
+def test_parse_fields_keeps_id_and_canonical_order():
+    assert parse_fields(None) is None
+    assert parse_fields("urdu, risk") == ("id", "risk", "urdu")
+    with pytest.raises(HTTPException) as err:
+        parse_fields("risk,secret")
+    assert err.value.status_code == 400
+
+
+def test_shape_clauses_selects_fields_and_dedupes_tooltips():
+    shaped = shape_clauses(PAYLOAD, ("id", "risk", "tooltip"), compact=True)
+    assert shaped["tooltips"] == ["Negotiate"]
+    assert shaped["clauses"] == [
+        {"id": 1, "risk": "high", "tooltip": 0},
+        {"id": 2, "risk": "low", "tooltip": None},
+        {"id": 3, "risk": "high", "tooltip": 0},
+    ]
+    # The original payload is untouched
+    assert PAYLOAD["clauses"][0]["tooltip"] == "Negotiate"
+    assert shape_clauses(PAYLOAD) is PAYLOAD
+
+
+def test_negotiate_format():
+    assert negotiate_format(_request({"Accept": "application/json"})) == "json"
+
+
+def test_msgpack_without_the_package_is_406(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", None)
+    with pytest.raises(HTTPException) as err:
+        negotiate_format(_request({"Accept": "application/msgpack"}))
+    assert err.value.status_code == 406
+    with pytest.raises(HTTPException):
+        negotiate_format(_request(), format="msgpack")
+
+
+def test_msgpack_is_negotiated_when_available(monkeypatch):
+    class FakeMsgpack:
+        @staticmethod
+        def packb(payload, use_bin_type=True):
+            return b"\x81packed"
+
+    monkeypatch.setattr(encoding, "msgpack", FakeMsgpack)
+    request = _request({"Accept": "application/x-msgpack"})
+    assert negotiate_format(request) == "msgpack"
+    response = encode_response(request, PAYLOAD, "/test", "msgpack")
+    assert response.media_type == "application/msgpack"
+    assert response.body == b"\x81packed"
+
+
+def test_large_bodies_are_gzipped_unless_refused(monkeypatch):
+    monkeypatch.setattr(encoding, "brotli", None)
+    monkeypatch.setattr(encoding, "COMPRESS_MIN_BYTES", 400)
+    big = {**PAYLOAD, "padding": "x" * 500}
+
+    response = encode_response(_request({"Accept-Encoding": "gzip, br"}), big, "/test")
+    assert response.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.body)) == big
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+
+    refused = encode_response(_request({"Accept-Encoding": "gzip;q=0"}), big, "/test")
+    assert "content-encoding" not in refused.headers
+
+    small = encode_response(_request({"Accept-Encoding": "gzip"}), PAYLOAD, "/test")
+    assert "content-encoding" not in small.headers
@@ -0,0 +1,116 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import admin, usage
+from core import ledger, llm
+
+
+@pytest.fixture
+def sqlite_ledger(workdir, monkeypatch):
+    monkeypatch.setattr(ledger, "LEDGER_BACKEND", "sqlite")
+    monkeypatch.setattr(ledger, "_ensure_writer", lambda: None)
+    ledger._buffer.clear()
+    yield
+    ledger._buffer.clear()
+
+
+def _groq_response(content):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3),
+    )
+
+
+def _call(client_response):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: client_response)))
+    return asyncio.run(llm._call_provider("groq", client, "prompt", 50, 0.3, "qa", "qa", "groq"))
+
+
+def test_empty_completion_is_recorded_as_error(sqlite_ledger):
+    ledger.set_document("doc-ok")
+    assert _call(_groq_response("  An answer. ")) == "An answer."
+    assert _call(_groq_response("   ")) is None
+
+    rows = ledger._rows(document_id="doc-ok")
+    assert [r["ok"] for r in rows] == [1, 0]
+    # Token counts are kept even for the failed call
+    assert rows[1]["prompt_tokens"] == 12
+    assert ledger.document_usage("doc-ok")["errors"] == 1
+
+
+def test_connections_are_closed_and_schema_created_once(sqlite_ledger, monkeypatch):
+    opened = []
+    real_connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(ledger.sqlite3, "connect", tracking_connect)
+    schema_calls = []
+    real_schema = ledger._create_schema
+    monkeypatch.setattr(ledger, "_create_schema", lambda conn: schema_calls.append(1) or real_schema(conn))
+
+    for i in range(3):
+        ledger.record_llm_call("groq", "m", "qa", 0.0, None, ok=False)
+        ledger.flush()
+    ledger.provider_usage()
+
+    assert len(opened) == 4
+    assert len(schema_calls) == 1
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_usage_endpoints_require_admin_token(sqlite_ledger, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(admin, "is_admin", lambda token: token == "secret")
+    app = FastAPI()
+    app.include_router(usage.router, prefix="/api")
+    client = TestClient(app)
+
+    assert client.get("/api/usage/providers").status_code == 403
+    assert client.get("/api/usage/providers", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/api/usage/providers", headers={"X-Admin-Token": "secret"}).status_code == 200
+    assert client.get("/api/usage/documents/none", headers={"X-Admin-Token": "secret"}).status_code == 404
+
+
+def test_usage_endpoints_disabled_without_admin_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    app = FastAPI()
+    app.include_router(usage.router, prefix="/api")
+    assert TestClient(app).get("/api/usage/providers", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_shared_calls_get_zero_token_rows(sqlite_ledger, monkeypatch):
+    async def fake_provider(provider, client, prompt, max_tokens, temperature, purpose, stage, path):
+        await asyncio.sleep(0.01)
+        ledger.record_llm_call("groq", "m", purpose, 0.0, _groq_response("x"), "groq", ok=True)
+        return "answer"
+
+    monkeypatch.setattr(llm, "PROVIDERS", ["groq"])
+    monkeypatch.setattr(llm, "_client", lambda provider: object())
+    monkeypatch.setattr(llm, "_call", fake_provider)
+
+    async def ask(document_id):
+        ledger.set_document(document_id)
+        return await llm.complete("same prompt", purpose="explain_urdu")
+
+    async def main():
+        return await asyncio.gather(
+            asyncio.create_task(ask("doc-a")), asyncio.create_task(ask("doc-b"))
+        )
+
+    assert asyncio.run(main()) == ["answer", "answer"]
+    first, second = ledger.document_usage("doc-a"), ledger.document_usage("doc-b")
+    assert first["prompt_tokens"] == 12 and list(first["by_provider"]) == ["groq"]
+    assert second["prompt_tokens"] == 0 and list(second["by_provider"]) == ["shared"]
+    assert second["errors"] == 0
@@ -0,0 +1,105 @@
+import threading
+import tracemalloc
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api import admin, report
+from core import memory, profiling
+
+
+@pytest.fixture
+def tracing():
+    memory.start_tracing(1)
+    yield
+    memory.stop_tracing()
+
+
+def test_report_cache_is_read_safely_while_it_changes(monkeypatch):
+    monkeypatch.setattr(report, "_report_cache", report.OrderedDict())
+    stop = threading.Event()
+
+    def churn():
+        i = 0
+        while not stop.is_set():
+            with report._report_cache_lock:
+                report._report_cache[("doc", i)] = b"%PDF" * 10
+                if len(report._report_cache) > 50:
+                    report._report_cache.popitem(last=False)
+            i += 1
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(200):
+            sizes = memory._cache_sizes()["report_pdfs"]
+            assert sizes["bytes"] == 40 * sizes["entries"]
+    finally:
+        stop.set()
+        writer.join()
+
+
+def test_request_peak_is_exact_only_without_overlap(tracing):
+    memory._recent.clear()
+    solo = memory.request_memory_start()
+    data = bytearray(2 ** 20)
+    memory.request_memory_end(solo, "GET", "/solo")
+    del data
+
+    first = memory.request_memory_start()
+    second = memory.request_memory_start()
+    memory.request_memory_end(second, "GET", "/second")
+    memory.request_memory_end(first, "GET", "/first")
+
+    latest = {r["route"]: r for r in memory.recent_requests()}
+    assert latest["/solo"]["exact"] and latest["/solo"]["peak_bytes"] >= 2 ** 20
+    assert not latest["/first"]["exact"] and not latest["/second"]["exact"]
+    assert memory._requests["active"] == 0
+
+
+def test_no_probe_without_tracing():
+    assert not tracemalloc.is_tracing()
+    assert memory.request_memory_start() is None
+    memory.request_memory_end(None, "GET", "/")
+
+
+def test_snapshots_are_capped_and_diffed(tracing, monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_MAX_SNAPSHOTS", 2)
+    ids = []
+    for _ in range(3):
+        ids.append(memory.take_snapshot()["id"])
+        threading.Event().wait(0.002)      # distinct millisecond ids
+
+    assert [s["id"] for s in memory.list_snapshots()] == ids[1:]
+    kept = [bytearray(4096) for _ in range(100)]
+    diff = memory.diff_snapshots(ids[1], "now", limit=5)
+    assert diff["size_diff_bytes"] > 0 and len(diff["top"]) <= 5
+    del kept
+
+    with pytest.raises(HTTPException) as err:
+        memory.diff_snapshots(ids[0])
+    assert err.value.status_code == 404
+
+
+def test_snapshot_needs_tracing():
+    with pytest.raises(HTTPException) as err:
+        memory.take_snapshot()
+    assert err.value.status_code == 409
+
+
+def test_admin_memory_endpoints_need_the_token(monkeypatch):
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api")
+    client = TestClient(app)
+
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    assert client.get("/api/admin/memory").status_code == 403
+
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/admin/memory", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    overview = client.get("/api/admin/memory", headers={"X-Admin-Token": "secret"})
+    assert overview.status_code == 200
+    assert "report_pdfs" in overview.json()["live"]["caches"]
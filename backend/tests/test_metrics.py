@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import metrics
+from core.metrics import (
+    Counter, Histogram, EXECUTOR_QUEUE, end_request_timing, render_prometheus,
+    run_in_executor, server_timing_header, start_request_timing, timed,
+)
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("test_hist_seconds", "help", ("stage",), buckets=(0.1, 1.0))
+    h.observe(0.05, stage="a")
+    h.observe(0.5, stage="a")
+    h.observe(5.0, stage="a")
+
+    lines = h.samples()
+    assert 'test_hist_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_hist_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'test_hist_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_hist_seconds_count{stage="a"} 3' in lines
+
+
+def test_prometheus_text_escapes_labels():
+    c = Counter("test_escaped_total", "help", ("route",))
+    c.inc(route='a"b\\c')
+    text = render_prometheus()
+    assert "# TYPE test_escaped_total counter" in text
+    assert 'test_escaped_total{route="a\\"b\\\\c"} 1.0' in text
+
+
+def test_timed_collects_per_request_stages_even_on_error():
+    token = start_request_timing()
+    with timed("split"):
+        pass
+    with pytest.raises(ValueError):
+        with timed("split"):
+            raise ValueError
+    timings = end_request_timing(token)
+
+    assert timings["split"][1] == 2
+    header = server_timing_header(timings, 0.25)
+    assert header.startswith("split;dur=")
+    assert 'desc="2 calls"' in header
+    assert header.endswith("total;dur=250.0")
+
+
+def test_timed_outside_a_request_only_observes_histogram():
+    with timed("standalone"):
+        pass
+    assert metrics._request_timings.get() is None
+
+
+def test_run_in_executor_tracks_queue_depth():
+    async def main():
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            results = await asyncio.gather(*[
+                run_in_executor(pool, lambda x: x * 2, i, name="test") for i in range(5)
+            ])
+        return results
+
+    assert asyncio.run(main()) == [0, 2, 4, 6, 8]
+    assert EXECUTOR_QUEUE.value(executor="test") == 0
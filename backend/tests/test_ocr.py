@@ -0,0 +1,140 @@
+import asyncio
+import io
+import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.metrics import end_request_timing, start_request_timing
+from services import ocr, text_extractor
+from services.ocr import has_text_layer
+
+
+def _pdf(pages) -> bytes:
+    """One page per entry: its text, or None for a page with only a drawing (a "scan")"""
+    from reportlab.pdfgen import canvas
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer)
+    for text in pages:
+        if text is None:
+            c.rect(100, 500, 200, 100, fill=1)
+        else:
+            c.drawString(72, 720, text)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+class FakeTesseract(types.ModuleType):
+    def __init__(self):
+        super().__init__("pytesseract")
+        self.calls = 0
+
+    def image_to_string(self, image, lang=None):
+        self.calls += 1
+        return f"OCR text {image.size[0]}x{image.size[1]} {lang}"
+
+
+class NoPool:
+    def submit(self, *args, **kwargs):
+        raise AssertionError("a page with a text layer was sent to OCR")
+
+
+@pytest.fixture
+def tesseract(workdir, monkeypatch):
+    fake = FakeTesseract()
+    monkeypatch.setitem(sys.modules, "pytesseract", fake)
+    monkeypatch.setattr(ocr, "OCR_DPI", 50)
+    monkeypatch.setattr(text_extractor, "ocr_available", lambda: True)
+    return fake
+
+
+def test_has_text_layer():
+    assert has_text_layer("This agreement is made between the parties.")
+    assert not has_text_layer("  12 / 3 \n")
+    assert not has_text_layer(None)
+
+
+def test_ocr_page_caches_by_image_hash(tesseract, workdir):
+    path = workdir / "scan.pdf"
+    path.write_bytes(_pdf([None]))
+
+    first = ocr._ocr_page(str(path), 0, 50, "eng+urd", str(workdir / "cache"))
+    second = ocr._ocr_page(str(path), 0, 50, "eng+urd", str(workdir / "cache"))
+
+    assert first[0] == 0 and first[2] is False
+    assert second == (0, first[1], True)
+    assert tesseract.calls == 1
+    assert len(list((workdir / "cache").iterdir())) == 1
+
+
+def test_text_layer_pdf_never_reaches_the_pool(tesseract, monkeypatch):
+    monkeypatch.setattr(ocr, "get_pool", lambda: NoPool())
+    text = text_extractor._extract_pdf(io.BytesIO(_pdf(["This agreement is made between the parties."])))
+    assert "This agreement" in text
+    assert tesseract.calls == 0
+
+
+def test_only_scanned_pages_are_ocrd_and_timed(tesseract, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(ocr, "get_pool", lambda: pool)
+    submitted = []
+    real_submit = pool.submit
+    monkeypatch.setattr(pool, "submit", lambda fn, *args: submitted.append(args[1]) or real_submit(fn, *args))
+
+    class Upload:
+        filename = "scan.pdf"
+
+        def __init__(self, data):
+            self._stream = io.BytesIO(data)
+
+        async def read(self, size=-1):
+            return self._stream.read(size)
+
+    data = _pdf(["Page one has a proper text layer to read.", None, None])
+
+    async def request():
+        token = start_request_timing()
+        text = await text_extractor.extract_text(Upload(data))
+        return text, end_request_timing(token)
+
+    try:
+        text, timings = asyncio.run(request())
+    finally:
+        pool.shutdown()
+
+    assert submitted == [1, 2]
+    assert "Page one" in text and text.count("OCR text") == 2
+    # Timed in the executor thread, reported in the request's Server-Timing
+    assert timings["ocr"][1] == 1
+
+
+def test_ocr_errors_keep_the_text_layer_pages(tesseract, monkeypatch):
+    def broken_ocr(path, page, *args):
+        raise RuntimeError("Failed loading language 'urd'")
+
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(ocr, "get_pool", lambda: pool)
+    monkeypatch.setattr(ocr, "_ocr_page", broken_ocr)
+    failed_before = ocr.OCR_PAGES.value(source="ocr_failed")
+    try:
+        text = text_extractor._extract_pdf(io.BytesIO(_pdf(["Page one has a proper text layer to read.", None])))
+    finally:
+        pool.shutdown()
+
+    assert "Page one" in text
+    assert ocr.OCR_PAGES.value(source="ocr_failed") == failed_before + 1
+
+
+def test_broken_pool_is_replaced_and_only_all_scans_are_rejected(tesseract, monkeypatch):
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise ocr.BrokenProcessPool("a worker died")
+
+    monkeypatch.setattr(ocr, "_pool", BrokenPool())
+    with pytest.raises(text_extractor.HTTPException) as err:
+        text_extractor._extract_pdf(io.BytesIO(_pdf([None])))
+    assert err.value.status_code == 400
+    assert "no readable text" in err.value.detail
+    assert ocr._pool is None
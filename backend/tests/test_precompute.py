@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from services import precompute
+
+
+def _clauses(*texts):
+    return [{"id": i, "original": t} for i, t in enumerate(texts, start=1)]
+
+
+def test_detect_kind_counts_whole_words_only():
+    # "rent" inside current / parent / different must not make this a lease
+    clauses = _clauses(
+        "The current parent company shall not be liable for different outcomes.",
+        "This agreement is governed by the laws of Pakistan.",
+    )
+    assert precompute.detect_kind(clauses) == "general"
+
+
+def test_detect_kind_picks_the_most_mentioned_parties():
+    assert precompute.detect_kind(_clauses("The tenant pays rent to the landlord.")) == "rental"
+    assert precompute.detect_kind(_clauses(
+        "The employee receives a monthly salary.", "The employer may end probation early.",
+        "Rent of the office is paid by the company.",
+    )) == "employment"
+    assert precompute.detect_kind(_clauses("ماہانہ کرایہ پانچ تاریخ تک ادا ہوگا۔")) == "rental"
+
+
+def test_normalize_question_ignores_case_punctuation_and_spacing():
+    assert precompute.normalize_question("  When is RENT due?? ") == "when is rent due"
+    assert precompute.normalize_question("ڈپازٹ واپس کب ملے گا؟") == "ڈپازٹ واپس کب ملے گا"
+
+
+def test_precompute_stores_confident_answers_for_lookup(workdir, monkeypatch):
+    document_id = "doc-pre"
+    (workdir / precompute.STORAGE_PATH / document_id).mkdir(parents=True)
+
+    async def fake_answer(doc, question, purpose):
+        assert doc == document_id and purpose == "qa_precompute"
+        confidence = 0.0 if "penalties" in question else 0.9
+        return {"answer_en": f"about {question}", "answer_ur": "", "source_clause": "Clause 1",
+                "confidence": confidence}
+
+    monkeypatch.setattr(precompute, "answer_question", fake_answer)
+    questions = ["When will my security deposit be refunded?", "What penalties apply for late payment?"]
+    asyncio.run(precompute._precompute(document_id, "rental", questions))
+
+    hit = precompute.lookup_precomputed(document_id, "when will my Security Deposit be refunded")
+    assert hit["answer_en"] == f"about {questions[0]}"
+    assert "question" not in hit
+    # Failed answers are left to live Q&A
+    assert precompute.lookup_precomputed(document_id, questions[1]) is None
+    assert precompute.lookup_precomputed("unknown-doc", questions[0]) is None
+
+
+def test_precompute_gives_up_without_spare_capacity(workdir, monkeypatch):
+    async def unexpected(*args, **kwargs):
+        pytest.fail("answered without spare capacity")
+
+    monkeypatch.setattr(precompute, "answer_question", unexpected)
+    monkeypatch.setattr(precompute, "busy_calls", lambda: precompute.PRECOMPUTE_MAX_BUSY)
+    monkeypatch.setattr(precompute, "PRECOMPUTE_MAX_WAIT_SECONDS", 0)
+
+    asyncio.run(precompute._precompute("doc-busy", "general", ["q"]))
+    assert precompute.lookup_precomputed("doc-busy", "q") is None
+
+
+def test_precomputed_hit_reports_no_prompt_tokens(workdir):
+    from api import qa
+
+    (workdir / precompute.STORAGE_PATH / "doc-hit").mkdir(parents=True)
+    precompute._store("doc-hit", "rental", "Deposit refund?", {
+        "answer_en": "In 30 days.", "answer_ur": "", "source_clause": "Clause 2",
+        "confidence": 0.9, "prompt_tokens": 420,
+    })
+
+    answer = asyncio.run(qa.ask_question(qa.QARequest(question="deposit refund", document_id="doc-hit")))
+    assert answer["precomputed"] is True
+    assert answer["prompt_tokens"] == 0
+    assert answer["answer_en"] == "In 30 days."
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from core import profiling
+from core.metrics import run_in_executor
+from core.profiling import SamplingProfiler, profile_id
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def profiled_loop_work():
+    _spin(0.01)
+
+
+def profiled_executor_work():
+    _spin(0.15)
+
+
+def other_loop_work():
+    _spin(0.01)
+
+
+def other_executor_work():
+    _spin(0.15)
+
+
+async def _request(loop_work, executor_work):
+    async def child():
+        for _ in range(10):
+            loop_work()
+            await asyncio.sleep(0)
+
+    await asyncio.gather(child(), run_in_executor(None, executor_work))
+
+
+def test_profile_only_contains_the_profiled_request():
+    async def main():
+        other = asyncio.create_task(_request(other_loop_work, other_executor_work))
+        profiler = SamplingProfiler(interval=0.002).start()
+        try:
+            await _request(profiled_loop_work, profiled_executor_work)
+        finally:
+            profiler.stop()
+        await other
+        return profiler
+
+    profiler = asyncio.run(main())
+    stacks = "\n".join(profiler.stacks)
+
+    assert "profiled_loop_work" in stacks
+    assert "profiled_executor_work" in stacks
+    assert "other_loop_work" not in stacks
+    assert "other_executor_work" not in stacks
+    assert profiling.current_profiler() is None
+
+
+def test_save_writes_folded_stacks(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_MAX_FILES", 2)
+    profiler = SamplingProfiler()
+    profiler.stacks["MainThread;main (x.py:1);work (x.py:5)"] = 3
+    for name in ("a", "b", "c"):
+        profiler.save(name)
+        time.sleep(0.01)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["b.folded", "c.folded"]
+    assert (tmp_path / "c.folded").read_text() == "MainThread;main (x.py:1);work (x.py:5) 3\n"
+
+
+def test_profile_id_is_filesystem_safe():
+    assert profile_id("../../etc/passwd") == "....etcpasswd"
+    assert len(profile_id(None)) == 32
+
+
+def test_task_factory_is_only_installed_while_profiling():
+    created = []
+
+    def outer_factory(loop, coro, **kwargs):
+        created.append(kwargs.get("name"))
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.set_task_factory(outer_factory)
+        first = SamplingProfiler(interval=0.01).start()
+        second = SamplingProfiler(interval=0.01).start()
+        assert loop.get_task_factory() is profiling._task_factory
+        child = asyncio.create_task(asyncio.sleep(0), name="child")
+        # Newer asyncio passes name= (and eager_start=) through to the factory
+        named = profiling._task_factory(loop, asyncio.sleep(0), name="named")
+        await asyncio.gather(child, named)
+        first.stop()
+        assert loop.get_task_factory() is profiling._task_factory
+        second.stop()
+        return loop.get_task_factory(), child, named
+
+    factory, child, named = asyncio.run(main())
+    assert factory is outer_factory
+    assert child.get_name() == "child" and named.get_name() == "named"
+    # The factory that was there before keeps being used
+    assert "named" in created
+    assert not profiling._factories
@@ -0,0 +1,52 @@
+from core.prompts import build_context, estimate_tokens, qa_prompt, _overlap_len
+
+
+def _chunk(cid, text, score=1.0, type_="General"):
+    return {"id": cid, "type": type_, "risk": "low", "original": text, "urdu": "اردو", "score": score}
+
+
+def test_overlap_len_finds_longest_suffix_prefix():
+    a = "The tenant pays rent on the first day of every month."
+    b = "first day of every month. Late payment costs 5%."
+    assert _overlap_len(a, b, 10, 200) == len("first day of every month.")
+    assert _overlap_len(a, "Unrelated text entirely here.", 10, 200) == 0
+
+
+def test_neighbouring_overlap_is_trimmed():
+    shared = "the security deposit is refunded within thirty days"
+    first = _chunk(1, f"On termination of the lease {shared}", score=1.0)
+    second = _chunk(2, f"{shared} after the keys are returned.", score=0.9)
+
+    context = build_context([first, second], token_budget=None)
+
+    assert context.count(shared) == 1
+    assert "…" in context
+    # Emitted in clause order
+    assert context.index("[Clause 1") < context.index("[Clause 2")
+
+
+def test_mmr_prefers_diverse_chunk_under_budget():
+    text = "tenant shall pay the monthly rent before the fifth day of each month " * 3
+    best = _chunk(1, text, score=1.0)
+    duplicate = _chunk(5, text + "again", score=0.95)
+    different = _chunk(9, "Either party may terminate with sixty days written notice " * 3, score=0.7)
+    budget = estimate_tokens(build_context([best, different], token_budget=None)) + 5
+
+    context = build_context([best, duplicate, different], token_budget=budget)
+
+    assert "[Clause 1" in context and "[Clause 9" in context
+    assert "[Clause 5" not in context
+
+
+def test_best_chunk_is_kept_and_cut_to_budget():
+    context = build_context([_chunk(1, "x" * 20000)], token_budget=100)
+    assert "[Clause 1" in context
+    assert context.endswith("…")
+    assert estimate_tokens(context) < 200
+
+
+def test_urdu_only_when_requested():
+    chunks = [_chunk(1, "Rent is due monthly.")]
+    assert "Urdu:" not in build_context(chunks)
+    assert "Urdu: اردو" in build_context(chunks, include_urdu=True)
+    assert "Rent is due monthly." in qa_prompt("When is rent due?", chunks)
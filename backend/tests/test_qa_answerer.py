@@ -0,0 +1,44 @@
+import asyncio
+
+from services import qa_answerer
+
+CHUNKS = [{"id": 4, "type": "Termination", "risk": "high", "original": "Either party may end this lease.",
+           "urdu": ""}]
+
+
+def test_parse_reads_tagged_sections_and_percent_confidence():
+    text = "[ENGLISH]\nSixty days.\n[URDU]\nساٹھ دن۔\n[SOURCE]\nClause 4\n[CONFIDENCE]\n90%"
+    assert qa_answerer.parse_qa_response(text, CHUNKS) == ("Sixty days.", "ساٹھ دن۔", "Clause 4", 0.9)
+
+
+def test_parse_falls_back_when_tags_are_missing():
+    answer_en, answer_ur, source, confidence = qa_answerer.parse_qa_response("Just prose.", CHUNKS)
+    assert answer_en == "Just prose."
+    assert source == "Clause 4 - Termination"
+    assert confidence == 0.85
+
+
+def test_answer_question_uses_retrieved_context(monkeypatch):
+    async def fake_complete(prompt, purpose, **kwargs):
+        assert CHUNKS[0]["original"] in prompt and purpose == "qa_precompute"
+        return "[ENGLISH] Yes [URDU] ہاں [SOURCE] Clause 4 [CONFIDENCE] 0.7"
+
+    monkeypatch.setattr(qa_answerer, "retrieve", lambda doc, q, top_k: CHUNKS)
+    monkeypatch.setattr(qa_answerer, "complete", fake_complete)
+    answer = asyncio.run(qa_answerer.answer_question("doc", "Can I end it?", purpose="qa_precompute"))
+
+    assert answer["answer_en"] == "Yes" and answer["confidence"] == 0.7
+    assert answer["prompt_tokens"] > 0
+
+
+def test_answer_question_without_clauses_or_llm(monkeypatch):
+    async def no_llm(prompt, **kwargs):
+        return None
+
+    monkeypatch.setattr(qa_answerer, "complete", no_llm)
+    monkeypatch.setattr(qa_answerer, "retrieve", lambda doc, q, top_k: [])
+    assert asyncio.run(qa_answerer.answer_question("doc", "q")) == qa_answerer.no_clauses_answer()
+
+    monkeypatch.setattr(qa_answerer, "retrieve", lambda doc, q, top_k: CHUNKS)
+    answer = asyncio.run(qa_answerer.answer_question("doc", "q"))
+    assert answer["confidence"] == 0.0 and "unavailable" in answer["answer_en"]
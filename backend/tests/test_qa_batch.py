@@ -0,0 +1,64 @@
+import asyncio
+
+from api import qa
+
+
+def _chunk(cid, text="The tenant shall pay rent monthly.", type_="Payment"):
+    return {"id": cid, "type": type_, "risk": "low", "original": text, "urdu": ""}
+
+
+def _section(en, conf="0.9"):
+    return f"[ENGLISH]\n{en}\n[URDU]\nاردو\n[SOURCE]\nClause 1\n[CONFIDENCE]\n{conf}"
+
+
+def test_answer_group_splits_response_on_question_markers(monkeypatch):
+    async def fake_complete(prompt, **kwargs):
+        assert "[Q1]" in prompt and "[Q2]" in prompt
+        # Out of order, with a duplicate marker: the first section per number wins
+        return f"[Q2]\n{_section('second')}\n[Q1]\n{_section('first', '80')}\n[Q2]\n{_section('ignored')}"
+
+    monkeypatch.setattr(qa, "complete", fake_complete)
+    chunks = [[_chunk(1)], [_chunk(2)]]
+    answers, prompt_tokens = asyncio.run(qa._answer_group(["q one", "q two"], chunks, [0, 1]))
+
+    assert [a["answer_en"] for a in answers] == ["first", "second"]
+    assert answers[0]["confidence"] == 0.8
+    assert prompt_tokens > 0
+
+
+def test_answer_group_missing_section_gets_placeholder(monkeypatch):
+    async def fake_complete(prompt, **kwargs):
+        return f"[Q1]\n{_section('only one')}"
+
+    monkeypatch.setattr(qa, "complete", fake_complete)
+    answers, _ = asyncio.run(qa._answer_group(["a", "b"], [[_chunk(1)], [_chunk(2)]], [0, 1]))
+
+    assert answers[0]["answer_en"] == "only one"
+    assert answers[1]["confidence"] == 0.0
+    assert answers[1]["source_clause"] == "Clause 2 - Payment"
+
+
+def test_answer_group_without_llm_is_unavailable(monkeypatch):
+    async def fake_complete(prompt, **kwargs):
+        return None
+
+    monkeypatch.setattr(qa, "complete", fake_complete)
+    answers, _ = asyncio.run(qa._answer_group(["a"], [[_chunk(3)]], [0]))
+    assert answers[0]["confidence"] == 0.0
+    assert "unavailable" in answers[0]["answer_en"]
+
+
+def test_pack_questions_groups_shared_clauses_within_budget(monkeypatch):
+    long_text = "word " * 400      # ~500 tokens per clause
+    chunks = [[_chunk(1, long_text)], [_chunk(5, long_text)], [_chunk(1, long_text)], []]
+    monkeypatch.setattr(qa, "BATCH_PROMPT_TOKENS", 900)
+
+    groups = qa._pack_questions(["a", "b", "c", "d"], chunks)
+
+    # Questions 0 and 2 share clause 1; question 3 retrieved nothing and is not packed
+    assert groups == [[0, 2], [1]]
+
+
+def test_union_chunks_deduplicates_in_clause_order():
+    chunks = [[_chunk(3), _chunk(1)], [_chunk(1), _chunk(2)]]
+    assert [c["id"] for c in qa._union_chunks(chunks, [0, 1])] == [1, 2, 3]
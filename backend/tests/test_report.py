@@ -0,0 +1,117 @@
+import os
+import pickle
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import report
+
+CLAUSES = [
+    {"id": 1, "type": "Payment", "risk": "high", "original": "Rent of Rs. 50,000 is due monthly.",
+     "urdu": "کرایہ ہر مہینے ادا کرنا ہوگا۔"},
+    {"id": 2, "type": "Termination", "risk": "low", "original": "Either party may end this lease.",
+     "urdu": ""},
+]
+
+
+@pytest.fixture
+def client(workdir, monkeypatch):
+    monkeypatch.setattr(report, "_report_cache", report.OrderedDict())
+    monkeypatch.setattr(report, "_report_cache_bytes", 0)
+    app = FastAPI()
+    app.include_router(report.router, prefix="/api")
+    return TestClient(app)
+
+
+def _store(document_id, clauses=CLAUSES):
+    path = os.path.join(report.STORAGE_PATH, document_id)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "meta.pkl"), "wb") as f:
+        pickle.dump(clauses, f)
+
+
+def test_etag_matches_lists_and_weak_tags():
+    etag = '"abc"'
+    assert report._etag_matches('"abc"', etag)
+    assert report._etag_matches('"x", W/"abc"', etag)
+    assert report._etag_matches("*", etag)
+    assert not report._etag_matches('"abcd"', etag)
+    assert not report._etag_matches(None, etag)
+
+
+def test_report_is_cached_and_revalidated(client):
+    _store("doc-1")
+    first = client.get("/api/report/doc-1")
+    assert first.status_code == 200
+    assert first.content.startswith(b"%PDF")
+    etag = first.headers["etag"]
+    assert len(report._report_cache) == 1
+
+    again = client.get("/api/report/doc-1")
+    assert again.content == first.content
+
+    not_modified = client.get("/api/report/doc-1", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+
+def test_etag_changes_with_the_clauses(client):
+    _store("doc-2")
+    etag = client.get("/api/report/doc-2").headers["etag"]
+    _store("doc-2", CLAUSES[:1])
+
+    changed = client.get("/api/report/doc-2", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_unknown_document_is_404(client):
+    assert client.get("/api/report/missing").status_code == 404
+
+
+def _pdf_text(pdf: bytes) -> str:
+    import io
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(pdf)) as doc:
+        return "\n".join(page.extract_text() or "" for page in doc.pages)
+
+
+def test_missing_urdu_font_is_marked_in_the_pdf(monkeypatch):
+    monkeypatch.setattr(report, "_get_urdu_font", lambda: None)
+    text = _pdf_text(report._generate_pdf(CLAUSES, "doc-4", summary_urdu="خلاصہ"))
+
+    assert "Urdu explanations are omitted" in text
+    # Summary and clause 1 have Urdu, clause 2 has none
+    assert text.count(report.URDU_OMITTED) == 2
+
+
+def test_many_clauses_span_numbered_pages():
+    clauses = [{**CLAUSES[0], "id": i} for i in range(1, 121)]
+    text = _pdf_text(report._generate_pdf(clauses, "doc-5"))
+    assert "Clause 120 | Payment" in text
+    assert "Page 1 of" in text
+
+
+def test_cache_is_bounded_by_bytes_and_entries(monkeypatch):
+    monkeypatch.setattr(report, "_report_cache", report.OrderedDict())
+    monkeypatch.setattr(report, "_report_cache_bytes", 0)
+    monkeypatch.setattr(report, "REPORT_CACHE_MAX_BYTES", 250)
+    monkeypatch.setattr(report, "REPORT_CACHE_SIZE", 3)
+
+    for i in range(3):
+        report._cache_report(("doc", i), b"x" * 100)
+    # 300 bytes is over budget: the oldest goes
+    assert list(report._report_cache) == [("doc", 1), ("doc", 2)]
+    assert report._report_cache_bytes == 200
+
+    report._cache_report(("doc", 2), b"x" * 50)      # re-rendered, smaller
+    report._cache_report(("doc", 3), b"x" * 10)
+    report._cache_report(("doc", 4), b"x" * 10)
+    # Entry cap: four fit in the byte budget but only three are kept
+    assert list(report._report_cache) == [("doc", 2), ("doc", 3), ("doc", 4)]
+    assert report._report_cache_bytes == 70
+
+    report._cache_report(("big", 0), b"x" * 300)      # never cached, nothing evicted
+    assert ("big", 0) not in report._report_cache and len(report._report_cache) == 3
@@ -0,0 +1,54 @@
+import os
+
+from core import rag
+from core.lexical import build_bm25, search_bm25, tokenize
+from core.vectorstore import create_index
+
+CLAUSES = [
+    "The tenant shall pay a monthly rent of Rs. 50,000 before the fifth day of each month.",
+    "A security deposit of Rs. 100,000 is refunded within 30 days of vacating the premises.",
+    "Either party may terminate this agreement with 60 days written notice.",
+    "The landlord is responsible for structural repairs and annual maintenance.",
+    "Late payment of rent attracts a penalty of 2% per week of delay.",
+]
+
+
+def test_tokenize_adds_bigrams():
+    assert tokenize("Security Deposit, 30 days") == [
+        "security", "deposit", "30", "days", "security deposit", "deposit 30", "30 days",
+    ]
+
+
+def test_bm25_ranks_exact_term_first():
+    index = build_bm25(CLAUSES)
+    ids, scores = search_bm25(index, "security deposit", top_k=3)
+    assert ids[0] == 1
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_bm25_unknown_terms_return_nothing():
+    ids, scores = search_bm25(build_bm25(CLAUSES), "zzz qqq", top_k=3)
+    assert len(ids) == 0 and len(scores) == 0
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = rag._rrf([3, 1, 2], [1, 4])
+    order = [idx for idx, _ in fused]
+    # 1 is second and first: beats 3, which only one ranking has at the top
+    assert order[0] == 1
+    assert set(order) == {1, 2, 3, 4}
+    assert fused[0][1] == 1 / (rag.RRF_K + 2) + 1 / (rag.RRF_K + 1)
+
+
+def test_retrieve_many_fuses_vector_and_bm25(workdir):
+    clauses = [{"id": i + 1, "type": "General", "risk": "low", "original": t, "urdu": ""}
+               for i, t in enumerate(CLAUSES)]
+    create_index("doc", clauses)
+    assert os.path.exists(os.path.join(rag.STORAGE_PATH, "doc", "bm25.pkl"))
+
+    results = rag.retrieve_many("doc", ["security deposit refund", "notice to terminate"], top_k=2)
+
+    assert len(results) == 2
+    assert results[0][0]["id"] == 2
+    assert results[1][0]["id"] == 3
+    assert all(r["score"] > 0 for hits in results for r in hits)
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from core import llm
+from core.singleflight import SINGLEFLIGHT_INFLIGHT, SingleFlight
+
+
+class Upstream:
+    def __init__(self, result="answer", error=None):
+        self.calls = 0
+        self.cancelled = False
+        self.release = None
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def _run(scenario):
+    async def main():
+        return await scenario()
+    return asyncio.run(main())
+
+
+def test_concurrent_callers_share_one_call():
+    sf, up = SingleFlight("t1"), Upstream()
+
+    async def scenario():
+        up.release = asyncio.Event()
+        callers = [asyncio.create_task(sf.do("k", up)) for _ in range(3)]
+        await asyncio.sleep(0)
+        up.release.set()
+        return await asyncio.gather(*callers)
+
+    assert _run(scenario) == ["answer"] * 3
+    assert up.calls == 1
+    assert SINGLEFLIGHT_INFLIGHT.value(group="t1") == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    sf, up = SingleFlight("t2"), Upstream(error=RuntimeError("boom"))
+
+    async def scenario():
+        up.release = asyncio.Event()
+        callers = [asyncio.create_task(sf.do("k", up)) for _ in range(2)]
+        await asyncio.sleep(0)
+        up.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        # The next call after completion starts a fresh one
+        up.error = None
+        up.release.set()
+        return results, await sf.do("k", up)
+
+    results, again = _run(scenario)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert again == "answer" and up.calls == 2
+
+
+def test_cancelling_one_waiter_keeps_the_call_for_the_others():
+    sf, up = SingleFlight("t3"), Upstream()
+
+    async def scenario():
+        up.release = asyncio.Event()
+        first = asyncio.create_task(sf.do("k", up))
+        second = asyncio.create_task(sf.do("k", up))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        up.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert _run(scenario) == "answer"
+    assert not up.cancelled and up.calls == 1
+
+
+def test_call_is_cancelled_when_every_waiter_leaves():
+    sf, up = SingleFlight("t4"), Upstream()
+
+    async def scenario():
+        up.release = asyncio.Event()
+        callers = [asyncio.create_task(sf.do("k", up)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for c in callers:
+            c.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return sf._flights
+
+    assert _run(scenario) == {}
+    assert up.cancelled
+    assert SINGLEFLIGHT_INFLIGHT.value(group="t4") == 0
+
+
+def test_flight_key_ignores_whitespace_but_not_parameters():
+    key = llm._flight_key("Explain  this\nclause", 300, 0.3)
+    assert key == llm._flight_key("Explain this clause", 300, 0.3)
+    assert key != llm._flight_key("Explain this clause", 400, 0.3)
+    assert key != llm._flight_key("Explain this clause", 300, 0.7)
+
+
+def test_live_question_joins_the_precompute_of_the_same_prompt(monkeypatch):
+    calls = []
+
+    async def fake_complete(prompt, purpose, max_tokens, temperature, stage):
+        calls.append(purpose)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    monkeypatch.setattr(llm, "_complete", fake_complete)
+
+    async def main():
+        return await asyncio.gather(
+            llm.complete("Q: deposit?", purpose="qa_precompute", stage="qa"),
+            llm.complete("Q:  deposit?", purpose="qa", stage="qa"),
+        )
+
+    assert asyncio.run(main()) == ["answer", "answer"]
+    assert calls == ["qa_precompute"]
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+from core import llm
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_main_skips_heavy_dependencies():
+    heavy = ["faiss", "sklearn", "pdfplumber", "docx", "langchain_text_splitters",
+             "reportlab", "groq", "google.genai", "scipy"]
+    code = (
+        "import sys, main\n"
+        f"print('LOADED=' + ','.join(m for m in {heavy!r} if m in sys.modules))\n"
+    )
+    env = {**os.environ, "GROQ_API_KEY": "", "GEMINI_API_KEY": "", "WARMUP": "0"}
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, timeout=60, check=True)
+    loaded = [line for line in out.stdout.splitlines() if line.startswith("LOADED=")]
+    assert loaded == ["LOADED="]
+
+
+def test_llm_clients_are_created_once_and_shared(monkeypatch):
+    created = []
+    monkeypatch.setattr(llm, "_clients", {})
+    monkeypatch.setattr(llm, "_create_client", lambda provider: created.append(provider) or object())
+
+    assert llm.get_groq() is llm.get_groq()
+    assert llm.get_gemini() is llm.get_gemini()
+    assert created == ["groq", "gemini"]
@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+from api import analyze
+from core import vectorstore
+from services import summarizer
+
+
+def _clause(type_, risk, urdu):
+    return {"type": type_, "risk": risk, "urdu": urdu}
+
+
+CLAUSES = [
+    _clause("Payment", "high", "کرایہ دیر سے دینے پر بھاری جرمانہ ہے۔"),
+    _clause("Payment", "high", "جرمانہ ہر ہفتے بڑھتا ہے اور اس کی کوئی حد مقرر نہیں کی گئی ہے۔"),
+    _clause("Payment", "high", "کرایہ ہر ماہ کی پانچ تاریخ تک۔"),
+    _clause("Maintenance", "safe", "مرمت مالک مکان کرے گا۔"),
+]
+
+
+def test_groups_are_riskiest_first_and_split_by_size(monkeypatch):
+    monkeypatch.setattr(summarizer, "SUMMARY_GROUP_CHARS", 100)
+    groups = summarizer._group(CLAUSES)
+    assert [key for key, _ in groups] == [("Payment", "high")] * 2 + [("Maintenance", "safe")]
+    assert sum(len(texts) for _, texts in groups) == 4
+
+
+def test_failed_map_call_falls_back_to_short_clause_texts(monkeypatch):
+    prompts = []
+
+    async def fake_complete(prompt, purpose, **kwargs):
+        prompts.append(purpose)
+        if purpose == "summarize_group":
+            return ""
+        assert CLAUSES[0]["urdu"] in prompt and CLAUSES[2]["urdu"] in prompt
+        assert CLAUSES[1]["urdu"] not in prompt
+        return "خلاصہ"
+
+    monkeypatch.setattr(summarizer, "complete", fake_complete)
+    assert asyncio.run(summarizer.summarize_document(CLAUSES)) == "خلاصہ"
+    assert prompts == ["summarize_group", "summarize"]
+
+
+def test_map_exception_does_not_fail_the_summary(monkeypatch):
+    async def fake_complete(prompt, purpose, **kwargs):
+        if purpose == "summarize_group":
+            raise RuntimeError("provider down")
+        return None
+
+    monkeypatch.setattr(summarizer, "complete", fake_complete)
+    summary = asyncio.run(summarizer.summarize_document(CLAUSES))
+    # Reduce failed too: the count-based summary
+    assert summary == summarizer.fallback_summary(CLAUSES)
+    assert "کل 4 شقیں" in summary
+
+
+def _document(document_id):
+    os.makedirs(os.path.join(vectorstore.BASE, document_id), exist_ok=True)
+
+
+def test_slow_summary_is_stored_after_the_response(workdir, monkeypatch):
+    monkeypatch.setattr(analyze, "SUMMARY_WAIT_SECONDS", 0.01)
+    _document("doc-slow")
+
+    async def main():
+        release = asyncio.Event()
+
+        async def slow_summary():
+            await release.wait()
+            return "دیر سے خلاصہ"
+
+        task = asyncio.ensure_future(slow_summary())
+        waited = await analyze._wait_for_summary("doc-slow", task, "گنتی")
+        stored_first = vectorstore.read_info("doc-slow")["summary_urdu"]
+        release.set()
+        await asyncio.gather(*analyze._summary_tasks)
+        return waited, stored_first
+
+    waited, stored_first = asyncio.run(main())
+    assert waited == ("گنتی", True)
+    assert stored_first == "گنتی"
+    assert vectorstore.read_info("doc-slow")["summary_urdu"] == "دیر سے خلاصہ"
+    assert not analyze._summary_tasks
+
+
+def test_quick_summary_is_returned_and_stored(workdir):
+    _document("doc-quick")
+
+    async def main():
+        async def quick_summary():
+            return "خلاصہ"
+        return await analyze._wait_for_summary("doc-quick", asyncio.ensure_future(quick_summary()), "گنتی")
+
+    assert asyncio.run(main()) == ("خلاصہ", False)
+    assert vectorstore.read_info("doc-quick")["summary_urdu"] == "خلاصہ"
+
+
+def test_concurrent_info_writes_keep_every_key(workdir):
+    from concurrent.futures import ThreadPoolExecutor
+
+    _document("doc-info")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: vectorstore.write_info("doc-info", {f"k{i}": i}), range(64)))
+    assert vectorstore.read_info("doc-info") == {f"k{i}": i for i in range(64)}
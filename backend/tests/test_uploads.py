@@ -0,0 +1,127 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+
+from core.uploads import UploadLimitMiddleware
+from services import text_extractor
+from services.text_extractor import _sniff, extract_text
+
+
+class FakeUpload:
+    def __init__(self, data: bytes, filename: str):
+        self.filename = filename
+        self._stream = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+
+def _zip(names) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name in names:
+            archive.writestr(name, "<xml/>")
+    return buffer.getvalue()
+
+
+def _sniff_bytes(data: bytes, filename: str) -> str:
+    return _sniff(io.BytesIO(data), filename)
+
+
+def test_sniff_trusts_content_over_extension():
+    assert _sniff_bytes(b"%PDF-1.7\n...", "contract.txt") == "pdf"
+    assert _sniff_bytes(_zip(["word/document.xml"]), "contract.pdf") == "docx"
+    assert _sniff_bytes("کرایہ\nRent".encode("utf-8"), "contract.txt") == "txt"
+    assert _sniff_bytes("rent".encode("utf-16"), "contract.txt") == "txt"
+    assert _sniff_bytes(b"\xef\xbb\xbf\r\n  %PDF-1.4\n...", "contract.pdf") == "pdf"
+
+
+def test_pdf_magic_inside_text_is_not_a_pdf():
+    text = b"Scanned copies must start with the %PDF- header.\nRent is due monthly."
+    assert _sniff_bytes(text, "notes.txt") == "txt"
+    with pytest.raises(HTTPException) as err:
+        _sniff_bytes(text, "notes.pdf")
+    assert "does not match its .pdf" in err.value.detail
+
+
+@pytest.mark.parametrize("data, filename, message", [
+    (_zip(["xl/workbook.xml"]), "contract.docx", "not a Word"),
+    (b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1" + b"\0" * 100, "contract.docx", "Legacy .doc"),
+    (b"plain text", "contract.pdf", "does not match its .pdf"),
+    (b"\x7fELF\x00\x00binary", "contract.txt", "does not match its .txt"),
+])
+def test_sniff_rejects_mismatched_content(data, filename, message):
+    with pytest.raises(HTTPException) as err:
+        _sniff_bytes(data, filename)
+    assert err.value.status_code == 400
+    assert message in err.value.detail
+
+
+def test_extract_text_reads_txt_upload():
+    text = asyncio.run(extract_text(FakeUpload("Rent is due.".encode("utf-8"), "a.txt")))
+    assert text == "Rent is due."
+
+
+@pytest.mark.parametrize("data, filename, status", [
+    (b"", "a.txt", 400),
+    (b"x", "a.doc", 400),
+    (b"x", "a.exe", 400),
+])
+def test_extract_text_rejects_bad_uploads(data, filename, status):
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(extract_text(FakeUpload(data, filename)))
+    assert err.value.status_code == status
+
+
+def test_extract_text_aborts_past_the_size_limit(monkeypatch):
+    monkeypatch.setattr(text_extractor, "MAX_UPLOAD_BYTES", 100 * 1024)
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(extract_text(FakeUpload(b"a" * (200 * 1024), "a.txt")))
+    assert err.value.status_code == 413
+
+
+def _run_middleware(headers, chunks, max_body=1000):
+    reads = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            reads.append(message["type"])
+            if message["type"] == "http.disconnect" or not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1}
+                for i, c in enumerate(chunks)]
+
+    async def receive():
+        return messages.pop(0)
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/api/analyze", "headers": headers}
+    asyncio.run(UploadLimitMiddleware(app, max_body=max_body)(scope, receive, send))
+    return sent[0]["status"], reads
+
+
+def test_content_length_over_limit_is_413_before_reading():
+    status, reads = _run_middleware([(b"content-length", b"5000")], [b"x" * 5000])
+    assert status == 413
+    assert reads == []
+
+
+def test_streamed_body_over_limit_is_413_without_reading_the_rest():
+    status, reads = _run_middleware([], [b"x" * 600, b"x" * 600, b"x" * 600])
+    assert status == 413
+    assert reads == ["http.request", "http.disconnect"]
+
+
+def test_body_within_limit_passes():
+    assert _run_middleware([(b"content-length", b"500")], [b"x" * 500])[0] == 200
@@ -64,6 +64,18 @@ function _demoAnswer(q) {
   return {en:'Based on the document: it contains 3 high risk, 2 medium risk, and 3 safe clauses. Review carefully before signing.',ur:'اس دستاویز میں 3 خطرناک، 2 درمیانی، اور 3 محفوظ شقیں ہیں۔ دستخط سے پہلے غور سے پڑھیں۔',src:'General Analysis'};
 }
 
+// Stable per-browser id, sent as X-Client-ID for the backend's optional per-client quota
+function _clientId() {
+  const KEY = 'legalease_client_id';
+  let id = null;
+  try { id = localStorage.getItem(KEY); } catch(e) {}
+  if (!id) {
+    id = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : 'c-'+Date.now()+'-'+Math.random().toString(36).slice(2);
+    try { localStorage.setItem(KEY, id); } catch(e) {}
+  }
+  return id;
+}
+
 async function analyzeDocument(file) {
   if (USE_DEMO_MODE) {
     await _sleep(1800);
@@ -78,7 +90,7 @@ async function analyzeDocument(file) {
   const formData = new FormData();
   formData.append('file', file);
   let response;
-  try { response = await fetch(API_BASE_URL+'/api/analyze',{method:'POST',body:formData}); }
+  try { response = await fetch(API_BASE_URL+'/api/analyze',{method:'POST',headers:{'X-Client-ID':_clientId()},body:formData}); }
   catch(e){ throw new Error('Cannot reach backend at '+API_BASE_URL+' — is it running? ('+e.message+')'); }
   if (!response.ok) {
     let msg='HTTP '+response.status;
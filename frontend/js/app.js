@@ -57,8 +57,11 @@ function closeMobileMenu() {
 // ─── FILE UPLOAD ──────────────────────────────────────────────
 function handleFileSelect(file) {
   if (!file) return;
-  if (!/\.(pdf|doc|docx|txt)$/i.test(file.name)) {
-    showToast('Unsupported file type. Use PDF, DOC, DOCX, or TXT.', 'error'); return;
+  if (/\.doc$/i.test(file.name)) {
+    showToast('Legacy .doc files are not supported. Save as DOCX or PDF.', 'error'); return;
+  }
+  if (!/\.(pdf|docx|txt)$/i.test(file.name)) {
+    showToast('Unsupported file type. Use PDF, DOCX, or TXT.', 'error'); return;
   }
   if (file.size > 10 * 1024 * 1024) {
     showToast('File exceeds 10MB limit.', 'error'); return;